@@ -5,9 +5,13 @@ Provides wind plant operational assessment analysis capabilities.
 
 import logging
 from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
 
 from app.models.schemas import (
     AEPRequest, 
@@ -17,13 +21,192 @@ from app.models.schemas import (
     TurbineIdealEnergyRequest,
     EYAGapAnalysisRequest
 )
-from app.services.openoa_service import openoa_service
+from app.core.admin import is_admin, require_admin
+from app.core.config import get_settings
+from app.services.analysis_executor import analysis_executor
 from app.services.file_storage import FileStorage
+from app.services.job_store import JobStoreFullError, job_store
+from app.services.openoa_service import openoa_service
+from app.services.profiling import (
+    PROFILE_DIR,
+    PROFILE_FORMATS,
+    PROFILE_MODES,
+    ProfileRequest,
+    find_profile,
+    list_profiles,
+)
+from app.services.stage_timer import server_timing_header
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 router = APIRouter(prefix="/analysis", tags=["Analysis"])
 
 
+_PROFILE_MEDIA_TYPES = {
+    "folded": "text/plain",
+    "text": "text/plain",
+    "pstats": "application/octet-stream",
+    "summary": "application/json",
+}
+
+
+def _profile_dir() -> Path:
+    return Path(settings.profile_dir or PROFILE_DIR)
+
+
+def _profile_mode(
+    profile: bool = Query(False, description="Run under a profiler and store the profile (admin only)"),
+    profile_mode: str = Query(
+        "sampling", description='Profiler: "sampling" (flamegraph), "deterministic" (cProfile) or "memory" (per-stage RSS and allocations)'
+    ),
+    x_admin_token: Optional[str] = Header(None),
+) -> Optional[str]:
+    """Validate the profiling options of an analysis request.
+    
+    Returns:
+        The profiler mode, or None if profiling was not requested.
+        
+    Raises:
+        HTTPException: 403 for non-admin requests, 400 for an unknown mode.
+    """
+    if not profile:
+        return None
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Profiling requires an admin token")
+    if profile_mode not in PROFILE_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"profile_mode must be one of {list(PROFILE_MODES)}"
+        )
+    return profile_mode
+
+
+async def _run_analysis(
+    analysis_id: str,
+    analysis_type: str,
+    label: str,
+    response: Response,
+    run_async: bool,
+    method_name: str,
+    profile_mode: Optional[str] = None,
+    **kwargs
+) -> AnalysisResponse:
+    """Run an analysis in the worker pool, inline or as a background job.
+    
+    Args:
+        analysis_id: Unique analysis ID (also the job ID).
+        analysis_type: Analysis type used for concurrency limiting.
+        label: Human-readable analysis name for logs and errors.
+        response: Outgoing response, used to set 202 and Location for jobs
+            and the Server-Timing header for inline runs.
+        run_async: Submit as a background job instead of waiting for the result.
+        method_name: OpenOAService method to call.
+        profile_mode: Profiler to run the analysis under, or None.
+        **kwargs: Arguments for the service method.
+        
+    Returns:
+        AnalysisResponse: Completed analysis, or the pending job if run_async.
+        
+    Raises:
+        HTTPException: If the analysis fails or the job store is full.
+    """
+    profile = None
+    profile_url = None
+    if profile_mode is not None:
+        profile = ProfileRequest(
+            profile_id=analysis_id,
+            mode=profile_mode,
+            profile_dir=str(_profile_dir()),
+            interval_seconds=settings.profile_sampling_interval_ms / 1000,
+            max_profiles=settings.profile_max_files,
+            top_allocations=settings.profile_memory_top_allocations,
+            traceback_frames=settings.profile_memory_traceback_frames,
+        )
+        profile_url = f"{settings.api_v1_prefix}/analysis/profiles/{analysis_id}"
+    
+    if run_async:
+        try:
+            job = job_store.submit(
+                analysis_id,
+                lambda: analysis_executor.run_timed(analysis_type, method_name, profile=profile, **kwargs)
+            )
+        except JobStoreFullError as e:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+        
+        job.profile_url = profile_url
+        logger.info(f"{label} {analysis_id} submitted as a background job")
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Location"] = f"{settings.api_v1_prefix}/analysis/jobs/{analysis_id}"
+        return job
+    
+    created_at = datetime.now()
+    try:
+        result, timings = await analysis_executor.run_timed(analysis_type, method_name, profile=profile, **kwargs)
+        
+        logger.info(f"{label} {analysis_id} completed successfully")
+        response.headers["Server-Timing"] = server_timing_header(timings)
+        
+        completed = AnalysisResponse(
+            id=analysis_id,
+            status="completed",
+            result=result,
+            created_at=created_at,
+            completed_at=datetime.now(),
+            timings=timings,
+            profile_url=profile_url
+        )
+        # Keep the result so later requests (e.g. EYA gap) can refer to it by ID
+        job_store.record(completed)
+        return completed
+        
+    except Exception as e:
+        logger.error(f"{label} {analysis_id} failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{label} failed: {str(e)}"
+        )
+
+
+def _get_aep_result(aep_analysis_id: str, file_path: Optional[str] = None) -> dict:
+    """Fetch the result of a completed AEP analysis of a dataset.
+    
+    Args:
+        aep_analysis_id: ID returned by the AEP endpoint.
+        file_path: Path of the dataset the result must be for. If None, the
+            default dataset.
+        
+    Returns:
+        dict: The AEP analysis result.
+        
+    Raises:
+        HTTPException: If the analysis is unknown, expired, not an AEP
+            analysis, not completed or was run on other data.
+    """
+    job = job_store.get(aep_analysis_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"AEP analysis {aep_analysis_id} not found"
+        )
+    if not aep_analysis_id.startswith("aep_"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Analysis {aep_analysis_id} is not an AEP analysis"
+        )
+    if job.status != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"AEP analysis {aep_analysis_id} is {job.status}"
+        )
+    dataset_id, fingerprint = openoa_service.get_dataset_identity(file_path)
+    if (job.result.get("dataset_id"), job.result.get("dataset_fingerprint")) != (dataset_id, fingerprint):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"AEP analysis {aep_analysis_id} was run on a different dataset or version of it"
+        )
+    return job.result
+
+
 @router.post(
     "/aep",
     response_model=AnalysisResponse,
@@ -31,7 +214,12 @@ router = APIRouter(prefix="/analysis", tags=["Analysis"])
     summary="Run AEP Analysis",
     description="Performs Annual Energy Production (AEP) analysis on sample wind plant data.",
 )
-async def run_aep_analysis(request: AEPRequest) -> AnalysisResponse:
+async def run_aep_analysis(
+    request: AEPRequest,
+    response: Response,
+    run_async: bool = Query(False, alias="async", description="Run in the background and return 202 with a job ID"),
+    profile_mode: Optional[str] = Depends(_profile_mode)
+) -> AnalysisResponse:
     """Run Annual Energy Production (AEP) analysis.
     
     Executes a Monte Carlo AEP analysis on the sample wind plant data
@@ -39,6 +227,9 @@ async def run_aep_analysis(request: AEPRequest) -> AnalysisResponse:
     
     Args:
         request: AEP analysis configuration parameters.
+        response: Outgoing response (status 202 for background jobs).
+        run_async: Run as a background job and return its ID immediately.
+        profile_mode: Profiler to run under (admin only), or None.
         
     Returns:
         AnalysisResponse: Analysis result with AEP estimates.
@@ -47,36 +238,23 @@ async def run_aep_analysis(request: AEPRequest) -> AnalysisResponse:
         HTTPException: If analysis fails.
     """
     analysis_id = f"aep_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:6]}"
+    logger.info(f"Starting AEP analysis {analysis_id}")
     
-    try:
-        logger.info(f"Starting AEP analysis {analysis_id}")
-        logger.debug(f"Analysis parameters: {request.model_dump()}")
-        
-        # Get file path if file_id provided
-        file_path = FileStorage.get_file_path(request.file_id) if request.file_id else None
-        
-        # Run the analysis
-        result = openoa_service.run_aep_analysis_simple(
-            iterations=request.iterations,
-            file_path=file_path
-        )
-        
-        logger.info(f"AEP analysis {analysis_id} completed successfully")
-        
-        return AnalysisResponse(
-            id=analysis_id,
-            status="completed",
-            result=result,
-            created_at=datetime.now(),
-            completed_at=datetime.now()
-        )
-        
-    except Exception as e:
-        logger.error(f"AEP analysis {analysis_id} failed: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"AEP analysis failed: {str(e)}"
-        )
+    file_path = await run_in_threadpool(FileStorage.get_file_path, request.file_id) if request.file_id else None
+    
+    return await _run_analysis(
+        analysis_id,
+        "aep",
+        "AEP analysis",
+        response,
+        run_async,
+        "run_aep_analysis_simple",
+        profile_mode=profile_mode,
+        iterations=request.iterations,
+        file_path=file_path,
+        seed=request.seed,
+        num_shards=request.num_shards,
+    )
 
 
 @router.get(
@@ -143,7 +321,12 @@ async def list_analysis_types() -> dict:
     summary="Run Electrical Losses Analysis",
     description="Estimates electrical losses in the wind plant collection and transmission system.",
 )
-async def run_electrical_losses_analysis(request: ElectricalLossesRequest) -> AnalysisResponse:
+async def run_electrical_losses_analysis(
+    request: ElectricalLossesRequest,
+    response: Response,
+    run_async: bool = Query(False, alias="async", description="Run in the background and return 202 with a job ID"),
+    profile_mode: Optional[str] = Depends(_profile_mode)
+) -> AnalysisResponse:
     """Run electrical losses analysis.
     
     Analyzes SCADA data to estimate electrical losses including transformer,
@@ -151,6 +334,9 @@ async def run_electrical_losses_analysis(request: ElectricalLossesRequest) -> An
     
     Args:
         request: Electrical losses analysis configuration.
+        response: Outgoing response (status 202 for background jobs).
+        run_async: Run as a background job and return its ID immediately.
+        profile_mode: Profiler to run under (admin only), or None.
         
     Returns:
         AnalysisResponse: Analysis result with loss estimates.
@@ -159,30 +345,21 @@ async def run_electrical_losses_analysis(request: ElectricalLossesRequest) -> An
         HTTPException: If analysis fails.
     """
     analysis_id = f"elec_losses_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:6]}"
+    logger.info(f"Starting electrical losses analysis {analysis_id}")
     
-    try:
-        logger.info(f"Starting electrical losses analysis {analysis_id}")
-        
-        result = openoa_service.run_electrical_losses_analysis(
-            loss_threshold_pct=request.loss_threshold_pct
-        )
-        
-        logger.info(f"Electrical losses analysis {analysis_id} completed successfully")
-        
-        return AnalysisResponse(
-            id=analysis_id,
-            status="completed",
-            result=result,
-            created_at=datetime.now(),
-            completed_at=datetime.now()
-        )
-        
-    except Exception as e:
-        logger.error(f"Electrical losses analysis {analysis_id} failed: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Electrical losses analysis failed: {str(e)}"
-        )
+    file_path = await run_in_threadpool(FileStorage.get_file_path, request.file_id) if request.file_id else None
+    
+    return await _run_analysis(
+        analysis_id,
+        "electrical_losses",
+        "Electrical losses analysis",
+        response,
+        run_async,
+        "run_electrical_losses_analysis",
+        profile_mode=profile_mode,
+        loss_threshold_pct=request.loss_threshold_pct,
+        file_path=file_path,
+    )
 
 
 @router.post(
@@ -192,7 +369,12 @@ async def run_electrical_losses_analysis(request: ElectricalLossesRequest) -> An
     summary="Run Wake Losses Analysis",
     description="Estimates internal wake losses in the wind plant.",
 )
-async def run_wake_losses_analysis(request: WakeLossesRequest) -> AnalysisResponse:
+async def run_wake_losses_analysis(
+    request: WakeLossesRequest,
+    response: Response,
+    run_async: bool = Query(False, alias="async", description="Run in the background and return 202 with a job ID"),
+    profile_mode: Optional[str] = Depends(_profile_mode)
+) -> AnalysisResponse:
     """Run wake losses analysis.
     
     Analyzes turbine-to-turbine wake effects and estimates energy losses
@@ -200,6 +382,9 @@ async def run_wake_losses_analysis(request: WakeLossesRequest) -> AnalysisRespon
     
     Args:
         request: Wake losses analysis configuration.
+        response: Outgoing response (status 202 for background jobs).
+        run_async: Run as a background job and return its ID immediately.
+        profile_mode: Profiler to run under (admin only), or None.
         
     Returns:
         AnalysisResponse: Analysis result with wake loss estimates.
@@ -208,30 +393,21 @@ async def run_wake_losses_analysis(request: WakeLossesRequest) -> AnalysisRespon
         HTTPException: If analysis fails.
     """
     analysis_id = f"wake_losses_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:6]}"
+    logger.info(f"Starting wake losses analysis {analysis_id}")
     
-    try:
-        logger.info(f"Starting wake losses analysis {analysis_id}")
-        
-        result = openoa_service.run_wake_losses_analysis(
-            bin_width=request.bin_width
-        )
-        
-        logger.info(f"Wake losses analysis {analysis_id} completed successfully")
-        
-        return AnalysisResponse(
-            id=analysis_id,
-            status="completed",
-            result=result,
-            created_at=datetime.now(),
-            completed_at=datetime.now()
-        )
-        
-    except Exception as e:
-        logger.error(f"Wake losses analysis {analysis_id} failed: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Wake losses analysis failed: {str(e)}"
-        )
+    file_path = await run_in_threadpool(FileStorage.get_file_path, request.file_id) if request.file_id else None
+    
+    return await _run_analysis(
+        analysis_id,
+        "wake_losses",
+        "Wake losses analysis",
+        response,
+        run_async,
+        "run_wake_losses_analysis",
+        profile_mode=profile_mode,
+        bin_width=request.bin_width,
+        file_path=file_path,
+    )
 
 
 @router.post(
@@ -241,7 +417,12 @@ async def run_wake_losses_analysis(request: WakeLossesRequest) -> AnalysisRespon
     summary="Run Turbine Ideal Energy Analysis",
     description="Calculates long-term gross energy for turbines under ideal conditions.",
 )
-async def run_turbine_ideal_energy_analysis(request: TurbineIdealEnergyRequest) -> AnalysisResponse:
+async def run_turbine_ideal_energy_analysis(
+    request: TurbineIdealEnergyRequest,
+    response: Response,
+    run_async: bool = Query(False, alias="async", description="Run in the background and return 202 with a job ID"),
+    profile_mode: Optional[str] = Depends(_profile_mode)
+) -> AnalysisResponse:
     """Run turbine ideal energy analysis.
     
     Estimates the ideal energy production of turbines based on long-term
@@ -249,6 +430,9 @@ async def run_turbine_ideal_energy_analysis(request: TurbineIdealEnergyRequest)
     
     Args:
         request: Turbine ideal energy analysis configuration.
+        response: Outgoing response (status 202 for background jobs).
+        run_async: Run as a background job and return its ID immediately.
+        profile_mode: Profiler to run under (admin only), or None.
         
     Returns:
         AnalysisResponse: Analysis result with ideal energy estimates.
@@ -257,30 +441,21 @@ async def run_turbine_ideal_energy_analysis(request: TurbineIdealEnergyRequest)
         HTTPException: If analysis fails.
     """
     analysis_id = f"turbine_ideal_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:6]}"
+    logger.info(f"Starting turbine ideal energy analysis {analysis_id}")
     
-    try:
-        logger.info(f"Starting turbine ideal energy analysis {analysis_id}")
-        
-        result = openoa_service.run_turbine_ideal_energy_analysis(
-            use_lt_distribution=request.use_lt_distribution
-        )
-        
-        logger.info(f"Turbine ideal energy analysis {analysis_id} completed successfully")
-        
-        return AnalysisResponse(
-            id=analysis_id,
-            status="completed",
-            result=result,
-            created_at=datetime.now(),
-            completed_at=datetime.now()
-        )
-        
-    except Exception as e:
-        logger.error(f"Turbine ideal energy analysis {analysis_id} failed: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Turbine ideal energy analysis failed: {str(e)}"
-        )
+    file_path = await run_in_threadpool(FileStorage.get_file_path, request.file_id) if request.file_id else None
+    
+    return await _run_analysis(
+        analysis_id,
+        "turbine_ideal_energy",
+        "Turbine ideal energy analysis",
+        response,
+        run_async,
+        "run_turbine_ideal_energy_analysis",
+        profile_mode=profile_mode,
+        use_lt_distribution=request.use_lt_distribution,
+        file_path=file_path,
+    )
 
 
 @router.post(
@@ -290,43 +465,166 @@ async def run_turbine_ideal_energy_analysis(request: TurbineIdealEnergyRequest)
     summary="Run EYA Gap Analysis",
     description="Compares actual AEP against expected AEP from energy yield assessment.",
 )
-async def run_eya_gap_analysis(request: EYAGapAnalysisRequest) -> AnalysisResponse:
+async def run_eya_gap_analysis(
+    request: EYAGapAnalysisRequest,
+    response: Response,
+    run_async: bool = Query(False, alias="async", description="Run in the background and return 202 with a job ID"),
+    profile_mode: Optional[str] = Depends(_profile_mode)
+) -> AnalysisResponse:
     """Run EYA gap analysis.
     
     Compares the measured/calculated AEP against the expected AEP from
     the pre-construction energy yield assessment to identify performance gaps.
+    The AEP comes from ``aep_analysis_id`` when given, otherwise from a cached
+    AEP result for the dataset, and only as a last resort from a new run.
     
     Args:
-        request: EYA gap analysis configuration with expected AEP.
+        request: EYA gap analysis configuration with expected AEP scenario(s).
+        response: Outgoing response (status 202 for background jobs).
+        run_async: Run as a background job and return its ID immediately.
+        profile_mode: Profiler to run under (admin only), or None.
         
     Returns:
         AnalysisResponse: Analysis result with gap metrics.
         
     Raises:
-        HTTPException: If analysis fails.
+        HTTPException: If the AEP analysis cannot be used or analysis fails.
     """
     analysis_id = f"eya_gap_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:6]}"
+    logger.info(f"Starting EYA gap analysis {analysis_id}")
     
-    try:
-        logger.info(f"Starting EYA gap analysis {analysis_id}")
+    file_path = await run_in_threadpool(FileStorage.get_file_path, request.file_id) if request.file_id else None
+    aep_result = _get_aep_result(request.aep_analysis_id, file_path) if request.aep_analysis_id else None
+    
+    return await _run_analysis(
+        analysis_id,
+        "eya_gap",
+        "EYA gap analysis",
+        response,
+        run_async,
+        "run_eya_gap_analysis",
+        profile_mode=profile_mode,
+        expected_aep_gwh=request.expected_aep_gwh,
+        file_path=file_path,
+        aep_result=aep_result,
+    )
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=AnalysisResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get Analysis Job",
+    description="Returns the status and, once completed, the result of a background analysis job.",
+)
+async def get_analysis_job(job_id: str) -> AnalysisResponse:
+    """Poll a background analysis job.
+    
+    Args:
+        job_id: Analysis ID returned when the job was submitted.
+        
+    Returns:
+        AnalysisResponse: Current job state.
         
-        result = openoa_service.run_eya_gap_analysis(
-            expected_aep_gwh=request.expected_aep_gwh
+    Raises:
+        HTTPException: If the job does not exist or has expired.
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Analysis job {job_id} not found"
         )
+    return job
+
+
+@router.delete(
+    "/jobs/{job_id}",
+    response_model=AnalysisResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Cancel Analysis Job",
+    description="Cancels a pending or running analysis job, or discards a finished one.",
+)
+async def cancel_analysis_job(job_id: str) -> AnalysisResponse:
+    """Cancel a background analysis job.
+    
+    Unfinished jobs are marked cancelled and kept until they expire. A
+    job whose analysis already started stays "cancelling", holding its
+    concurrency slot, until the worker finishes. Finished jobs are removed
+    from the job store.
+    
+    Args:
+        job_id: Analysis ID returned when the job was submitted.
         
-        logger.info(f"EYA gap analysis {analysis_id} completed successfully")
+    Returns:
+        AnalysisResponse: Final job state.
         
-        return AnalysisResponse(
-            id=analysis_id,
-            status="completed",
-            result=result,
-            created_at=datetime.now(),
-            completed_at=datetime.now()
+    Raises:
+        HTTPException: If the job does not exist or has expired.
+    """
+    job = job_store.cancel(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Analysis job {job_id} not found"
         )
+    return job
+
+
+@router.get(
+    "/profiles",
+    status_code=status.HTTP_200_OK,
+    summary="List Analysis Profiles",
+    description="Lists stored analysis profiles, newest first. Requires the X-Admin-Token header.",
+    dependencies=[Depends(require_admin)],
+)
+async def get_analysis_profiles() -> List[Dict[str, Any]]:
+    """List stored analysis profiles.
+    
+    Returns:
+        list: Profile summaries (id, mode, duration, available formats).
+    """
+    return list_profiles(_profile_dir())
+
+
+@router.get(
+    "/profiles/{analysis_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Download Analysis Profile",
+    description="Downloads the profile of an analysis run with profile=true. Requires the X-Admin-Token header.",
+    dependencies=[Depends(require_admin)],
+)
+async def get_analysis_profile(
+    analysis_id: str,
+    format: str = Query(
+        "summary",
+        description='"summary" (JSON; per-stage memory use in memory mode), "folded" (flamegraph, sampling mode), "pstats" or "text" (deterministic mode)'
+    )
+) -> FileResponse:
+    """Download a stored analysis profile.
+    
+    Args:
+        analysis_id: ID of the profiled analysis.
+        format: File format to download.
         
-    except Exception as e:
-        logger.error(f"EYA gap analysis {analysis_id} failed: {e}", exc_info=True)
+    Returns:
+        FileResponse: The profile file.
+        
+    Raises:
+        HTTPException: If the format is unknown or the profile does not exist.
+    """
+    if format not in PROFILE_FORMATS:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"EYA gap analysis failed: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"format must be one of {list(PROFILE_FORMATS)}"
         )
+    
+    found = find_profile(_profile_dir(), analysis_id, format)
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No {format} profile stored for analysis {analysis_id}"
+        )
+    
+    path, _ = found
+    return FileResponse(path, media_type=_PROFILE_MEDIA_TYPES[format], filename=path.name)
@@ -7,10 +7,12 @@ and monitoring systems to check service health.
 import logging
 from datetime import datetime
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Response, status
 
-from app.models.schemas import HealthResponse, InfoResponse
+from app.models.schemas import HealthResponse, InfoResponse, ReadinessResponse
 from app.core.config import get_settings
+from app.core.lazy_imports import openoa_version
+from app.services.prewarm import warmup_state
 from app import __version__
 
 logger = logging.getLogger(__name__)
@@ -44,6 +46,28 @@ async def health_check() -> HealthResponse:
     )
 
 
+@router.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Readiness Check",
+    description="Returns 503 until startup warm-up has finished, with per-stage warm-up timings.",
+    responses={503: {"model": ReadinessResponse, "description": "Warm-up still running"}},
+)
+async def readiness_check(response: Response) -> ReadinessResponse:
+    """Check if the instance has finished warming up.
+    
+    Unlike ``/health``, which only says the process is up, this endpoint
+    is meant for load balancer readiness probes.
+    
+    Returns:
+        ReadinessResponse: Warm-up status and stage timings.
+    """
+    if not warmup_state.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessResponse(**warmup_state.to_dict())
+
+
 @router.get(
     "/api/v1/info",
     response_model=InfoResponse,
@@ -59,17 +83,10 @@ async def get_info() -> InfoResponse:
     """
     settings = get_settings()
     
-    # Try to get OpenOA version
-    openoa_version = None
-    try:
-        import openoa
-        openoa_version = getattr(openoa, "__version__", None)
-    except ImportError:
-        logger.warning("OpenOA library not found")
-    
     return InfoResponse(
         name=settings.app_name,
         version=__version__,
         environment=settings.environment,
-        openoa_version=openoa_version
+        # Read from package metadata, so OpenOA is not imported
+        openoa_version=openoa_version()
     )
@@ -0,0 +1,30 @@
+"""Prometheus metrics endpoint.
+
+Serves the in-process metrics from :mod:`app.services.metrics` in the
+Prometheus text format, so the API can be scraped without an exporter.
+"""
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+
+from app.services.metrics import CONTENT_TYPE, registry
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Metrics",
+    description="Analysis latency, in-flight analyses, upload, storage, cache and process metrics in the Prometheus text format.",
+)
+async def get_metrics() -> PlainTextResponse:
+    """Render the current metrics of this worker process.
+    
+    Returns:
+        PlainTextResponse: Metrics in the Prometheus text exposition format.
+    """
+    # Scrape-time gauges query the upload registry, so render off the event loop
+    body = await run_in_threadpool(registry.render)
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
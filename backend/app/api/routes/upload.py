@@ -1,15 +1,25 @@
 """
 Routes for file upload functionality.
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException
+import time
+
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from typing import Dict, Any
-import json
-import csv
-import io
 
+from app.core.config import get_settings
+from app.models.schemas import UploadSessionRequest
+from app.services import metrics
 from app.services.file_storage import FileStorage
+from app.services.upload_ingest import UploadTooLargeError, ingest_upload
+from app.services.upload_janitor import janitor_pass
+from app.services.upload_sessions import ChunkedUploads, UploadSessionStateError
 
 router = APIRouter()
+settings = get_settings()
+
+# Allowance for multipart boundaries and part headers in Content-Length
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
 
 
 @router.post("/cleanup-old-files")
@@ -17,36 +27,84 @@ async def cleanup_old_files() -> Dict[str, Any]:
     """
     Manually trigger cleanup of old uploaded files.
     
-    Removes files older than 24 hours and orphaned files.
+    Runs one upload janitor pass now: removes expired files, evicts least
+    recently used files beyond the disk quota and removes orphaned files.
     Useful for maintenance or testing.
     
     Returns:
         Status message about cleanup operation
     """
     try:
-        files_before = len(FileStorage.list_files())
-        FileStorage._cleanup_old_files(max_age_hours=24)
-        files_after = len(FileStorage.list_files())
+        stats = await run_in_threadpool(janitor_pass)
         
         return {
             "status": "success",
             "message": "Cleanup completed",
-            "files_removed": files_before - files_after,
-            "files_remaining": files_after
+            "files_removed": stats["expired"] + stats["evicted"],
+            **stats
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Cleanup failed: {str(e)}")
 
 
+def _file_type(filename: str) -> str:
+    """Return the upload file type, rejecting unsupported formats with a 400."""
+    file_extension = filename.split('.')[-1].lower()
+    if file_extension not in ['csv', 'json']:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file format: {file_extension}. Only CSV and JSON are supported."
+        )
+    return file_extension
+
+
+def _stored_upload_response(
+    file_id: str,
+    filename: str,
+    file_type: str,
+    metadata: Dict[str, Any],
+    background_tasks: BackgroundTasks
+) -> Dict[str, Any]:
+    """Schedule columnar conversion of a stored upload and describe it."""
+    columnar_status = FileStorage.get_file_info(file_id)["columnar_status"]
+    if columnar_status != "ready":
+        background_tasks.add_task(FileStorage.convert_to_columnar, file_id)
+    
+    return {
+        "status": "success",
+        "message": "File uploaded and stored successfully",
+        "file_id": file_id,
+        "filename": filename,
+        "file_type": file_type,
+        "row_count": metadata["row_count"],
+        "columns": metadata["columns"],
+        "file_size_bytes": metadata["file_size_bytes"],
+        "content_hash": metadata["content_hash"],
+        "columnar_status": columnar_status
+    }
+
+
 @router.post("/upload-plant-data")
-async def upload_plant_data(file: UploadFile = File(...)) -> Dict[str, Any]:
+async def upload_plant_data(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...)
+) -> Dict[str, Any]:
     """
     Upload plant data file (CSV or JSON).
     
     This endpoint accepts CSV or JSON files containing plant data
-    and validates the format before storing.
+    and validates the format before storing. The file is streamed to
+    disk in chunks while rows are counted, so memory use does not grow
+    with the file size. After the response, the file is converted to a
+    typed columnar artifact in the background; poll
+    GET /upload-plant-data/{file_id} for its columnar_status. Content
+    that was uploaded before is stored once and reuses its artifact and
+    cached results, so its columnar_status may already be "ready".
     
     Args:
+        request: Incoming request, used to reject oversized bodies early
+        background_tasks: Runs the columnar conversion after the response
         file: Uploaded file (CSV or JSON)
         
     Returns:
@@ -56,66 +114,202 @@ async def upload_plant_data(file: UploadFile = File(...)) -> Dict[str, Any]:
     if not file.filename:
         raise HTTPException(status_code=400, detail="No filename provided")
     
-    file_extension = file.filename.split('.')[-1].lower()
-    if file_extension not in ['csv', 'json']:
+    file_extension = _file_type(file.filename)
+    
+    max_bytes = settings.max_upload_size_mb * 1024 * 1024
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
         raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file format: {file_extension}. Only CSV and JSON are supported."
+            status_code=413,
+            detail=f"File exceeds the {settings.max_upload_size_mb} MB upload limit"
         )
     
+    file_id, partial_path = FileStorage.create_upload(file.filename)
+    start = time.perf_counter()
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Validate and parse based on file type
-        if file_extension == 'json':
-            data = json.loads(content.decode('utf-8'))
-            row_count = len(data) if isinstance(data, list) else 1
-        else:  # CSV
-            csv_content = content.decode('utf-8')
-            csv_reader = csv.DictReader(io.StringIO(csv_content))
-            data = list(csv_reader)
-            row_count = len(data)
-        
-        # Extract column names
-        if isinstance(data, list) and len(data) > 0:
-            columns = list(data[0].keys())
-        elif isinstance(data, dict):
-            columns = list(data.keys())
-        else:
-            columns = []
-        
-        # Save file to storage and get file_id
-        metadata = {
-            "row_count": row_count,
-            "columns": columns,
-            "file_size_bytes": len(content)
-        }
-        file_id = FileStorage.save_file(content, file.filename, metadata)
-        
-        return {
-            "status": "success",
-            "message": "File uploaded and stored successfully",
-            "file_id": file_id,
-            "filename": file.filename,
-            "file_type": file_extension,
-            "row_count": row_count,
-            "columns": columns,
-            "file_size_bytes": len(content)
-        }
-        
-    except json.JSONDecodeError as e:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid JSON format: {str(e)}"
-        )
-    except csv.Error as e:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid CSV format: {str(e)}"
+        # Copy to disk and count rows in a worker thread, chunk by chunk
+        metadata = await run_in_threadpool(
+            ingest_upload,
+            file.file,
+            partial_path,
+            file_extension,
+            max_bytes,
+            settings.max_json_upload_size_mb * 1024 * 1024,
+            settings.upload_chunk_size_kb * 1024,
         )
+        await run_in_threadpool(FileStorage.commit_upload, file_id, file.filename, partial_path, metadata)
+        metrics.upload_bytes_total.inc(metadata["file_size_bytes"], method="multipart")
+        metrics.upload_duration_seconds.observe(time.perf_counter() - start, method="multipart")
+        metrics.uploads_total.inc(method="multipart")
+        return _stored_upload_response(file_id, file.filename, file_extension, metadata, background_tasks)
+        
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        partial_path.unlink(missing_ok=True)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing file: {str(e)}"
         )
+    finally:
+        await file.close()
+
+
+@router.get("/upload-plant-data/{file_id}")
+async def get_uploaded_file(file_id: str) -> Dict[str, Any]:
+    """
+    Get details of an uploaded file, including its columnar conversion status.
+    
+    Args:
+        file_id: ID returned by the upload endpoint
+        
+    Returns:
+        File details with columnar_status (pending, converting, ready or failed)
+    """
+    file_info = FileStorage.get_file_info(file_id)
+    if not file_info:
+        raise HTTPException(status_code=404, detail=f"File {file_id} not found")
+    
+    return {
+        "file_id": file_id,
+        "filename": file_info["original_filename"],
+        "file_type": file_info["file_type"],
+        "uploaded_at": file_info["uploaded_at"],
+        **file_info["metadata"],
+        "columnar_status": file_info["columnar_status"],
+        "columnar_error": file_info["columnar_error"],
+    }
+
+
+@router.post("/upload-sessions", status_code=201)
+async def create_upload_session(request: UploadSessionRequest) -> Dict[str, Any]:
+    """
+    Start a resumable upload of a large CSV or JSON file.
+    
+    PUT each chunk to /upload-sessions/{session_id}/chunks/{index}, then
+    POST /upload-sessions/{session_id}/complete. Chunks may be sent in any
+    order and in parallel; an interrupted transfer only resends the
+    missing chunks listed by GET /upload-sessions/{session_id}.
+    
+    Args:
+        request: Filename, total size and optional chunk size
+        
+    Returns:
+        Session status with session_id, chunk_size and total_chunks
+    """
+    file_type = _file_type(request.filename)
+    max_bytes = settings.max_session_upload_size_mb * 1024 * 1024
+    if file_type == "json":
+        max_bytes = min(max_bytes, settings.max_json_upload_size_mb * 1024 * 1024)
+    
+    try:
+        return await run_in_threadpool(
+            ChunkedUploads.create_session,
+            request.filename,
+            file_type,
+            request.total_size,
+            request.chunk_size or settings.upload_session_chunk_size_mb * 1024 * 1024,
+            max_bytes
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+@router.put("/upload-sessions/{session_id}/chunks/{chunk_index}")
+async def put_upload_chunk(session_id: str, chunk_index: int, request: Request) -> Dict[str, Any]:
+    """
+    Write one chunk of a resumable upload.
+    
+    The raw request body is the chunk; it is streamed to its offset in the
+    file without being held in memory. Every chunk must be exactly
+    chunk_size bytes except the last. Re-sending a chunk overwrites it.
+    
+    Args:
+        session_id: ID returned by POST /upload-sessions
+        chunk_index: Zero-based chunk number
+        request: Request whose body is the chunk
+        
+    Returns:
+        Updated session status
+    """
+    try:
+        session = await ChunkedUploads.write_chunk(
+            session_id, chunk_index, request.stream(), settings.upload_chunk_size_kb * 1024
+        )
+    except UploadSessionStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Upload session {session_id} not found")
+    return session
+
+
+@router.get("/upload-sessions/{session_id}")
+async def get_upload_session(session_id: str) -> Dict[str, Any]:
+    """
+    Get the chunks and byte ranges received so far for a resumable upload.
+    
+    Args:
+        session_id: ID returned by POST /upload-sessions
+        
+    Returns:
+        Session status with received_chunks, received_ranges and missing_chunks
+    """
+    session = await run_in_threadpool(ChunkedUploads.get_status, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Upload session {session_id} not found")
+    return session
+
+
+@router.post("/upload-sessions/{session_id}/complete")
+async def complete_upload_session(session_id: str, background_tasks: BackgroundTasks) -> Dict[str, Any]:
+    """
+    Finalize a resumable upload once every chunk has arrived.
+    
+    The assembled file is validated and stored like a single-request
+    upload; the session ID becomes its file_id.
+    
+    Args:
+        session_id: ID returned by POST /upload-sessions
+        background_tasks: Runs the columnar conversion after the response
+        
+    Returns:
+        Response with upload status and file details, as for POST /upload-plant-data
+    """
+    try:
+        finalized = await run_in_threadpool(
+            ChunkedUploads.finalize, session_id, settings.upload_chunk_size_kb * 1024
+        )
+    except UploadSessionStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if finalized is None:
+        raise HTTPException(status_code=404, detail=f"Upload session {session_id} not found")
+    
+    file_id, metadata = finalized
+    file_info = FileStorage.get_file_info(file_id)
+    return _stored_upload_response(
+        file_id, file_info["original_filename"], file_info["file_type"], metadata, background_tasks
+    )
+
+
+@router.delete("/upload-sessions/{session_id}")
+async def abort_upload_session(session_id: str) -> Dict[str, Any]:
+    """
+    Abort a resumable upload and delete the chunks received so far.
+    
+    Args:
+        session_id: ID returned by POST /upload-sessions
+        
+    Returns:
+        Status message
+    """
+    if not await run_in_threadpool(ChunkedUploads.abort, session_id):
+        raise HTTPException(status_code=404, detail=f"Upload session {session_id} not found")
+    return {"status": "success", "message": f"Upload session {session_id} aborted"}
@@ -0,0 +1,40 @@
+"""Access control for administrative endpoints and options.
+
+Admin features (e.g. profiling) are disabled unless ADMIN_TOKEN is set.
+Clients authenticate by sending the token in the ``X-Admin-Token`` header.
+"""
+
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+
+from app.core.config import get_settings
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Check a client-supplied admin token.
+
+    Args:
+        token: Value of the X-Admin-Token header, if any.
+
+    Returns:
+        bool: True if admin features are enabled and the token matches.
+    """
+    expected = get_settings().admin_token
+    if not expected or not token:
+        return False
+    return secrets.compare_digest(token.encode(), expected.encode())
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """FastAPI dependency that rejects non-admin requests.
+
+    Raises:
+        HTTPException: 403 if admin features are disabled or the token is wrong.
+    """
+    if not is_admin(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required (set ADMIN_TOKEN and send it in X-Admin-Token)"
+        )
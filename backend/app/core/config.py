@@ -5,7 +5,7 @@ Settings are loaded from environment variables with fallback defaults.
 
 import json
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Optional
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -39,6 +39,80 @@ class Settings(BaseSettings):
     # OpenOA Settings
     use_mock_data: bool = True
     
+    # Load the default dataset from a memory-mapped columnar snapshot
+    # (written on first load) instead of re-parsing the raw CSVs
+    use_cleansed_snapshot: bool = True
+    
+    # PlantData cache size limit (MB); 0 disables caching
+    plant_data_cache_max_mb: int = 1024
+    
+    # Share built PlantData frames between worker processes as memory-mapped
+    # Arrow files (default directory: backend/cache/plant_data)
+    plant_data_shared_store: bool = True
+    plant_data_shared_dir: Optional[str] = None
+    
+    # Warm up at startup (imports, default PlantData, optionally one small
+    # analysis); /ready returns 503 until warm-up has finished
+    prewarm_enabled: bool = False
+    prewarm_run_analysis: bool = False
+    
+    # Token for admin-only features, sent in the X-Admin-Token header; unset disables them
+    admin_token: Optional[str] = None
+    
+    # Profiling of single analyses (?profile=true, admin only)
+    profile_dir: Optional[str] = None  # Defaults to backend/cache/profiles
+    profile_sampling_interval_ms: float = 5.0
+    profile_max_files: int = 50
+    profile_memory_top_allocations: int = 10  # Allocation sites reported per stage
+    profile_memory_traceback_frames: int = 10
+    
+    # Serve Prometheus metrics at /metrics
+    metrics_enabled: bool = True
+    
+    # Analysis worker pool ("thread" or "process")
+    analysis_executor: str = "thread"
+    analysis_max_workers: int = 4
+    
+    # Maximum concurrent runs per analysis type, e.g. ANALYSIS_CONCURRENCY_LIMITS='{"aep": 2}'
+    analysis_concurrency_limits: Dict[str, int] = {
+        "aep": 2,
+        "electrical_losses": 2,
+        "wake_losses": 1,
+        "turbine_ideal_energy": 1,
+        "eya_gap": 2,
+    }
+    analysis_default_concurrency: int = 2
+    
+    # Monte Carlo AEP sharding: the shard count (with the seed) determines the
+    # results; the worker count (0 = one per CPU) only affects speed
+    aep_shards: int = 4
+    aep_shard_workers: int = 0
+    
+    # Analysis result memoization (memory LRU + on-disk tier)
+    result_cache_enabled: bool = True
+    result_cache_max_entries: int = 256
+    result_cache_dir: Optional[str] = None  # Defaults to backend/cache/results
+    
+    # Uploads are streamed to disk in chunks; JSON files are parsed in full,
+    # so they have a separate, lower size limit
+    max_upload_size_mb: int = 500
+    max_json_upload_size_mb: int = 50
+    upload_chunk_size_kb: int = 1024
+    
+    # Resumable chunked uploads for files too large for one request
+    max_session_upload_size_mb: int = 10240
+    upload_session_chunk_size_mb: int = 8
+    
+    # Upload janitor: expires old uploads and evicts least recently used ones
+    # beyond the disk quota (0 disables the quota), off the request path
+    upload_max_age_hours: int = 24
+    upload_quota_mb: int = 5120
+    upload_janitor_interval_seconds: int = 300
+    
+    # Asynchronous analysis jobs: finished jobs expire after the TTL
+    job_ttl_seconds: int = 3600
+    job_store_max_jobs: int = 1000
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,147 @@
+"""Lazy, import-once access to heavy modules and dataset loaders.
+
+Importing pandas, pyarrow and OpenOA takes seconds, so the API process does
+not import them until an analysis needs them; ``tests/test_import_time.py``
+keeps it that way. Code that needs a heavy module, the OpenOA version or an
+example-project loader goes through this module, which resolves each one
+once per process and logs how long the import took.
+"""
+
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import time
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Modules the API process must not import at startup
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "scipy", "openoa")
+
+# Dataset loaders shipped in the examples directory: (module, function)
+DATASET_LOADERS: Dict[str, Tuple[str, str]] = {
+    "la_haute_borne": ("project_ENGIE", "prepare"),
+}
+
+_import_lock = threading.Lock()
+
+
+def import_heavy(name: str) -> ModuleType:
+    """Import a module once, logging how long the first import took.
+
+    Args:
+        name: Dotted module name.
+
+    Returns:
+        The imported module.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    with _import_lock:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        logger.info(f"Imported {name} in {time.perf_counter() - start:.2f}s")
+    return module
+
+
+@lru_cache
+def package_version(distribution: str) -> Optional[str]:
+    """Return an installed distribution's version without importing it.
+
+    Args:
+        distribution: Distribution name, e.g. "openoa".
+
+    Returns:
+        Version string, or None if not installed.
+    """
+    try:
+        return version(distribution)
+    except PackageNotFoundError:
+        return None
+
+
+def openoa_version() -> Optional[str]:
+    """Return the installed OpenOA version, or None if not installed."""
+    return package_version("openoa")
+
+
+def examples_path() -> Path:
+    """Locate the examples directory that ships with the backend.
+
+    Raises:
+        FileNotFoundError: If it does not exist.
+    """
+    current_file = Path(__file__).resolve()
+
+    # Primary expected location: backend/examples
+    candidates = [
+        current_file.parents[2] / "examples",  # .../backend/examples
+        current_file.parents[3] / "examples",  # .../repo/examples (fallback)
+    ]
+
+    for path in candidates:
+        if path.exists():
+            return path
+
+    searched = ", ".join(str(p) for p in candidates)
+    raise FileNotFoundError(f"Examples directory not found. Checked: {searched}")
+
+
+def import_example_module(name: str) -> ModuleType:
+    """Import an example-project module by file path, once.
+
+    Unlike inserting the examples directory into ``sys.path``, this leaves
+    the import path untouched. The module is registered in ``sys.modules``
+    under its own name so objects defined in it can be pickled.
+
+    Args:
+        name: Module name, e.g. "project_ENGIE".
+
+    Returns:
+        The imported module.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    with _import_lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+
+        start = time.perf_counter()
+        spec = importlib.util.spec_from_file_location(name, examples_path() / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+        logger.info(f"Imported {name} in {time.perf_counter() - start:.2f}s")
+    return module
+
+
+@lru_cache
+def get_dataset_loader(dataset: str) -> Callable:
+    """Resolve a dataset loader registered in ``DATASET_LOADERS``, once.
+
+    Args:
+        dataset: Dataset name, e.g. "la_haute_borne".
+
+    Returns:
+        The loader function.
+
+    Raises:
+        KeyError: If no loader is registered for the dataset.
+    """
+    module_name, function_name = DATASET_LOADERS[dataset]
+    return getattr(import_example_module(module_name), function_name)
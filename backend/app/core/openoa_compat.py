@@ -0,0 +1,109 @@
+"""Workarounds for bugs in the installed OpenOA release.
+
+``install()`` is called once when the analysis service is created. It does
+not import OpenOA: the API process only imports it when an analysis needs
+it (see ``app.core.lazy_imports``), so the fixes are applied as soon as the
+affected OpenOA module is imported, in every process that creates the
+service.
+
+Shared PlantData validation errors
+    Targets OpenOA 3.2 (``openoa>=3.2.0`` in requirements.txt; 3.2 is the
+    latest release checked). ``PlantData._errors`` is declared with a plain
+    dict default, so every instance shares one dict and validation adds to
+    it: once a PlantData with a ``merra2`` reanalysis product is built,
+    every later one without it fails with ``KeyError: 'merra2'``. The field
+    validators write to it during ``__init__``, before
+    ``__attrs_post_init__``, so construction itself is wrapped: it starts
+    from empty errors and leaves each instance a copy of its own.
+    Constructions are serialized, since they all write to the shared dict.
+    The fix is skipped if the default is no longer a dict (e.g. a release
+    that uses a factory); re-check it when upgrading OpenOA.
+"""
+
+import copy
+import functools
+import importlib.abc
+import logging
+import sys
+import threading
+from types import ModuleType
+
+logger = logging.getLogger(__name__)
+
+# Module whose import triggers the fixes
+_PATCHED_MODULE = "openoa.plant"
+
+_lock = threading.Lock()
+_installed = False
+
+
+def install() -> None:
+    """Apply the OpenOA fixes in this process, now or when OpenOA is first imported.
+
+    Safe to call more than once.
+    """
+    global _installed
+    with _lock:
+        if _installed:
+            return
+        _installed = True
+        module = sys.modules.get(_PATCHED_MODULE)
+        if module is None:
+            sys.meta_path.insert(0, _PatchOnImport())
+    if module is not None:
+        _patch_plant_data(module)
+
+
+class _PatchOnImport(importlib.abc.MetaPathFinder):
+    """Finder that patches ``openoa.plant`` right after it is executed."""
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != _PATCHED_MODULE:
+            return None
+        # Let the other finders locate the module, then wrap its loader
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        exec_module = spec.loader.exec_module
+
+        def exec_and_patch(module: ModuleType) -> None:
+            exec_module(module)
+            _patch_plant_data(module)
+
+        spec.loader.exec_module = exec_and_patch
+        sys.meta_path.remove(self)
+        return spec
+
+
+def _patch_plant_data(module: ModuleType) -> None:
+    """Give every PlantData its own validation errors."""
+    import attrs
+
+    PlantData = module.PlantData
+    shared = attrs.fields(PlantData)._errors.default
+    if not isinstance(shared, dict):
+        logger.info("OpenOA PlantData no longer shares its validation errors; not patching it")
+        return
+
+    init = PlantData.__init__
+    init_lock = threading.Lock()
+
+    @functools.wraps(init)
+    def __init__(self, *args, **kwargs):
+        with init_lock:
+            for errors in shared.values():
+                errors.clear()
+            try:
+                init(self, *args, **kwargs)
+                object.__setattr__(self, "_errors", copy.deepcopy(self._errors))
+            finally:
+                for errors in shared.values():
+                    errors.clear()
+
+    PlantData.__init__ = __init__
@@ -3,6 +3,7 @@
 This is the main entry point for the application.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -11,8 +12,11 @@ from fastapi.responses import JSONResponse
 
 from app.core.config import get_settings
 from app.core.cors import setup_cors
-from app.api.routes import health
-from app.services.file_storage import FileStorage
+from app.api.routes import health, metrics
+from app.services.upload_janitor import run_upload_janitor
+from app.services.prewarm import run_prewarm, warmup_state
+from app.services.analysis_executor import analysis_executor
+from app.services import aep_sharding
 from app import __version__
 
 # Configure logging
@@ -37,15 +41,25 @@ async def lifespan(app: FastAPI):
     logger.info(f"Debug mode: {settings.debug}")
     logger.info(f"CORS origins: {settings.cors_origins}")
     
-    # Clean up old uploaded files on startup
-    logger.info("Cleaning up old uploaded files...")
-    FileStorage._cleanup_old_files(max_age_hours=24)
-    logger.info("File cleanup complete")
+    # Expire and evict uploaded files periodically, starting now
+    janitor = asyncio.create_task(run_upload_janitor(settings.upload_janitor_interval_seconds))
+    
+    # Warm up in the background; /ready reports progress
+    prewarm = None
+    if settings.prewarm_enabled:
+        prewarm = asyncio.create_task(run_prewarm(warmup_state, settings.prewarm_run_analysis))
+    else:
+        warmup_state.status = "disabled"
     
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    janitor.cancel()
+    if prewarm is not None:
+        prewarm.cancel()
+    analysis_executor.shutdown(wait=False)
+    aep_sharding.shutdown()
 
 
 # Create FastAPI application
@@ -64,6 +78,8 @@ setup_cors(app)
 
 # Include routers
 app.include_router(health.router)
+if settings.metrics_enabled:
+    app.include_router(metrics.router)
 
 # Import additional routers
 from app.api.routes import data, analysis, upload
@@ -109,6 +125,7 @@ async def root():
         "version": __version__,
         "docs": "/docs",
         "health": "/health",
+        "ready": "/ready",
         "api": settings.api_v1_prefix
     }
 
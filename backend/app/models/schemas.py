@@ -4,9 +4,9 @@ All API request and response models are defined here.
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class HealthResponse(BaseModel):
@@ -47,6 +47,30 @@ class InfoResponse(BaseModel):
     }
 
 
+class ReadinessResponse(BaseModel):
+    """Readiness check response schema."""
+    
+    ready: bool = Field(..., description="Whether the instance should receive traffic")
+    status: str = Field(..., description="Warm-up status: pending, warming, ready, failed or disabled")
+    stages: Dict[str, float] = Field(default_factory=dict, description="Seconds taken by each warm-up stage")
+    error: Optional[str] = Field(None, description="Failed warm-up stage and error")
+    started_at: Optional[datetime] = Field(None, description="When warm-up started")
+    finished_at: Optional[datetime] = Field(None, description="When warm-up finished")
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "ready": True,
+                "status": "ready",
+                "stages": {"imports": 1.82, "plant_data": 7.41},
+                "error": None,
+                "started_at": "2026-02-03T10:30:00Z",
+                "finished_at": "2026-02-03T10:30:09Z"
+            }
+        }
+    }
+
+
 class ErrorResponse(BaseModel):
     """Standard error response schema."""
     
@@ -125,13 +149,17 @@ class AEPRequest(BaseModel):
     iterations: Optional[int] = Field(1000, description="Number of Monte Carlo iterations", ge=100, le=10000)
     uncertainty_method: Optional[str] = Field("bootstrap", description="Uncertainty quantification method")
     file_id: Optional[str] = Field(None, description="Optional uploaded dataset ID. If None, uses default dataset")
+    seed: Optional[int] = Field(None, description="Random seed for reproducible results. Random if not provided", ge=0, lt=2**32)
+    num_shards: Optional[int] = Field(None, description="Number of parallel Monte Carlo shards. Defaults to server setting", ge=1, le=64)
     
     model_config = {
         "json_schema_extra": {
             "example": {
                 "iterations": 1000,
                 "uncertainty_method": "bootstrap",
-                "file_id": None
+                "file_id": None,
+                "seed": 42,
+                "num_shards": 4
             }
         }
     }
@@ -214,28 +242,75 @@ class TurbineIdealEnergyRequest(BaseModel):
 class EYAGapAnalysisRequest(BaseModel):
     """Request schema for EYA gap analysis."""
     
-    expected_aep_gwh: float = Field(..., description="Expected AEP from energy yield assessment (GWh)")
+    expected_aep_gwh: Union[float, List[float]] = Field(
+        ...,
+        description="Expected AEP from energy yield assessment (GWh), or a list of scenarios to evaluate against one AEP result"
+    )
+    aep_analysis_id: Optional[str] = Field(
+        None,
+        description="ID of a completed AEP analysis to compare against. If None, a cached AEP result for the dataset is reused when available"
+    )
     file_id: Optional[str] = Field(None, description="Optional uploaded dataset ID. If None, uses default dataset")
     
+    @field_validator("expected_aep_gwh")
+    @classmethod
+    def validate_expected_aep(cls, value: Union[float, List[float]]) -> Union[float, List[float]]:
+        """Require positive expected AEP values and at most 100 scenarios."""
+        values = value if isinstance(value, list) else [value]
+        if not 1 <= len(values) <= 100:
+            raise ValueError("expected_aep_gwh must contain between 1 and 100 values")
+        if any(v <= 0 for v in values):
+            raise ValueError("expected_aep_gwh values must be positive")
+        return value
+    
     model_config = {
         "json_schema_extra": {
             "example": {
-                "expected_aep_gwh": 35.0,
+                "expected_aep_gwh": [30.0, 35.0, 40.0],
+                "aep_analysis_id": "aep_20260203_123456_a1b2c3",
                 "file_id": None
             }
         }
     }
 
 
+# Upload Schemas
+
+class UploadSessionRequest(BaseModel):
+    """Request schema for starting a resumable upload session."""
+    
+    filename: str = Field(..., description="Original filename (.csv or .json)", min_length=1)
+    total_size: int = Field(..., description="Size of the complete file in bytes", gt=0)
+    chunk_size: Optional[int] = Field(
+        None, description="Chunk size in bytes. Defaults to server setting", ge=64 * 1024, le=256 * 1024 * 1024
+    )
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "filename": "scada_2014_2020.csv",
+                "total_size": 2147483648,
+                "chunk_size": 8388608
+            }
+        }
+    }
+
+
 class AnalysisResponse(BaseModel):
     """Generic analysis response wrapper."""
     
     id: str = Field(..., description="Unique analysis ID")
-    status: str = Field(..., description="Analysis status: pending, running, completed, failed")
+    status: str = Field(..., description="Analysis status: pending, running, cancelling, completed, failed, cancelled")
     result: Optional[Dict[str, Any]] = Field(None, description="Analysis results")
     created_at: datetime = Field(default_factory=datetime.now, description="Creation timestamp")
     completed_at: Optional[datetime] = Field(None, description="Completion timestamp")
     error: Optional[str] = Field(None, description="Error message if failed")
+    timings: Optional[Dict[str, float]] = Field(
+        None, description="Milliseconds spent in each stage (load, clean, build_plant_data, validate, run, extract, queue, total)"
+    )
+    profile_url: Optional[str] = Field(
+        None, description="Download URL of the profile, if the analysis was run with profile=true"
+    )
     
     model_config = {
         "json_schema_extra": {
@@ -248,7 +323,9 @@ class AnalysisResponse(BaseModel):
                 },
                 "created_at": "2026-02-03T12:34:56Z",
                 "completed_at": "2026-02-03T12:35:12Z",
-                "error": None
+                "error": None,
+                "timings": {"queue": 0.2, "load": 812.4, "run": 15120.0, "extract": 1.3, "total": 15934.1},
+                "profile_url": None
             }
         }
     }
@@ -0,0 +1,192 @@
+"""Sharded, reproducible Monte Carlo AEP across worker processes.
+
+``MonteCarloAEP.run`` is single-threaded and draws from the global
+``random``/``numpy.random`` state. This module splits the simulation count
+into shards, runs each shard in its own process with an RNG seeded from a
+``numpy.random.SeedSequence`` child of the user's seed, and concatenates the
+per-shard ``results`` frames in shard order. For a given seed and shard
+count the merged frame is bit-identical regardless of worker count or
+scheduling. Profiled runs execute the shards in the calling thread instead,
+so the profiler sees them.
+"""
+
+import logging
+import multiprocessing
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.services.stage_timer import active_timer, collect_timings, stage
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Set while shards must run in the calling thread (e.g. when profiling them)
+_in_process = ContextVar("aep_shards_in_process", default=False)
+
+
+def split_simulations(num_sim: int, num_shards: int) -> List[int]:
+    """Split a simulation count into near-equal shard sizes.
+
+    Args:
+        num_sim: Total number of Monte Carlo simulations.
+        num_shards: Requested number of shards.
+
+    Returns:
+        list[int]: Simulations per shard (no empty shards).
+    """
+    num_shards = max(1, min(num_shards, num_sim))
+    base, extra = divmod(num_sim, num_shards)
+    return [base + 1 if i < extra else base for i in range(num_shards)]
+
+
+def shard_seeds(seed: int, num_shards: int) -> List[int]:
+    """Derive independent per-shard seeds from one user seed.
+
+    Args:
+        seed: User-supplied seed.
+        num_shards: Number of shards.
+
+    Returns:
+        list[int]: One 32-bit seed per shard.
+    """
+    import numpy as np
+
+    children = np.random.SeedSequence(seed).spawn(num_shards)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def _run_shard(
+    file_path: Optional[str],
+    num_sim: int,
+    seed: int,
+    analysis_kwargs: Dict[str, Any],
+):
+    """Run one shard of MonteCarloAEP.
+
+    Plant data is loaded through the process's own OpenOAService, so the
+    PlantData cache is reused across shards and requests.
+    """
+    import numpy as np
+    from openoa.analysis import MonteCarloAEP
+
+    from app.services.openoa_service import openoa_service
+
+    plant_data = openoa_service.load_plant_data(file_path)
+
+    # MonteCarloAEP samples from the global RNGs; the process is ours alone
+    random.seed(seed)
+    np.random.seed(seed)
+
+    analysis = MonteCarloAEP(plant=plant_data, **analysis_kwargs)
+    with stage("run"):
+        analysis.run(num_sim=num_sim, progress_bar=False)
+    return analysis.results
+
+
+def _run_timed_shard(
+    file_path: Optional[str],
+    num_sim: int,
+    seed: int,
+    analysis_kwargs: Dict[str, Any],
+) -> Tuple[Any, Dict[str, float]]:
+    """Run one shard inside a worker process, returning its results and stage seconds."""
+    with collect_timings() as timer:
+        results = _run_shard(file_path, num_sim, seed, analysis_kwargs)
+    return results, timer.stages
+
+
+@contextmanager
+def run_shards_in_process():
+    """Run shards serially in the calling thread, in the current context.
+
+    Used when profiling: profilers, stage timers and context variables such
+    as ``bypass_plant_data_cache`` only see work done in this thread. The
+    merged results are the same, but the shards seed the global RNGs of
+    this process, which other analyses running in it share.
+    """
+    token = _in_process.set(True)
+    try:
+        yield
+    finally:
+        _in_process.reset(token)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            settings = get_settings()
+            workers = settings.aep_shard_workers or os.cpu_count() or 1
+            logger.info(f"Starting AEP shard pool with {workers} processes")
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def run_sharded_monte_carlo(
+    iterations: int,
+    seed: int,
+    num_shards: int,
+    file_path: Optional[str] = None,
+    **analysis_kwargs
+):
+    """Run MonteCarloAEP split across worker processes and merge the results.
+
+    Stages timed in the shards (``load``, ``run``, ...) are added to the
+    active stage timer as their mean across shards.
+
+    Args:
+        iterations: Total number of Monte Carlo simulations.
+        seed: Seed from which every shard's RNG stream is derived.
+        num_shards: Number of shards to split the simulations into.
+        file_path: Optional path to uploaded data file. If None, uses default dataset.
+        **analysis_kwargs: Keyword arguments for the MonteCarloAEP constructor.
+
+    Returns:
+        pandas.DataFrame: One row per simulation, in shard order.
+    """
+    import pandas as pd
+
+    sizes = split_simulations(iterations, num_shards)
+    seeds = shard_seeds(seed, len(sizes))
+    logger.info(f"Running {iterations} AEP simulations in {len(sizes)} shards (seed={seed})")
+
+    if _in_process.get():
+        return pd.concat(
+            [_run_shard(file_path, size, shard_seed, analysis_kwargs) for size, shard_seed in zip(sizes, seeds)],
+            ignore_index=True,
+        )
+
+    pool = _get_pool()
+    futures = [
+        pool.submit(_run_timed_shard, file_path, size, shard_seed, analysis_kwargs)
+        for size, shard_seed in zip(sizes, seeds)
+    ]
+    shards = [future.result() for future in futures]
+
+    # Shards run in parallel: report a typical shard's stages, nested in the caller's
+    timer = active_timer()
+    if timer is not None:
+        for name in dict.fromkeys(name for _, stages in shards for name in stages):
+            timer.add_nested(name, sum(stages.get(name, 0.0) for _, stages in shards) / len(shards))
+    return pd.concat([results for results, _ in shards], ignore_index=True)
+
+
+def shutdown() -> None:
+    """Shut down the shard pool. A new pool is created on next use."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            logger.info("Shutting down AEP shard pool")
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
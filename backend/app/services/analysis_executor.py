@@ -0,0 +1,253 @@
+"""Bounded worker pool for running analyses off the event loop.
+
+OpenOA analyses are synchronous and CPU-bound. Running them inline in an
+``async def`` route blocks the uvicorn event loop, so health checks and
+uploads stall for the duration of a Monte Carlo run. This module dispatches
+analyses to a thread or process pool and limits how many analyses of each
+type may run at once.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from app.core.config import get_settings
+from app.services import metrics
+from app.services.aep_sharding import run_shards_in_process
+from app.services.plant_data_cache import bypass_plant_data_cache
+from app.services.prewarm import import_analysis_modules
+from app.services.profiling import ProfileRequest, run_profiled
+from app.services.result_cache import bypass_result_cache
+from app.services.stage_timer import TimedResult, collect_timings
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+def _call_service(
+    method_name: str,
+    kwargs: Dict[str, Any],
+    profile: Optional[ProfileRequest] = None,
+) -> TimedResult:
+    """Call an OpenOAService method inside a worker, timing its stages.
+
+    Module-level so it can be pickled for process pools. Each worker process
+    uses its own service singleton (and PlantData cache).
+    """
+    from app.services.openoa_service import openoa_service
+
+    method = getattr(openoa_service, method_name)
+    with collect_timings() as timer:
+        if profile is None:
+            result = method(**kwargs)
+        else:
+            if profile.mode == "memory":
+                # Imported up front: tracing module objects would slow snapshots and hide the data
+                import_analysis_modules()
+            # Cached results and PlantData would leave the loads and the analysis unprofiled,
+            # and AEP shards in the shard pool would leave it in other processes
+            with bypass_result_cache(), bypass_plant_data_cache(), run_shards_in_process():
+                result = run_profiled(lambda: method(**kwargs), profile)
+    return TimedResult(result, timer.to_milliseconds())
+
+
+class AnalysisExecutor:
+    """Runs OpenOAService methods in a bounded worker pool.
+
+    Each analysis type gets an asyncio semaphore so a burst of one type of
+    analysis cannot occupy every worker.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        limits: Optional[Dict[str, int]] = None,
+        default_limit: int = 2,
+    ):
+        """Initialize the executor.
+
+        Args:
+            kind: "thread" or "process".
+            max_workers: Size of the worker pool.
+            limits: Maximum concurrent runs per analysis type.
+            default_limit: Limit for analysis types not listed in ``limits``.
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind: {kind}. Expected one of {EXECUTOR_KINDS}")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self._pool: Optional[Executor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}
+
+    async def run(self, analysis_type: str, method_name: str, **kwargs) -> Dict[str, Any]:
+        """Run an OpenOAService method in the pool and await its result.
+
+        Args:
+            analysis_type: Analysis type used for concurrency limiting (e.g. "aep").
+            method_name: Name of the OpenOAService method to call.
+            **kwargs: Keyword arguments for the method.
+
+        Returns:
+            dict: The method's return value.
+        """
+        return (await self.run_timed(analysis_type, method_name, **kwargs)).result
+
+    async def run_timed(
+        self,
+        analysis_type: str,
+        method_name: str,
+        profile: Optional[ProfileRequest] = None,
+        **kwargs
+    ) -> TimedResult:
+        """Like :meth:`run`, also returning the milliseconds spent per stage.
+
+        Besides the service's own stages, the timings include ``queue``
+        (waiting for the concurrency limit) and ``total`` (wall time).
+
+        Cancelling the caller cancels an analysis still queued in the pool.
+        A started analysis cannot be interrupted: the call then waits for it
+        to finish before raising ``CancelledError``, and its concurrency slot
+        stays taken until it does.
+
+        Args:
+            analysis_type: Analysis type used for concurrency limiting (e.g. "aep").
+            method_name: Name of the OpenOAService method to call.
+            profile: Run under a profiler and store the profile, bypassing
+                the result and in-memory PlantData caches.
+            **kwargs: Keyword arguments for the method.
+
+        Returns:
+            TimedResult: The method's return value and stage timings.
+        """
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore(analysis_type, loop)
+
+        self._waiting[analysis_type] = self._waiting.get(analysis_type, 0) + 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting[analysis_type] -= 1
+
+        queued = time.perf_counter() - start
+
+        mode = "mock" if get_settings().use_mock_data else "real"
+        self._running[analysis_type] = self._running.get(analysis_type, 0) + 1
+        try:
+            future = self._get_pool().submit(_call_service, method_name, kwargs, profile)
+        except BaseException:
+            self._release(analysis_type, semaphore)
+            raise
+        # A started worker cannot be interrupted, so the slot is held until it
+        # finishes rather than until the caller stops waiting
+        future.add_done_callback(functools.partial(self._release_threadsafe, loop, analysis_type, semaphore))
+
+        try:
+            result, timings = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Queued work was cancelled with the wrapper; wait for a started worker
+            # so the caller does not finish while the analysis still runs
+            if not future.done():
+                await asyncio.wait([asyncio.wrap_future(future)])
+            raise
+        except Exception:
+            metrics.analyses_total.inc(analysis_type=analysis_type, mode=mode, status="failed")
+            raise
+
+        elapsed = time.perf_counter() - start
+        metrics.analysis_duration_seconds.observe(elapsed, analysis_type=analysis_type, mode=mode)
+        metrics.analyses_total.inc(analysis_type=analysis_type, mode=mode, status="completed")
+
+        timings = {"queue": round(queued * 1000, 1), **timings}
+        timings["total"] = round(elapsed * 1000, 1)
+        return TimedResult(result, timings)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool configuration and per-type running/waiting counts.
+
+        Returns:
+            dict: Executor statistics.
+        """
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "running": dict(self._running),
+            "waiting": dict(self._waiting),
+        }
+
+    def _release(self, analysis_type: str, semaphore: asyncio.Semaphore) -> None:
+        self._running[analysis_type] -= 1
+        semaphore.release()
+
+    def _release_threadsafe(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        analysis_type: str,
+        semaphore: asyncio.Semaphore,
+        _future: Future,
+    ) -> None:
+        # Done callbacks run in the worker thread (or the pool's management thread)
+        try:
+            loop.call_soon_threadsafe(self._release, analysis_type, semaphore)
+        except RuntimeError:
+            # The loop is closed, and its semaphores with it
+            self._running[analysis_type] -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker pool. A new pool is created on next use."""
+        if self._pool is not None:
+            logger.info(f"Shutting down {self.kind} analysis pool")
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            logger.info(f"Starting {self.kind} analysis pool with {self.max_workers} workers")
+            if self.kind == "process":
+                # Spawn rather than fork: the API process runs threads that must not be copied
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="analysis"
+                )
+        return self._pool
+
+    def _get_semaphore(self, analysis_type: str, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        # Semaphores belong to an event loop; start afresh if the loop changed (e.g. in tests)
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphores = {}
+
+        if analysis_type not in self._semaphores:
+            limit = self.limits.get(analysis_type, self.default_limit)
+            self._semaphores[analysis_type] = asyncio.Semaphore(limit)
+        return self._semaphores[analysis_type]
+
+
+def _create_executor() -> AnalysisExecutor:
+    settings = get_settings()
+    return AnalysisExecutor(
+        kind=settings.analysis_executor,
+        max_workers=settings.analysis_max_workers,
+        limits=settings.analysis_concurrency_limits,
+        default_limit=settings.analysis_default_concurrency,
+    )
+
+
+# Singleton instance
+analysis_executor = _create_executor()
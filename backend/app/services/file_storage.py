@@ -1,20 +1,39 @@
 """
 File storage service for managing uploaded plant data files.
-Provides in-memory storage with session management.
+Files are kept on disk and registered in a SQLite registry shared by all workers.
+
+Uploads are content-addressed: the stored file is named after the SHA-256 of
+its content, so re-uploading the same data reuses the stored file, its
+columnar artifact and every cache keyed on it. Each upload still gets its
+own file_id, which is an alias for the shared file.
 """
+import hashlib
+import logging
 import os
 import shutil
+import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 from uuid import uuid4
 
+from app.core.config import get_settings
+from app.services.shared_plant_data import SHARED_PLANT_DATA_DIR, SharedPlantDataStore
+from app.services.upload_conversion import PARTIAL_SUFFIX, columnar_path, convert_upload
+from app.services.upload_registry import UploadRegistry
+
+logger = logging.getLogger(__name__)
+
 # Storage directory for uploaded files
 UPLOAD_DIR = Path(__file__).parent.parent.parent / "uploads"
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-# In-memory registry of uploaded files
-_file_registry: Dict[str, Dict[str, Any]] = {}
+# Persistent registry of uploaded files, kept next to the files it describes
+REGISTRY_FILENAME = ".registry.sqlite3"
+_registry = UploadRegistry(UPLOAD_DIR / REGISTRY_FILENAME)
+
+# Uses of an upload are recorded for LRU eviction at most this often
+TOUCH_INTERVAL = timedelta(minutes=5)
 
 # Default dataset identifier
 DEFAULT_DATASET_ID = "default_la_haute_borne"
@@ -36,39 +55,148 @@ class FileStorage:
         Returns:
             Unique file_id for the uploaded file
         """
-        # Generate unique file ID
+        file_id, partial_path = FileStorage.create_upload(filename)
+        with open(partial_path, 'wb') as f:
+            f.write(file_content)
+        
+        metadata = {**metadata, 'content_hash': hashlib.sha256(file_content).hexdigest()}
+        return FileStorage.commit_upload(file_id, filename, partial_path, metadata)
+    
+    @staticmethod
+    def create_upload(filename: str) -> Tuple[str, Path]:
+        """
+        Allocate a file_id and a temporary path to stream an upload into.
+        
+        Args:
+            filename: Original filename
+            
+        Returns:
+            Tuple of (file_id, partial file path). Pass both to commit_upload
+            once the file is complete.
+        """
         file_id = str(uuid4())
-        timestamp = datetime.now()
+        partial_path = UPLOAD_DIR / f"{file_id}{Path(filename).suffix}{PARTIAL_SUFFIX}"
+        return file_id, partial_path
+    
+    @staticmethod
+    def commit_upload(file_id: str, filename: str, partial_path: Path, metadata: Dict[str, Any]) -> str:
+        """
+        Register a completely written upload and move it into place.
         
-        # Determine file extension
-        file_ext = Path(filename).suffix
-        stored_filename = f"{file_id}{file_ext}"
-        file_path = UPLOAD_DIR / stored_filename
+        The file is stored as ``<content_hash><ext>``. If a file with the same
+        content is already stored, the new copy is discarded and the file_id
+        becomes an alias for the existing one. The file is registered first
+        so that orphan cleanup in another worker never sees it on disk
+        without a registry entry, and in the same registry transaction as
+        the check for an existing copy, so the janitor cannot delete that
+        copy in between.
         
-        # Save file to disk
-        with open(file_path, 'wb') as f:
-            f.write(file_content)
+        Args:
+            file_id: ID returned by create_upload
+            filename: Original filename
+            partial_path: Partial file path returned by create_upload
+            metadata: File metadata (row_count, columns, content_hash, etc.)
+            
+        Returns:
+            Unique file_id for the uploaded file
+        """
+        file_ext = Path(partial_path.name[:-len(PARTIAL_SUFFIX)]).suffix
+        file_path = partial_path.with_name(f"{metadata['content_hash']}{file_ext}")
+        with _registry.transaction():
+            shared = file_path.exists()
+            FileStorage._register_file(file_id, filename, file_path, metadata, partial_path.stat().st_size)
         
-        # Register in memory
-        _file_registry[file_id] = {
+        try:
+            if shared:
+                # Keep the existing file; replacing it would change its mtime and invalidate caches
+                partial_path.unlink()
+                logger.info(f"Upload {file_id} has the same content as {file_path.name}; stored once")
+            else:
+                os.replace(partial_path, file_path)
+        except OSError:
+            _registry.remove(file_id)
+            raise
+        
+        return file_id
+    
+    @staticmethod
+    def _register_file(
+        file_id: str,
+        filename: str,
+        file_path: Path,
+        metadata: Dict[str, Any],
+        size_bytes: int
+    ):
+        """Register a stored file. Old files are removed by the upload janitor."""
+        file_ext = file_path.suffix
+        artifact = columnar_path(str(file_path))
+        artifact_size = FileStorage._artifact_size(artifact)
+        
+        _registry.add({
             'file_id': file_id,
             'original_filename': filename,
             'stored_path': str(file_path),
             'file_type': file_ext.lstrip('.'),
-            'uploaded_at': timestamp,
+            'uploaded_at': datetime.now(),
             'metadata': metadata,
-        }
+            # Typed columnar copy: pending, converting, ready or failed;
+            # already ready when the content was uploaded and converted before
+            'columnar_status': 'pending' if artifact_size is None else 'ready',
+            'columnar_path': str(artifact),
+            'columnar_error': None,
+            # Disk usage of the upload and its columnar artifact, for the quota
+            'size_bytes': size_bytes + (artifact_size or 0),
+        })
+    
+    @staticmethod
+    def _artifact_size(artifact: Path) -> Optional[int]:
+        """Size of a columnar artifact, or None if it has not been written."""
+        try:
+            return artifact.stat().st_size
+        except FileNotFoundError:
+            return None
+    
+    @staticmethod
+    def convert_to_columnar(file_id: str) -> None:
+        """
+        Write the typed columnar artifact for an upload and record the outcome.
         
-        # Cleanup old files (older than 24 hours)
-        FileStorage._cleanup_old_files()
+        Blocking; runs as a background task after the upload response. Does
+        nothing if the shared artifact was already written for the same content.
         
-        return file_id
+        Args:
+            file_id: File to convert
+        """
+        file_info = _registry.get(file_id)
+        if not file_info or file_info['columnar_status'] == 'ready':
+            return
+        
+        artifact_size = FileStorage._artifact_size(Path(file_info['columnar_path']))
+        if artifact_size is not None:
+            _registry.update(file_id, columnar_status='ready', size_bytes=file_info['size_bytes'] + artifact_size)
+            return
+        
+        _registry.update(file_id, columnar_status='converting')
+        try:
+            artifact = convert_upload(file_info['stored_path'])
+        except Exception as e:
+            logger.warning(f"Columnar conversion of {file_id} failed: {e}")
+            _registry.update(file_id, columnar_status='failed', columnar_error=str(e))
+        else:
+            _registry.update(
+                file_id,
+                columnar_status='ready',
+                size_bytes=file_info['size_bytes'] + artifact.stat().st_size
+            )
     
     @staticmethod
     def get_file_path(file_id: Optional[str]) -> Optional[str]:
         """
         Get the file path for a given file_id.
         
+        Blocking (it may record the use in the registry); call it from a
+        worker thread.
+        
         Args:
             file_id: Unique file identifier (None means use default)
             
@@ -79,21 +207,43 @@ class FileStorage:
             # Return None to signal using default dataset
             return None
         
-        file_info = _file_registry.get(file_id)
+        file_info = _registry.get(file_id)
         if file_info and os.path.exists(file_info['stored_path']):
+            FileStorage._touch(file_info)
             return file_info['stored_path']
         
         return None
     
+    @staticmethod
+    def _touch(file_info: Dict[str, Any]):
+        """Record a use for LRU eviction, at most once per TOUCH_INTERVAL and never waiting for the write lock."""
+        last_accessed = file_info.get('last_accessed')
+        if last_accessed is not None and datetime.now() - last_accessed < TOUCH_INTERVAL:
+            return
+        try:
+            _registry.touch(file_info['file_id'], timeout=0)
+        except sqlite3.OperationalError as e:
+            logger.debug(f"Skipped recording use of {file_info['file_id']}: {e}")
+    
     @staticmethod
     def get_file_info(file_id: str) -> Optional[Dict[str, Any]]:
         """Get metadata for a file."""
-        return _file_registry.get(file_id)
+        return _registry.get(file_id)
     
     @staticmethod
     def list_files() -> Dict[str, Dict[str, Any]]:
         """List all registered files."""
-        return _file_registry.copy()
+        return _registry.all()
+    
+    @staticmethod
+    def count_files() -> int:
+        """Count registered files."""
+        return _registry.count()
+    
+    @staticmethod
+    def total_bytes() -> int:
+        """Bytes of stored files and artifacts, counting shared files once."""
+        return _registry.total_bytes()
     
     @staticmethod
     def delete_file(file_id: str) -> bool:
@@ -106,46 +256,99 @@ class FileStorage:
         Returns:
             True if deleted, False if not found
         """
-        file_info = _file_registry.get(file_id)
+        file_info = _registry.remove(file_id)
         if not file_info:
             return False
         
-        # Delete from disk
-        file_path = file_info['stored_path']
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
-        # Remove from registry
-        del _file_registry[file_id]
+        FileStorage._remove_from_disk(file_info)
         return True
     
     @staticmethod
-    def _cleanup_old_files(max_age_hours: int = 24):
+    def _remove_from_disk(file_info: Dict[str, Any]):
+        """Delete a file, its columnar artifact and its shared PlantData from disk, unless another upload shares them."""
+        # Deleting inside the transaction keeps a concurrent commit_upload from aliasing the file meanwhile
+        with _registry.transaction():
+            if _registry.is_referenced(file_info['stored_path']):
+                return
+            for file_path in (file_info['stored_path'], file_info.get('columnar_path')):
+                if file_path:
+                    Path(file_path).unlink(missing_ok=True)
+        
+        # Built PlantData snapshots are keyed on the stored file's name, its content hash
+        settings = get_settings()
+        SharedPlantDataStore(
+            Path(settings.plant_data_shared_dir or SHARED_PLANT_DATA_DIR)
+        ).remove_dataset(Path(file_info['stored_path']).stem)
+    
+    @staticmethod
+    def run_janitor(max_age_hours: int = 24, quota_bytes: Optional[int] = None) -> Dict[str, int]:
+        """
+        Remove expired uploads, enforce the disk quota and remove orphaned files.
+        
+        Blocking; run periodically by the upload janitor, off the request path.
+        
+        Args:
+            max_age_hours: Uploads older than this are removed
+            quota_bytes: Maximum total size of uploads; least recently used
+                uploads are evicted beyond it. None disables the quota.
+            
+        Returns:
+            Number of files removed for each reason
+        """
+        expired = FileStorage._cleanup_old_files(max_age_hours=max_age_hours)
+        evicted = FileStorage._enforce_quota(quota_bytes) if quota_bytes is not None else 0
+        return {"expired": expired, "evicted": evicted, "files_remaining": _registry.count()}
+    
+    @staticmethod
+    def _cleanup_old_files(max_age_hours: int = 24) -> int:
         """Remove files older than specified hours."""
         cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
         
-        files_to_delete = []
-        for file_id, info in _file_registry.items():
-            if info['uploaded_at'] < cutoff_time:
-                files_to_delete.append(file_id)
-        
-        for file_id in files_to_delete:
-            FileStorage.delete_file(file_id)
+        # Indexed range delete; the removed entries tell us which files to delete
+        expired = _registry.remove_older_than(cutoff_time)
+        for file_info in expired:
+            FileStorage._remove_from_disk(file_info)
         
         # Also clean up orphaned files on disk (files without registry entry)
-        FileStorage._cleanup_orphaned_files()
+        FileStorage._cleanup_orphaned_files(max_partial_age_hours=max_age_hours)
+        return len(expired)
+    
+    @staticmethod
+    def _enforce_quota(quota_bytes: int) -> int:
+        """Evict least recently used uploads until the total size fits the quota."""
+        excess = _registry.total_bytes() - quota_bytes
+        if excess <= 0:
+            return 0
+        
+        evicted = _registry.remove_least_recently_used(excess)
+        for file_info in evicted:
+            FileStorage._remove_from_disk(file_info)
+        logger.info(f"Evicted {len(evicted)} uploads to stay within the {quota_bytes} byte quota")
+        return len(evicted)
     
     @staticmethod
-    def _cleanup_orphaned_files():
-        """Remove files on disk that have no registry entry."""
+    def _cleanup_orphaned_files(max_partial_age_hours: int = 24):
+        """Remove files on disk that have no registry entry.
+        
+        Partial uploads are only removed once they are older than
+        max_partial_age_hours, since they may still be being written.
+        """
         if not UPLOAD_DIR.exists():
             return
         
-        registered_paths = {info['stored_path'] for info in _file_registry.values()}
+        registered_paths = _registry.paths()
+        partial_cutoff = (datetime.now() - timedelta(hours=max_partial_age_hours)).timestamp()
         
         for file_path in UPLOAD_DIR.iterdir():
+            if file_path.name.startswith(REGISTRY_FILENAME):
+                continue  # The registry database and its WAL files
             if file_path.is_file() and str(file_path) not in registered_paths:
                 try:
-                    file_path.unlink()
+                    if file_path.name.endswith(PARTIAL_SUFFIX) and file_path.stat().st_mtime > partial_cutoff:
+                        continue
+                    # The snapshot may predate a commit_upload; check again under the write lock
+                    with _registry.transaction():
+                        if not _registry.is_registered_path(str(file_path)):
+                            file_path.unlink()
                 except Exception:
                     pass  # Ignore errors for orphaned file cleanup
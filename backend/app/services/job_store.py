@@ -0,0 +1,215 @@
+"""In-process store for asynchronous analysis jobs.
+
+Long analyses can outlive proxy request timeouts. Jobs let a client submit
+an analysis, receive its id straight away, and poll for the result. Jobs are
+kept in memory with a bounded size, and finished jobs expire after a TTL.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from app.core.config import get_settings
+from app.models.schemas import AnalysisResponse
+from app.services.stage_timer import TimedResult
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("pending", "running", "cancelling")
+
+
+class JobStoreFullError(RuntimeError):
+    """Raised when every job slot is held by an unfinished job."""
+
+
+class JobStore:
+    """Bounded, TTL-expiring store of analysis jobs.
+
+    Must only be used from the event loop thread.
+    """
+
+    def __init__(self, max_jobs: int = 1000, ttl_seconds: int = 3600):
+        """Initialize the store.
+
+        Args:
+            max_jobs: Maximum number of jobs kept, finished or not.
+            ttl_seconds: How long finished jobs are kept before expiring.
+        """
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._jobs: "OrderedDict[str, AnalysisResponse]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._finished_at: Dict[str, float] = {}
+
+    def submit(
+        self,
+        job_id: str,
+        run: Callable[[], Awaitable[Union[Dict[str, Any], TimedResult]]],
+    ) -> AnalysisResponse:
+        """Schedule an analysis as a background task.
+
+        Args:
+            job_id: Unique job (analysis) id.
+            run: Zero-argument coroutine function that performs the analysis.
+                If it returns a TimedResult, the timings are kept on the job.
+
+        Returns:
+            AnalysisResponse: The pending job.
+
+        Raises:
+            JobStoreFullError: If the store is full of unfinished jobs.
+        """
+        self._purge_expired()
+        self._make_room()
+
+        job = AnalysisResponse(id=job_id, status="pending", created_at=datetime.now())
+        self._jobs[job_id] = job
+        self._tasks[job_id] = asyncio.create_task(self._run(job, run))
+        return job
+
+    def record(self, job: AnalysisResponse) -> None:
+        """Keep a finished (synchronous) analysis so later requests can refer to it.
+
+        The analysis expires after the TTL like any finished job. Nothing is
+        recorded if the store is full of unfinished jobs.
+
+        Args:
+            job: Finished analysis.
+        """
+        self._purge_expired()
+        try:
+            self._make_room()
+        except JobStoreFullError:
+            logger.warning(f"Job store full; analysis {job.id} not recorded")
+            return
+
+        self._jobs[job.id] = job
+        self._finished_at[job.id] = time.monotonic()
+
+    def get(self, job_id: str) -> Optional[AnalysisResponse]:
+        """Look up a job.
+
+        Args:
+            job_id: Job id returned by :meth:`submit`.
+
+        Returns:
+            AnalysisResponse or None if unknown or expired.
+        """
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[AnalysisResponse]:
+        """Cancel an unfinished job, or forget a finished one.
+
+        Cancelling stops waiting for the analysis; it cannot interrupt one a
+        worker has started. Such a job reports "cancelling", and keeps its
+        analysis type's concurrency slot, until the worker finishes and the
+        job becomes "cancelled". Jobs not yet started are cancelled at once.
+        Cancelled jobs stay in the store until they expire, so pollers can
+        see what happened.
+
+        Args:
+            job_id: Job id returned by :meth:`submit`.
+
+        Returns:
+            AnalysisResponse or None if unknown or expired.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+
+        if job.status == "running":
+            job.status = "cancelling"
+            job.error = "Cancelled by client"
+            task = self._tasks.get(job_id)
+            if task is not None:
+                task.cancel()
+            logger.info(f"Analysis job {job_id} cancelling")
+        elif job.status == "pending":
+            task = self._tasks.pop(job_id, None)
+            if task is not None:
+                task.cancel()
+            self._finish(job, "cancelled", error="Cancelled by client")
+            logger.info(f"Analysis job {job_id} cancelled")
+        elif job.status != "cancelling":
+            self._remove(job_id)
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        """Return job counts by status.
+
+        Returns:
+            dict: Number of jobs per status.
+        """
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    async def _run(
+        self,
+        job: AnalysisResponse,
+        run: Callable[[], Awaitable[Union[Dict[str, Any], TimedResult]]],
+    ) -> None:
+        job.status = "running"
+        try:
+            result = await run()
+        except asyncio.CancelledError:
+            # The analysis has stopped (or never started); its result is discarded
+            if job.status == "cancelling":
+                self._finish(job, "cancelled", error=job.error)
+                logger.info(f"Analysis job {job.id} cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Analysis job {job.id} failed: {e}", exc_info=True)
+            self._finish(job, "failed", error=str(e))
+        else:
+            if job.status == "running":
+                if isinstance(result, TimedResult):
+                    result, job.timings = result
+                job.result = result
+                self._finish(job, "completed")
+            elif job.status == "cancelling":
+                self._finish(job, "cancelled", error=job.error)
+        finally:
+            self._tasks.pop(job.id, None)
+
+    def _finish(self, job: AnalysisResponse, job_status: str, error: Optional[str] = None) -> None:
+        job.status = job_status
+        job.error = error
+        job.completed_at = datetime.now()
+        self._finished_at[job.id] = time.monotonic()
+
+    def _remove(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        self._finished_at.pop(job_id, None)
+        task = self._tasks.pop(job_id, None)
+        if task is not None:
+            task.cancel()
+
+    def _purge_expired(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [job_id for job_id, finished in self._finished_at.items() if finished < cutoff]
+        for job_id in expired:
+            self._remove(job_id)
+
+    def _make_room(self) -> None:
+        if len(self._jobs) < self.max_jobs:
+            return
+
+        # Drop the oldest finished jobs first; unfinished jobs are never evicted
+        for job_id in sorted(self._finished_at, key=self._finished_at.get):
+            self._remove(job_id)
+            if len(self._jobs) < self.max_jobs:
+                return
+
+        raise JobStoreFullError(f"Too many analysis jobs in progress (limit {self.max_jobs})")
+
+
+settings = get_settings()
+
+# Singleton instance
+job_store = JobStore(max_jobs=settings.job_store_max_jobs, ttl_seconds=settings.job_ttl_seconds)
@@ -0,0 +1,320 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+``GET /metrics`` renders everything registered here, so Prometheus (or
+``curl``) can scrape the API directly; no client library, agent or push
+gateway is needed. Hot-path metrics are counters and histograms updated
+with a dictionary lookup and a few additions under a per-metric lock.
+Gauges such as in-flight analyses, stored files and process memory are
+computed by callbacks at scrape time only, so they cost nothing between
+scrapes.
+
+Values are per process: with several uvicorn workers, each worker reports
+its own numbers.
+"""
+
+import abc
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Content type of the text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Analyses take from milliseconds (cached, mock) to many minutes (Monte Carlo)
+ANALYSIS_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+UPLOAD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[Dict[str, str], float]
+
+
+class _Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abc.abstractmethod
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        """Yield (sample name, labels, value) for every sample of the metric."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Add ``amount`` to the series identified by ``labels``."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current value of a series (0 if never incremented)."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: [count per bucket (the last is +Inf), sum of values]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation in the series identified by ``labels``."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels: str) -> int:
+        """Return the number of observations in a series."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[0]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            snapshot = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        for key, (counts, total) in snapshot.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose samples are computed when metrics are scraped."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Iterable[Sample]], kind: str = "gauge"):
+        super().__init__(name, documentation)
+        self.kind = kind
+        self._callback = callback
+
+    def samples(self):
+        for labels, value in self._callback():
+            yield self.name, labels, value
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric, replacing any metric with the same name."""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = ()
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(
+        self, name: str, documentation: str, callback: Callable[[], Iterable[Sample]], kind: str = "gauge"
+    ) -> CallbackGauge:
+        """Create and register a scrape-time gauge (or counter, with ``kind="counter"``).
+
+        Args:
+            name: Metric name.
+            documentation: Help text.
+            callback: Returns (labels, value) pairs when scraped.
+            kind: Exposition type of the samples.
+        """
+        return self.register(CallbackGauge(name, documentation, callback, kind))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format.
+
+        A failing scrape-time callback is logged and its metric skipped, so
+        one broken source does not hide the others.
+        """
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                logger.warning(f"Could not collect metric {metric.name}: {e}")
+                continue
+            lines.extend(metric.header())
+            for name, labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None if unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak, not current, RSS on platforms without /proc (kilobytes on Linux, bytes on macOS)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+_START_TIME = time.time()
+
+# Process-wide registry rendered by GET /metrics
+registry = MetricsRegistry()
+
+analysis_duration_seconds = registry.histogram(
+    "openoa_analysis_duration_seconds",
+    "Wall time of analyses, including time queued for a worker.",
+    ("analysis_type", "mode"),
+    ANALYSIS_BUCKETS,
+)
+analyses_total = registry.counter(
+    "openoa_analyses_total",
+    "Finished analyses by outcome.",
+    ("analysis_type", "mode", "status"),
+)
+upload_bytes_total = registry.counter(
+    "openoa_upload_bytes_total",
+    "Bytes received by the upload endpoints.",
+    ("method",),
+)
+uploads_total = registry.counter(
+    "openoa_uploads_total",
+    "Uploads stored.",
+    ("method",),
+)
+upload_duration_seconds = registry.histogram(
+    "openoa_upload_duration_seconds",
+    "Time spent receiving an upload (multipart) or one chunk (chunked).",
+    ("method",),
+    UPLOAD_BUCKETS,
+)
+
+
+def _analysis_gauge(field: str):
+    def collect():
+        from app.services.analysis_executor import analysis_executor
+
+        return [({"analysis_type": name}, count) for name, count in analysis_executor.stats()[field].items()]
+    return collect
+
+
+def _job_counts():
+    from app.services.job_store import job_store
+
+    return [({"status": name}, count) for name, count in job_store.stats().items()]
+
+
+def _stored_files():
+    from app.services.file_storage import FileStorage
+
+    return [({}, FileStorage.count_files())]
+
+
+def _stored_bytes():
+    from app.services.file_storage import FileStorage
+
+    return [({}, FileStorage.total_bytes())]
+
+
+def _cache_stat(cache_attribute: str, field: str):
+    def collect():
+        from app.core.config import get_settings
+        from app.services.openoa_service import openoa_service
+
+        # The caches used by process-mode analyses live in the worker processes
+        if get_settings().analysis_executor == "process":
+            return []
+        return [({}, getattr(openoa_service, cache_attribute).stats()[field])]
+    return collect
+
+
+# Help text suffix of the metrics _cache_stat drops in process mode
+_NOT_IN_PROCESS_MODE = " Not reported with ANALYSIS_EXECUTOR=process."
+
+
+def _process_rss():
+    rss = process_rss_bytes()
+    return [({}, rss)] if rss is not None else []
+
+
+registry.gauge("openoa_analyses_in_flight", "Analyses running in the worker pool.", _analysis_gauge("running"))
+registry.gauge("openoa_analyses_queued", "Analyses waiting for their concurrency limit.", _analysis_gauge("waiting"))
+registry.gauge("openoa_jobs", "Background analysis jobs kept, by status.", _job_counts)
+registry.gauge("openoa_stored_files", "Uploaded files registered in storage.", _stored_files)
+registry.gauge("openoa_stored_bytes", "Bytes of uploaded files and artifacts on disk.", _stored_bytes)
+registry.gauge("openoa_plant_data_cache_entries", "PlantData objects cached." + _NOT_IN_PROCESS_MODE, _cache_stat("_plant_cache", "entries"))
+registry.gauge("openoa_plant_data_cache_bytes", "Estimated size of cached PlantData." + _NOT_IN_PROCESS_MODE, _cache_stat("_plant_cache", "total_bytes"))
+registry.gauge("openoa_plant_data_cache_hits_total", "PlantData cache hits." + _NOT_IN_PROCESS_MODE, _cache_stat("_plant_cache", "hits"), "counter")
+registry.gauge("openoa_plant_data_cache_misses_total", "PlantData cache misses." + _NOT_IN_PROCESS_MODE, _cache_stat("_plant_cache", "misses"), "counter")
+registry.gauge("openoa_result_cache_hits_total", "Analysis result cache hits." + _NOT_IN_PROCESS_MODE, _cache_stat("_result_cache", "hits"), "counter")
+registry.gauge("openoa_result_cache_misses_total", "Analysis result cache misses." + _NOT_IN_PROCESS_MODE, _cache_stat("_result_cache", "misses"), "counter")
+registry.gauge("process_resident_memory_bytes", "Resident memory size in bytes.", _process_rss)
+registry.gauge("process_cpu_seconds_total", "User and system CPU time.", lambda: [({}, time.process_time())], "counter")
+registry.gauge("process_start_time_seconds", "Start time of the process since the Unix epoch.", lambda: [({}, _START_TIME)])
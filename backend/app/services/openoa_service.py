@@ -5,15 +5,28 @@ handling data loading, analysis execution, and result formatting.
 """
 
 import logging
-from typing import Optional, Dict, Any
+import math
+import secrets
+from typing import Optional, Dict, Any, List, Tuple, Union
 from pathlib import Path
 import json
 
 from app.core.config import get_settings
+from app.core import openoa_compat
+from app.core.lazy_imports import examples_path, get_dataset_loader
+from app.services.file_storage import DEFAULT_DATASET_ID
+from app.services.plant_data_cache import PlantDataCache, fingerprint_files, make_cache_key
+from app.services.result_cache import RESULT_CACHE_DIR, ResultCache, make_result_key
+from app.services.shared_plant_data import SHARED_PLANT_DATA_DIR, SharedPlantDataStore
+from app.services.stage_timer import stage
+from app.services.upload_conversion import load_columnar, normalize_scada_frame, read_upload_frame
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Uploads carry no plant metadata, so their PlantData gets a nominal capacity
+UPLOAD_PLANT_CAPACITY_MW = 1.0
+
 
 class OpenOAService:
     """Service for interacting with OpenOA library.
@@ -27,8 +40,20 @@ class OpenOAService:
     
     def __init__(self):
         """Initialize the OpenOA service."""
+        # Fixes for the installed OpenOA, applied when it is first imported
+        openoa_compat.install()
         self._sample_data: Optional[Any] = None
         self._plant_metadata: Optional[Dict[str, Any]] = None
+        self._plant_cache = PlantDataCache(
+            max_bytes=settings.plant_data_cache_max_mb * 1024 * 1024,
+            shared_store=SharedPlantDataStore(
+                Path(settings.plant_data_shared_dir or SHARED_PLANT_DATA_DIR)
+            ) if settings.plant_data_shared_store else None,
+        )
+        self._result_cache = ResultCache(
+            cache_dir=Path(settings.result_cache_dir or RESULT_CACHE_DIR) if settings.result_cache_enabled else None,
+            max_memory_entries=settings.result_cache_max_entries if settings.result_cache_enabled else 0,
+        )
     
     def get_sample_plant_metadata(self) -> Dict[str, Any]:
         """Get metadata for the sample wind plant.
@@ -91,6 +116,8 @@ class OpenOAService:
         self,
         iterations: int = 1000,
         file_path: Optional[str] = None,
+        seed: Optional[int] = None,
+        num_shards: Optional[int] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """Run AEP analysis (mock or real based on configuration).
@@ -100,18 +127,24 @@ class OpenOAService:
         Args:
             iterations: Number of Monte Carlo iterations to perform.
             file_path: Optional path to uploaded data file. If None, uses default dataset.
+            seed: Random seed. Results are reproducible for a given seed and shard count.
+            num_shards: Number of parallel shards. Defaults to the AEP_SHARDS setting.
             **kwargs: Additional parameters passed to the analysis method.
-            **kwargs: Additional analysis parameters.
             
         Returns:
-            dict: Analysis results with AEP estimate and uncertainty.
+            dict: Analysis results with AEP estimate and uncertainty, and the
+            ``dataset_id`` and ``dataset_fingerprint`` they were computed on.
         """
         if settings.use_mock_data:
             logger.info(f"Running MOCK AEP analysis with {iterations} iterations")
-            return self._run_mock_aep_analysis(iterations)
+            result = self._run_mock_aep_analysis(iterations)
         else:
             logger.info(f"Running REAL OpenOA AEP analysis with {iterations} iterations")
-            return self._run_real_aep_analysis(iterations, file_path, **kwargs)
+            result = self._run_real_aep_analysis(iterations, file_path, seed, num_shards, **kwargs)
+        
+        # Lets later requests (e.g. EYA gap) check they refer to the same data
+        dataset_id, fingerprint = self.get_dataset_identity(file_path)
+        return {**result, "dataset_id": dataset_id, "dataset_fingerprint": fingerprint}
         
         # Mock analysis results for demo
         # In production, this would call:
@@ -170,13 +203,21 @@ class OpenOAService:
         self,
         iterations: int,
         file_path: Optional[str] = None,
+        seed: Optional[int] = None,
+        num_shards: Optional[int] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """Run real OpenOA AEP analysis.
         
+        The simulations are split into shards that run in parallel worker
+        processes (serially in this thread when profiled), each with an RNG
+        stream derived from ``seed``.
+        
         Args:
             iterations: Number of Monte Carlo iterations.
             file_path: Optional path to uploaded data file.
+            seed: Random seed. A random one is drawn (and reported) if None.
+            num_shards: Number of shards. Defaults to the AEP_SHARDS setting.
             **kwargs: Additional analysis parameters.
             
         Returns:
@@ -187,50 +228,63 @@ class OpenOAService:
             Exception: If analysis fails.
         """
         try:
-            # Import OpenOA components
-            from openoa import PlantData
-            from openoa.analysis import MonteCarloAEP
+            from app.services.aep_sharding import run_sharded_monte_carlo
             
-            logger.info("Loading plant data for OpenOA analysis")
+            num_shards = num_shards or settings.aep_shards
             
-            # Load actual plant data (from file or default)
-            plant_data = self._load_real_plant_data(file_path)
-            
-            # Run the analysis
-            logger.info("Initializing MonteCarloAEP")
-            analysis = MonteCarloAEP(
-                plant=plant_data,
-                **kwargs
+            # An unseeded request accepts any previous draw for the same inputs
+            result_key = self._result_key(
+                "aep", file_path, seed, iterations=iterations, num_shards=num_shards, **kwargs
             )
+            # Most recent AEP result per dataset, reused by EYA gap analysis
+            latest_key = self._result_key("aep_latest", file_path, **kwargs)
+            cached = self._result_cache.get(result_key)
+            if cached is not None:
+                logger.info(f"Returning cached AEP result (seed={cached.get('seed')})")
+                self._result_cache.put(latest_key, cached)
+                return cached
+            
+            if seed is None:
+                seed = secrets.randbits(32)
             
+            # Run the analysis
             logger.info(f"Running AEP analysis with {iterations} iterations")
-            analysis.run(num_sim=iterations, progress_bar=False)
+            with stage("run"):
+                results_df = run_sharded_monte_carlo(
+                    iterations=iterations,
+                    seed=seed,
+                    num_shards=num_shards,
+                    file_path=file_path,
+                    **kwargs
+                )
             
-            # Extract results - analysis.results is a pandas DataFrame
-            results_df = analysis.results
+            # Extract results - one row per Monte Carlo simulation
             logger.info(f"Results columns: {list(results_df.columns)}")
-            logger.info(f"Results data:\n{results_df}")
+            with stage("extract"):
+                aep_mean = float(results_df['aep_GWh'].mean())
+                aep_std = float(results_df['aep_GWh'].std())
             
-            # Get the key metrics from the results DataFrame
-            # Extract available columns dynamically
-            result_dict = results_df.iloc[0].to_dict()
-            
-            # Get capacity from metadata
-            capacity_mw = plant_data.metadata.capacity if hasattr(plant_data, 'metadata') else 8.2  # La Haute Borne is 8.2 MW
+            # Shards load the plant data; the parent only needs the capacity
+            capacity_mw = self.get_plant_capacity(file_path)
+            hours_per_year = 8760
             
             # Map to our standard format
             result = {
-                "aep_gwh": round(float(result_dict.get('aep_GWh', 0)), 2),
-                "uncertainty_pct": round(float(result_dict.get('uncertainty_pct', result_dict.get('uncertainty', 0))), 2),
-                "capacity_factor": round(float(result_dict.get('avail_pct', result_dict.get('capacity_factor', 0))), 1),
+                "aep_gwh": round(aep_mean, 2),
+                "uncertainty_pct": round(aep_std / aep_mean * 100, 2) if aep_mean else 0.0,
+                "capacity_factor": round(aep_mean * 1000 / (capacity_mw * hours_per_year) * 100, 1),
                 "plant_capacity_mw": capacity_mw,
                 "analysis_type": "monte_carlo_aep_real",
                 "iterations": iterations,
+                "seed": seed,
+                "num_shards": num_shards,
                 "notes": "Real OpenOA analysis using Monte Carlo AEP method",
                 "raw_columns": list(results_df.columns)  # For debugging
             }
             
             logger.info(f"Analysis complete: AEP = {result['aep_gwh']} GWh")
+            self._result_cache.put(result_key, result)
+            self._result_cache.put(latest_key, result)
             return result
             
         except ImportError as e:
@@ -242,9 +296,30 @@ class OpenOAService:
             logger.error(f"OpenOA analysis failed: {e}", exc_info=True)
             raise
     
-    def _load_real_plant_data(self, file_path: Optional[str] = None):
+    def get_plant_capacity(self, file_path: Optional[str] = None) -> float:
+        """Read a dataset's plant capacity without loading its data.
+        
+        Args:
+            file_path: Optional path to uploaded data file. If None, uses default dataset.
+            
+        Returns:
+            float: Plant capacity in MW, as given to PlantData.
+        """
+        if file_path:
+            return UPLOAD_PLANT_CAPACITY_MW
+        
+        import yaml
+        
+        metadata_path = self._get_examples_path() / "data" / "plant_meta.yml"
+        with open(metadata_path, 'r') as f:
+            return float(yaml.safe_load(f)["capacity"])
+    
+    def load_plant_data(self, file_path: Optional[str] = None):
         """Load real plant data for OpenOA analysis.
         
+        PlantData objects are cached per dataset, loader options and
+        source-file fingerprint, so repeated analyses skip parsing and cleaning.
+        
         Args:
             file_path: Optional path to uploaded CSV/JSON file. If None, uses default dataset.
         
@@ -256,32 +331,24 @@ class OpenOAService:
             FileNotFoundError: If data files not found.
         """
         try:
-            from openoa import PlantData
-            import pandas as pd
+            dataset_id, fingerprint = self.get_dataset_identity(file_path)
             
             # If custom file provided, load it
             if file_path:
-                logger.info(f"Loading custom plant data from {file_path}")
-                return self._load_plant_data_from_file(file_path)
+                key = make_cache_key(dataset_id, {"loader": "upload"}, fingerprint)
+                with stage("load"):
+                    return self._plant_cache.get_or_load(
+                        key, lambda: self._load_plant_data_from_file(file_path)
+                    )
             
             # Otherwise use default La Haute Borne data
-            # Try to load from examples directory using project_ENGIE helper
-            examples_path = self._get_examples_path()
-            
-            # Import the ENGIE project helper
-            import sys
-            sys.path.insert(0, str(examples_path))
-            
-            from project_ENGIE import prepare
-            
-            logger.info(f"Loading La Haute Borne data from {examples_path}")
-            # Use the ENGIE prepare function which handles all data loading
-            plant = prepare(
-                path=examples_path / "data" / "la_haute_borne",
-                return_value="plantdata",
-                use_cleansed=False
-            )
-            return plant
+            data_path = self._get_examples_path() / "data" / "la_haute_borne"
+            options = {"return_value": "plantdata", "use_cleansed": settings.use_cleansed_snapshot}
+            key = make_cache_key(dataset_id, options, fingerprint)
+            with stage("load"):
+                return self._plant_cache.get_or_load(
+                    key, lambda: self._prepare_default_plant_data(data_path, **options)
+                )
                 
         except ImportError as e:
             logger.error(f"OpenOA or dependencies not installed: {e}")
@@ -290,6 +357,74 @@ class OpenOAService:
             logger.error(f"Failed to load plant data: {e}")
             raise
     
+    def _prepare_default_plant_data(self, data_path: Path, **options):
+        """Build the La Haute Borne PlantData with the ENGIE project helper.
+        
+        Args:
+            data_path: Path to the la_haute_borne data folder.
+            **options: Options passed to ``project_ENGIE.prepare``.
+            
+        Returns:
+            PlantData: OpenOA PlantData object.
+        """
+        prepare = get_dataset_loader("la_haute_borne")
+        
+        logger.info(f"Loading La Haute Borne data from {data_path}")
+        # Use the ENGIE prepare function which handles all data loading
+        return prepare(path=data_path, **options)
+    
+    def get_dataset_identity(self, file_path: Optional[str] = None) -> Tuple[str, str]:
+        """Identify a dataset by id and source-file fingerprint.
+        
+        Args:
+            file_path: Optional path to uploaded data file. If None, uses default dataset.
+            
+        Returns:
+            tuple: (dataset_id, fingerprint). For uploads the id is the stored
+            file's name, i.e. its content hash, so identical uploads share
+            cached PlantData and results; otherwise it is DEFAULT_DATASET_ID.
+        """
+        if file_path:
+            return Path(file_path).stem, fingerprint_files([Path(file_path)])
+        
+        data_path = self._get_examples_path() / "data" / "la_haute_borne"
+        return DEFAULT_DATASET_ID, fingerprint_files(self._get_default_source_files(data_path))
+    
+    def _result_key(
+        self,
+        analysis_type: str,
+        file_path: Optional[str] = None,
+        seed: Optional[int] = None,
+        **params
+    ) -> str:
+        """Build the result-cache key for an analysis on a dataset.
+        
+        Args:
+            analysis_type: Analysis type (e.g. "aep").
+            file_path: Optional path to uploaded data file. If None, uses default dataset.
+            seed: Random seed, or None if any previous draw is acceptable.
+            **params: Parameters that affect the computed result.
+            
+        Returns:
+            str: Cache key.
+        """
+        dataset_id, fingerprint = self.get_dataset_identity(file_path)
+        return make_result_key(analysis_type, params, seed, dataset_id, fingerprint)
+    
+    def _get_default_source_files(self, data_path: Path) -> list:
+        """List the raw files that feed the default dataset.
+        
+        Args:
+            data_path: Path to the la_haute_borne data folder.
+            
+        Returns:
+            list: Paths of the compressed archive and any extracted CSVs.
+        """
+        files = [data_path.with_suffix(".zip"), data_path.parent / "plant_meta.yml"]
+        if data_path.is_dir():
+            files.extend(data_path.glob("*.csv"))
+        return files
+    
     def _load_plant_data_from_file(self, file_path: str):
         """Load and validate uploaded plant data file.
         
@@ -308,137 +443,92 @@ class OpenOAService:
             
             logger.info(f"Loading plant data from uploaded file: {file_path}")
             
-            # Determine file type and read
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
-            elif file_path.endswith('.json'):
-                df = pd.read_json(file_path)
+            # Use the typed columnar artifact written at ingest time when available
+            df = load_columnar(file_path)
+            if df is not None:
+                logger.info(f"Loaded {len(df)} rows from columnar artifact")
             else:
-                raise ValueError(f"Unsupported file type: {file_path}")
-            
-            logger.info(f"Loaded {len(df)} rows with columns: {list(df.columns)}")
-            
-            # Case-insensitive column mapping for flexible CSV uploads
-            # Create a mapping from lowercase column names to actual column names
-            df_cols_lower = {col.lower(): col for col in df.columns}
-            
-            # Define column mappings (all lowercase for case-insensitive matching)
-            col_mapping = {
-                'time': ['date_time', 'timestamp', 'datetime', 'date', 'time'],
-                'WTUR_W': ['p_avg', 'power', 'power_kw', 'wtur_w', 'activepower'],
-                'WMET_HorWdSpd': ['ws_avg', 'wind_speed', 'windspeed', 'wind_spd', 'wmet_horwdspd', 'ws']
-            }
-            
-            # Attempt to map columns (case-insensitive)
-            for target_col, alt_names in col_mapping.items():
-                if target_col not in df.columns:
-                    for alt_name_lower in alt_names:
-                        if alt_name_lower in df_cols_lower:
-                            actual_col = df_cols_lower[alt_name_lower]
-                            df.rename(columns={actual_col: target_col}, inplace=True)
-                            logger.info(f"Mapped column '{actual_col}' to '{target_col}'")
-                            break
-            
-            # Validate required columns for OpenOA
-            required_cols = ['time', 'WTUR_W', 'WMET_HorWdSpd']
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            
-            if missing_cols:
-                raise ValueError(
-                    f"Missing required columns: {missing_cols}. "
-                    f"Available: {list(df.columns)}. "
-                    f"Required: time, WTUR_W (power), WMET_HorWdSpd (wind speed)"
-                )
-            
-            # Convert time column to datetime with UTC timezone
-            if 'time' in df.columns:
-                df['time'] = pd.to_datetime(df['time'], utc=True)
-            
-            # Ensure we have a turbine identifier column
-            if 'asset_id' not in df.columns and 'turbine' not in df.columns:
-                # If no turbine column, create from Wind_turbine_name or use default
-                if 'Wind_turbine_name' in df.columns:
-                    df['asset_id'] = df['Wind_turbine_name']
-                else:
-                    df['asset_id'] = 'TURBINE_01'
-            elif 'turbine' in df.columns:
-                df['asset_id'] = df['turbine']
-            
-            # Create minimal asset table
-            turbine_ids = df['asset_id'].unique() if 'asset_id' in df.columns else ['TURBINE_01']
-            asset_df = pd.DataFrame({
-                'asset_id': turbine_ids,
-                'type': ['turbine'] * len(turbine_ids),
-                'latitude': [0.0] * len(turbine_ids),
-                'longitude': [0.0] * len(turbine_ids),
-            })
-            
-            # Create minimal meter dataframe (required by PlantData)
-            meter_df = pd.DataFrame({
-                'time': df['time'],
-                'MMTR_SupWh': 0.0
-            })
-            
-            # Create minimal curtailment dataframe (required by PlantData)
-            curtail_df = pd.DataFrame({
-                'time': df['time'],
-                'IAVL_DnWh': 0.0,
-                'IAVL_ExtPwrDnWh': 0.0
-            })
-            
-            # Create minimal reanalysis dataframe (required by PlantData)
-            reanalysis_df = pd.DataFrame({
-                'time': df['time'],
-                'WMETR_HorWdSpd': df['WMET_HorWdSpd'] if 'WMET_HorWdSpd' in df.columns else 0.0,
-                'WMETR_AirDen': 1.225
-            })
-            
-            # Create metadata dictionary for PlantData
-            metadata = {
-                'latitude': 0.0,
-                'longitude': 0.0,
-                'capacity': 1.0,
-                'asset': {
-                    'asset_id': 'asset_id',
-                    'latitude': 'latitude',
-                    'longitude': 'longitude',
-                },
-                'scada': {
-                    'time': 'time',
-                    'asset_id': 'asset_id',
-                    'WTUR_W': 'WTUR_W',
-                    'WMET_HorWdSpd': 'WMET_HorWdSpd',
-                    'frequency': '10min'
-                },
-                'meter': {
-                    'time': 'time',
-                    'MMTR_SupWh': 'MMTR_SupWh'
-                },
-                'curtail': {
-                    'time': 'time',
-                    'IAVL_DnWh': 'IAVL_DnWh',
-                    'IAVL_ExtPwrDnWh': 'IAVL_ExtPwrDnWh'
-                },
-                'reanalysis': {
-                    'era5': {
+                df = read_upload_frame(file_path)
+                logger.info(f"Loaded {len(df)} rows with columns: {list(df.columns)}")
+                with stage("clean"):
+                    df = normalize_scada_frame(df)
+            
+            with stage("build_plant_data"):
+                # Create minimal asset table
+                turbine_ids = df['asset_id'].unique() if 'asset_id' in df.columns else ['TURBINE_01']
+                asset_df = pd.DataFrame({
+                    'asset_id': turbine_ids,
+                    'type': ['turbine'] * len(turbine_ids),
+                    'latitude': [0.0] * len(turbine_ids),
+                    'longitude': [0.0] * len(turbine_ids),
+                })
+            
+                # Create minimal meter dataframe (required by PlantData)
+                meter_df = pd.DataFrame({
+                    'time': df['time'],
+                    'MMTR_SupWh': 0.0
+                })
+            
+                # Create minimal curtailment dataframe (required by PlantData)
+                curtail_df = pd.DataFrame({
+                    'time': df['time'],
+                    'IAVL_DnWh': 0.0,
+                    'IAVL_ExtPwrDnWh': 0.0
+                })
+            
+                # Create minimal reanalysis dataframe (required by PlantData)
+                reanalysis_df = pd.DataFrame({
+                    'time': df['time'],
+                    'WMETR_HorWdSpd': df['WMET_HorWdSpd'] if 'WMET_HorWdSpd' in df.columns else 0.0,
+                    'WMETR_AirDen': 1.225
+                })
+            
+                # Create metadata dictionary for PlantData
+                metadata = {
+                    'latitude': 0.0,
+                    'longitude': 0.0,
+                    'capacity': UPLOAD_PLANT_CAPACITY_MW,
+                    'asset': {
+                        'asset_id': 'asset_id',
+                        'latitude': 'latitude',
+                        'longitude': 'longitude',
+                    },
+                    'scada': {
                         'time': 'time',
-                        'WMETR_HorWdSpd': 'WMETR_HorWdSpd',
-                        'WMETR_AirDen': 'WMETR_AirDen',
+                        'asset_id': 'asset_id',
+                        'WTUR_W': 'WTUR_W',
+                        'WMET_HorWdSpd': 'WMET_HorWdSpd',
                         'frequency': '10min'
+                    },
+                    'meter': {
+                        'time': 'time',
+                        'MMTR_SupWh': 'MMTR_SupWh'
+                    },
+                    'curtail': {
+                        'time': 'time',
+                        'IAVL_DnWh': 'IAVL_DnWh',
+                        'IAVL_ExtPwrDnWh': 'IAVL_ExtPwrDnWh'
+                    },
+                    'reanalysis': {
+                        'era5': {
+                            'time': 'time',
+                            'WMETR_HorWdSpd': 'WMETR_HorWdSpd',
+                            'WMETR_AirDen': 'WMETR_AirDen',
+                            'frequency': '10min'
+                        }
                     }
                 }
-            }
             
-            # Create PlantData object with proper initialization
-            plant_data = PlantData(
-                analysis_type="MonteCarloAEP",
-                metadata=metadata,
-                scada=df,
-                meter=meter_df,
-                curtail=curtail_df,
-                asset=asset_df,
-                reanalysis={'era5': reanalysis_df}
-            )
+                # Create PlantData object with proper initialization
+                plant_data = PlantData(
+                    analysis_type="MonteCarloAEP",
+                    metadata=metadata,
+                    scada=df,
+                    meter=meter_df,
+                    curtail=curtail_df,
+                    asset=asset_df,
+                    reanalysis={'era5': reanalysis_df}
+                )
             
             logger.info(f"Successfully created PlantData from uploaded file")
             return plant_data
@@ -449,20 +539,7 @@ class OpenOAService:
     
     def _get_examples_path(self) -> Path:
         """Locate the examples directory that ships with the backend."""
-        current_file = Path(__file__).resolve()
-
-        # Primary expected location: backend/examples
-        candidates = [
-            current_file.parents[2] / "examples",  # .../backend/examples
-            current_file.parents[3] / "examples",  # .../repo/examples (fallback)
-        ]
-
-        for path in candidates:
-            if path.exists():
-                return path
-
-        searched = ", ".join(str(p) for p in candidates)
-        raise FileNotFoundError(f"Examples directory not found. Checked: {searched}")
+        return examples_path()
     
     def _get_mock_metadata(self) -> Dict[str, Any]:
         """Get mock plant metadata for when real data is unavailable.
@@ -525,30 +602,16 @@ class OpenOAService:
             "notes": "Mock analysis for demonstration - USE_MOCK_DATA=True"
         }
     
-    def _run_real_electrical_losses(self, loss_threshold_pct: float, **kwargs) -> Dict[str, Any]:
+    def _run_real_electrical_losses(self, loss_threshold_pct: float, file_path: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """Real OpenOA electrical losses analysis."""
         try:
-            from openoa.analysis import ElectricalLosses
-            
-            logger.info("Loading plant data for electrical losses analysis")
-            plant_data = self._load_real_plant_data()
-            
-            logger.info("Initializing ElectricalLosses analysis")
-            analysis = ElectricalLosses(plant=plant_data, **kwargs)
-            
-            logger.info("Running electrical losses analysis")
-            analysis.run()
-            
-            # ElectricalLosses stores results in electrical_losses attribute
-            # Returns array of results, take first element if not UQ, or mean if UQ
-            if hasattr(analysis.electrical_losses, '__iter__'):
-                # UQ mode returns array
-                total_loss_pct = float(analysis.electrical_losses.mean() * 100)
-            else:
-                # Non-UQ mode
-                total_loss_pct = float(analysis.electrical_losses[0][0] * 100)
-            
-            capacity_mw = plant_data.metadata.capacity if hasattr(plant_data, 'metadata') else 8.2
+            # The threshold is only applied to the computed loss, so it is not part of the key
+            result_key = self._result_key("electrical_losses", file_path, **kwargs)
+            computed = self._result_cache.get_or_compute(
+                result_key, lambda: self._compute_electrical_losses(file_path, **kwargs)
+            )
+            total_loss_pct = computed["total_loss_pct"]
+            capacity_mw = computed["plant_capacity_mw"]
             
             return {
                 "total_loss_pct": round(total_loss_pct, 2),
@@ -564,11 +627,41 @@ class OpenOAService:
             logger.error(f"Electrical losses analysis failed: {e}", exc_info=True)
             raise
     
+    def _compute_electrical_losses(self, file_path: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Run OpenOA ElectricalLosses and return the cacheable computed values."""
+        from openoa.analysis import ElectricalLosses
+        
+        logger.info("Loading plant data for electrical losses analysis")
+        plant_data = self.load_plant_data(file_path)
+        
+        logger.info("Initializing ElectricalLosses analysis")
+        with stage("validate"):
+            analysis = ElectricalLosses(plant=plant_data, **kwargs)
+        
+        logger.info("Running electrical losses analysis")
+        with stage("run"):
+            analysis.run()
+        
+        # ElectricalLosses stores results in electrical_losses attribute
+        # Returns array of results, take first element if not UQ, or mean if UQ
+        with stage("extract"):
+            if hasattr(analysis.electrical_losses, '__iter__'):
+                # UQ mode returns array
+                total_loss_pct = float(analysis.electrical_losses.mean() * 100)
+            else:
+                # Non-UQ mode
+                total_loss_pct = float(analysis.electrical_losses[0][0] * 100)
+        
+        capacity_mw = plant_data.metadata.capacity if hasattr(plant_data, 'metadata') else 8.2
+        
+        return {"total_loss_pct": total_loss_pct, "plant_capacity_mw": capacity_mw}
+    
     def run_wake_losses_analysis(self, bin_width: float = 1.0, file_path: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """Run wake losses analysis (mock or real based on configuration).
         
         Args:
             bin_width: Wind speed bin width in m/s.
+            file_path: Optional path to uploaded data file.
             **kwargs: Additional analysis parameters.
             
         Returns:
@@ -579,7 +672,7 @@ class OpenOAService:
             return self._run_mock_wake_losses(bin_width)
         else:
             logger.info(f"Running REAL OpenOA wake losses analysis")
-            return self._run_real_wake_losses(bin_width, **kwargs)
+            return self._run_real_wake_losses(bin_width, file_path, **kwargs)
     
     def _run_mock_wake_losses(self, bin_width: float) -> Dict[str, Any]:
         """Mock wake losses analysis."""
@@ -598,33 +691,43 @@ class OpenOAService:
             "notes": "Mock analysis for demonstration - USE_MOCK_DATA=True"
         }
     
-    def _run_real_wake_losses(self, bin_width: float, **kwargs) -> Dict[str, Any]:
+    def _run_real_wake_losses(self, bin_width: float, file_path: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """Real OpenOA wake losses analysis."""
         try:
             from openoa.analysis import WakeLosses
             
+            # bin_width is not used by the OpenOA analysis, so it is not part of the key
+            result_key = self._result_key("wake_losses", file_path, **kwargs)
+            cached = self._result_cache.get(result_key)
+            if cached is not None:
+                logger.info("Returning cached wake losses result")
+                return cached
+            
             logger.info("Loading plant data for wake losses analysis")
-            plant_data = self._load_real_plant_data()
+            plant_data = self.load_plant_data(file_path)
             
             logger.info("Initializing WakeLosses analysis")
-            analysis = WakeLosses(plant=plant_data, **kwargs)
+            with stage("validate"):
+                analysis = WakeLosses(plant=plant_data, **kwargs)
             
             logger.info("Running wake losses analysis")
-            analysis.run()
+            with stage("run"):
+                analysis.run()
             
             # WakeLosses stores results in wake_losses_por and wake_losses_lt attributes
             # These can be scalars or arrays depending on UQ mode
             import numpy as np
             
             # Handle both array and scalar results
-            if hasattr(analysis, 'wake_losses_lt'):
-                wake_lt = analysis.wake_losses_lt
-                wake_loss_pct = float(np.mean(wake_lt) * 100 if hasattr(wake_lt, '__iter__') else wake_lt * 100)
-            else:
-                wake_loss_pct = None
-            
-            wake_por = analysis.wake_losses_por
-            por_wake_loss_pct = float(np.mean(wake_por) * 100 if hasattr(wake_por, '__iter__') else wake_por * 100)
+            with stage("extract"):
+                if hasattr(analysis, 'wake_losses_lt'):
+                    wake_lt = analysis.wake_losses_lt
+                    wake_loss_pct = float(np.mean(wake_lt) * 100 if hasattr(wake_lt, '__iter__') else wake_lt * 100)
+                else:
+                    wake_loss_pct = None
+                
+                wake_por = analysis.wake_losses_por
+                por_wake_loss_pct = float(np.mean(wake_por) * 100 if hasattr(wake_por, '__iter__') else wake_por * 100)
             
             # Use long-term corrected if available, otherwise period-of-record
             if wake_loss_pct is None:
@@ -632,13 +735,15 @@ class OpenOAService:
             
             capacity_mw = plant_data.metadata.capacity if hasattr(plant_data, 'metadata') else 8.2
             
-            return {
+            result = {
                 "wake_loss_pct": round(wake_loss_pct, 2),
                 "por_wake_loss_pct": round(por_wake_loss_pct, 2),
                 "plant_capacity_mw": capacity_mw,
                 "analysis_type": "wake_losses_real",
                 "notes": "Real OpenOA wake losses analysis using La Haute Borne data. Showing long-term corrected value."
             }
+            self._result_cache.put(result_key, result)
+            return result
         except ImportError:
             raise ImportError("OpenOA library not found. Install it with: pip install openoa")
         except Exception as e:
@@ -650,6 +755,7 @@ class OpenOAService:
         
         Args:
             use_lt_distribution: Whether to use long-term wind distribution.
+            file_path: Optional path to uploaded data file.
             **kwargs: Additional analysis parameters.
             
         Returns:
@@ -660,7 +766,7 @@ class OpenOAService:
             return self._run_mock_turbine_ideal_energy(use_lt_distribution)
         else:
             logger.info(f"Running REAL OpenOA turbine ideal energy analysis")
-            return self._run_real_turbine_ideal_energy(use_lt_distribution, **kwargs)
+            return self._run_real_turbine_ideal_energy(use_lt_distribution, file_path, **kwargs)
     
     def _run_mock_turbine_ideal_energy(self, use_lt_distribution: bool) -> Dict[str, Any]:
         """Mock turbine ideal energy analysis."""
@@ -682,46 +788,69 @@ class OpenOAService:
             "notes": "Mock analysis for demonstration - USE_MOCK_DATA=True"
         }
     
-    def _run_real_turbine_ideal_energy(self, use_lt_distribution: bool, **kwargs) -> Dict[str, Any]:
+    def _run_real_turbine_ideal_energy(self, use_lt_distribution: bool, file_path: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """Real OpenOA turbine ideal energy analysis."""
         try:
             from openoa.analysis import TurbineLongTermGrossEnergy
             
+            # use_lt_distribution is only echoed in the result, so it is not part of the key
+            result_key = self._result_key("turbine_ideal_energy", file_path, **kwargs)
+            cached = self._result_cache.get(result_key)
+            if cached is not None:
+                logger.info("Returning cached turbine ideal energy result")
+                cached["use_lt_distribution"] = use_lt_distribution
+                return cached
+            
             logger.info("Loading plant data for turbine ideal energy analysis")
-            plant_data = self._load_real_plant_data()
+            plant_data = self.load_plant_data(file_path)
             
             logger.info("Initializing TurbineLongTermGrossEnergy analysis")
-            analysis = TurbineLongTermGrossEnergy(plant=plant_data, **kwargs)
+            with stage("validate"):
+                analysis = TurbineLongTermGrossEnergy(plant=plant_data, **kwargs)
             
             logger.info("Running turbine ideal energy analysis")
             # Run with at least one reanalysis product
-            analysis.run(reanalysis_products=['era5'])
+            with stage("run"):
+                analysis.run(reanalysis_products=['era5'])
             
             # TurbineLongTermGrossEnergy stores results in plant_gross attribute (in MWh)
             # Convert from MWh to GWh
             import numpy as np
-            ideal_energy_gwh = float(np.mean(analysis.plant_gross) / 1000)
+            with stage("extract"):
+                ideal_energy_gwh = float(np.mean(analysis.plant_gross) / 1000)
             
             capacity_mw = plant_data.metadata.capacity if hasattr(plant_data, 'metadata') else 8.2
             
-            return {
+            result = {
                 "ideal_energy_gwh": round(ideal_energy_gwh, 2),
                 "use_lt_distribution": use_lt_distribution,
                 "plant_capacity_mw": capacity_mw,
                 "analysis_type": "turbine_ideal_energy_real",
                 "notes": "Real OpenOA turbine ideal energy analysis using La Haute Borne data and ERA5 reanalysis"
             }
+            self._result_cache.put(result_key, result)
+            return result
         except ImportError:
             raise ImportError("OpenOA library not found. Install it with: pip install openoa")
         except Exception as e:
             logger.error(f"Turbine ideal energy analysis failed: {e}", exc_info=True)
             raise
     
-    def run_eya_gap_analysis(self, expected_aep_gwh: float, **kwargs) -> Dict[str, Any]:
+    def run_eya_gap_analysis(
+        self,
+        expected_aep_gwh: Union[float, List[float]],
+        file_path: Optional[str] = None,
+        aep_result: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
         """Run EYA gap analysis comparing actual vs expected AEP.
         
         Args:
-            expected_aep_gwh: Expected AEP from energy yield assessment.
+            expected_aep_gwh: Expected AEP from energy yield assessment, or a
+                list of scenarios evaluated against the same AEP result.
+            file_path: Optional path to uploaded data file.
+            aep_result: Result of a prior AEP analysis. If None, a cached AEP
+                result for the dataset is used, or a new one is computed.
             **kwargs: Additional analysis parameters.
             
         Returns:
@@ -729,50 +858,54 @@ class OpenOAService:
         """
         if settings.use_mock_data:
             logger.info(f"Running MOCK EYA gap analysis")
-            return self._run_mock_eya_gap_analysis(expected_aep_gwh)
+            return self._run_mock_eya_gap_analysis(expected_aep_gwh, aep_result)
         else:
             logger.info(f"Running REAL OpenOA EYA gap analysis")
-            return self._run_real_eya_gap_analysis(expected_aep_gwh, **kwargs)
+            return self._run_real_eya_gap_analysis(expected_aep_gwh, file_path, aep_result, **kwargs)
     
-    def _run_mock_eya_gap_analysis(self, expected_aep_gwh: float) -> Dict[str, Any]:
+    def _run_mock_eya_gap_analysis(
+        self,
+        expected_aep_gwh: Union[float, List[float]],
+        aep_result: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """Mock EYA gap analysis."""
         metadata = self.get_sample_plant_metadata()
         capacity_mw = metadata.get("capacity", 10.5)
         
-        # Get actual AEP from our mock AEP analysis
-        aep_result = self._run_mock_aep_analysis(1000)
-        actual_aep_gwh = aep_result["aep_gwh"]
-        
-        gap_gwh = actual_aep_gwh - expected_aep_gwh
-        gap_pct = (gap_gwh / expected_aep_gwh) * 100
+        aep_source = "analysis_id"
+        if aep_result is None:
+            # Get actual AEP from our mock AEP analysis
+            aep_result = self._run_mock_aep_analysis(1000)
+            aep_source = "computed"
         
         return {
-            "expected_aep_gwh": round(expected_aep_gwh, 2),
-            "actual_aep_gwh": round(actual_aep_gwh, 2),
-            "gap_gwh": round(gap_gwh, 2),
-            "gap_pct": round(gap_pct, 2),
-            "meets_expectations": gap_pct >= -5,  # Within 5% is acceptable
+            **self._compare_eya(expected_aep_gwh, aep_result, aep_source),
             "plant_capacity_mw": capacity_mw,
             "analysis_type": "eya_gap_analysis_mock",
             "notes": "Mock analysis for demonstration - USE_MOCK_DATA=True"
         }
     
-    def _run_real_eya_gap_analysis(self, expected_aep_gwh: float, **kwargs) -> Dict[str, Any]:
+    def _run_real_eya_gap_analysis(
+        self,
+        expected_aep_gwh: Union[float, List[float]],
+        file_path: Optional[str] = None,
+        aep_result: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
         """Real OpenOA EYA gap analysis."""
         try:
-            # First run AEP analysis to get actual AEP
-            aep_result = self._run_real_aep_analysis(1000, **kwargs)
-            actual_aep_gwh = aep_result["aep_gwh"]
-            
-            gap_gwh = actual_aep_gwh - expected_aep_gwh
-            gap_pct = (gap_gwh / expected_aep_gwh) * 100
+            aep_source = "analysis_id"
+            if aep_result is None:
+                aep_result = self._result_cache.get(self._result_key("aep_latest", file_path, **kwargs))
+                aep_source = "cache"
+            if aep_result is None:
+                # No prior AEP for this dataset, so run one
+                aep_result = self._run_real_aep_analysis(1000, file_path, **kwargs)
+                aep_source = "computed"
+            logger.info(f"EYA gap analysis using AEP from {aep_source}")
             
             return {
-                "expected_aep_gwh": round(expected_aep_gwh, 2),
-                "actual_aep_gwh": round(actual_aep_gwh, 2),
-                "gap_gwh": round(gap_gwh, 2),
-                "gap_pct": round(gap_pct, 2),
-                "meets_expectations": gap_pct >= -5,
+                **self._compare_eya(expected_aep_gwh, aep_result, aep_source),
                 "analysis_type": "eya_gap_analysis_real",
                 "notes": "Real OpenOA EYA gap analysis"
             }
@@ -781,6 +914,55 @@ class OpenOAService:
         except Exception as e:
             logger.error(f"EYA gap analysis failed: {e}", exc_info=True)
             raise
+    
+    def _compare_eya(
+        self,
+        expected_aep_gwh: Union[float, List[float]],
+        aep_result: Dict[str, Any],
+        aep_source: str
+    ) -> Dict[str, Any]:
+        """Compare expected AEP scenario(s) against one AEP result.
+        
+        The exceedance probability treats the AEP as normally distributed
+        with the AEP result's mean and uncertainty.
+        
+        Args:
+            expected_aep_gwh: Expected AEP, or a list of scenarios.
+            aep_result: AEP analysis result with ``aep_gwh`` and ``uncertainty_pct``.
+            aep_source: Where the AEP came from: analysis_id, cache or computed.
+            
+        Returns:
+            dict: Gap metrics. A single expected value gives flat fields, a
+            list gives one entry per scenario under ``scenarios``.
+        """
+        actual_aep_gwh = aep_result["aep_gwh"]
+        aep_std_gwh = actual_aep_gwh * aep_result.get("uncertainty_pct", 0.0) / 100
+        
+        def compare(expected: float) -> Dict[str, Any]:
+            gap_gwh = actual_aep_gwh - expected
+            gap_pct = (gap_gwh / expected) * 100
+            if aep_std_gwh > 0:
+                exceedance = 0.5 * math.erfc((expected - actual_aep_gwh) / (aep_std_gwh * math.sqrt(2)))
+            else:
+                exceedance = float(actual_aep_gwh >= expected)
+            return {
+                "expected_aep_gwh": round(expected, 2),
+                "gap_gwh": round(gap_gwh, 2),
+                "gap_pct": round(gap_pct, 2),
+                "meets_expectations": gap_pct >= -5,  # Within 5% is acceptable
+                "exceedance_probability_pct": round(exceedance * 100, 1),
+            }
+        
+        aep_info = {
+            "actual_aep_gwh": round(actual_aep_gwh, 2),
+            "aep_uncertainty_pct": aep_result.get("uncertainty_pct"),
+            "aep_source": aep_source,
+            "aep_seed": aep_result.get("seed"),
+            "aep_iterations": aep_result.get("iterations"),
+        }
+        if isinstance(expected_aep_gwh, list):
+            return {**aep_info, "scenarios": [compare(expected) for expected in expected_aep_gwh]}
+        return {**compare(expected_aep_gwh), **aep_info}
 
 
 # Singleton instance
@@ -0,0 +1,255 @@
+"""In-process cache of loaded OpenOA PlantData objects.
+
+Building a PlantData object for the La Haute Borne dataset means re-parsing
+~110 MB of CSVs and re-running ``clean_scada``. This module keeps the built
+objects in a size-aware LRU cache so every analysis can reuse them.
+"""
+
+import copy
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (dataset_id, sorted loader options, source-file fingerprint)
+PlantDataKey = Tuple[str, Tuple[Tuple[str, Any], ...], str]
+
+# PlantData attributes that hold pandas DataFrames
+_FRAME_ATTRIBUTES = ("scada", "meter", "tower", "status", "curtail", "asset")
+
+# Set while loads must not be served from memory (e.g. when profiling them)
+_bypass = ContextVar("plant_data_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_plant_data_cache():
+    """Make in-memory lookups in the current context miss.
+
+    Misses still go through the shared store, and loaded objects are still
+    cached.
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def fingerprint_files(paths: Iterable[Path]) -> str:
+    """Fingerprint a set of source files from their name, size and mtime.
+
+    Stat-based fingerprints are cheap (no file content is read) and change
+    whenever a file is replaced or rewritten.
+
+    Args:
+        paths: Files that feed a dataset loader. Missing files are skipped.
+
+    Returns:
+        Hex digest identifying the current state of the files.
+    """
+    digest = hashlib.sha1()
+    for path in sorted(Path(p) for p in paths):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def make_cache_key(dataset_id: str, options: Dict[str, Any], fingerprint: str) -> PlantDataKey:
+    """Build a hashable cache key.
+
+    Args:
+        dataset_id: Dataset identifier (default dataset id or uploaded file id).
+        options: Loader options that change the resulting PlantData.
+        fingerprint: Source-file fingerprint from :func:`fingerprint_files`.
+
+    Returns:
+        Hashable key for :class:`PlantDataCache`.
+    """
+    return (dataset_id, tuple(sorted(options.items())), fingerprint)
+
+
+def estimate_plant_data_bytes(plant: Any) -> int:
+    """Estimate the memory held by a PlantData object's DataFrames.
+
+    Args:
+        plant: OpenOA PlantData object.
+
+    Returns:
+        Approximate size in bytes.
+    """
+    return sum(int(df.memory_usage(index=True, deep=True).sum()) for df in _frames(plant))
+
+
+def _frames(plant: Any) -> list:
+    """List the DataFrames held by a PlantData object, reanalysis products included."""
+    frames = [getattr(plant, name, None) for name in _FRAME_ATTRIBUTES]
+    frames.extend((getattr(plant, "reanalysis", None) or {}).values())
+    return [df for df in frames if df is not None and hasattr(df, "memory_usage")]
+
+
+def _private_copy(plant: Any) -> Any:
+    """Copy a cached PlantData for one caller without copying its frames' data.
+
+    Each frame becomes a new DataFrame over the same arrays, so the caller
+    can replace frames, reset or set their indexes and add or rename columns
+    without affecting the cache. Everything else (metadata, analysis types,
+    the reanalysis dict) is small and deep-copied.
+    """
+    memo = {id(df): df.copy(deep=False) for df in _frames(plant)}
+    return copy.deepcopy(plant, memo)
+
+
+class PlantDataCache:
+    """Thread-safe, size-aware LRU cache of PlantData objects.
+
+    Entries are evicted least-recently-used first once the combined size
+    exceeds ``max_bytes``. Concurrent requests for the same key share a
+    single load.
+
+    Callers receive a private copy of the cached object because OpenOA
+    analyses mutate their plant (``PlantData.validate`` resets indexes and
+    renames columns). The copy shares the frames' data: analyses replace
+    frames and indexes but do not write into column values, and with a
+    shared store those values are read-only, so a write fails rather than
+    leaking into the cache.
+
+    With a ``shared_store``, misses attach to the snapshot another worker
+    process already published instead of building the PlantData again, and
+    the cached frames are read-only memory maps shared between processes.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        sizeof: Callable[[Any], int] = estimate_plant_data_bytes,
+        shared_store: Optional[Any] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Maximum combined size of cached entries. 0 disables caching.
+            sizeof: Function used to estimate the size of a cached object.
+            shared_store: Optional :class:`SharedPlantDataStore` that misses
+                are loaded through.
+        """
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._shared_store = shared_store
+        self._entries: "OrderedDict[PlantDataKey, Tuple[Any, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: Dict[PlantDataKey, threading.Lock] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_load(self, key: PlantDataKey, loader: Callable[[], Any]) -> Any:
+        """Return a private copy of the cached PlantData, loading it on a miss.
+
+        Args:
+            key: Cache key from :func:`make_cache_key`.
+            loader: Zero-argument callable that builds the PlantData.
+
+        Returns:
+            PlantData object owned by the caller.
+        """
+        cached = self._get(key)
+        if cached is not None:
+            return _private_copy(cached)
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        try:
+            with load_lock:
+                # Another thread may have finished loading while we waited
+                cached = self._get(key, count=False)
+                if cached is None:
+                    if self._shared_store is not None:
+                        cached = self._shared_store.get_or_publish(key, loader)
+                    else:
+                        cached = loader()
+                    self._put(key, cached)
+        finally:
+            with self._lock:
+                self._load_locks.pop(key, None)
+
+        return _private_copy(cached)
+
+    def invalidate(self, dataset_id: str) -> int:
+        """Drop every entry for a dataset.
+
+        Args:
+            dataset_id: Dataset identifier used when building the keys.
+
+        Returns:
+            Number of entries removed.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == dataset_id]
+            for key in keys:
+                _, size = self._entries.pop(key)
+                self._total_bytes -= size
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache statistics.
+
+        Returns:
+            dict: Entry count, size, limit and hit/miss counters.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def _get(self, key: PlantDataKey, count: bool = True) -> Optional[Any]:
+        if _bypass.get():
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if count:
+                    self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if count:
+                self._hits += 1
+            return entry[0]
+
+    def _put(self, key: PlantDataKey, value: Any) -> None:
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            logger.info(f"Not caching {key[0]}: {size} bytes exceeds cache limit {self.max_bytes}")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+
+            while self._total_bytes > self.max_bytes:
+                evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                logger.info(f"Evicted {evicted_key[0]} from PlantData cache ({evicted_size} bytes)")
+
+        logger.info(f"Cached PlantData for {key[0]} ({size} bytes)")
@@ -0,0 +1,122 @@
+"""Background warm-up of a freshly started instance.
+
+The first analysis on a cold instance pays for importing OpenOA and pandas
+and for building the default PlantData. Warm-up does that work at startup,
+in the background, and records how long each stage took; ``/ready`` reports
+not-ready until it has finished so load balancers keep traffic away from
+cold instances.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.core.config import get_settings
+from app.core.lazy_imports import import_heavy
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Modules imported by the "imports" stage
+WARMUP_MODULES = ("numpy", "pandas", "pyarrow")
+OPENOA_MODULES = ("openoa", "openoa.analysis")
+
+
+class WarmupState:
+    """Progress of the instance warm-up."""
+
+    def __init__(self):
+        self.status = "pending"
+        self.stages: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the instance should receive traffic.
+
+        A failed warm-up still counts as finished: the instance serves
+        requests cold rather than being kept out of rotation.
+        """
+        return self.status in ("ready", "failed", "disabled")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the state as a readiness response payload."""
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "stages": dict(self.stages),
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+# Warm-up state of this process
+warmup_state = WarmupState()
+
+
+def import_analysis_modules() -> None:
+    """Import the modules analyses need in the current mode."""
+    modules = WARMUP_MODULES if settings.use_mock_data else WARMUP_MODULES + OPENOA_MODULES
+    for name in modules:
+        import_heavy(name)
+
+
+def _load_default_plant_data() -> None:
+    from app.services.openoa_service import openoa_service
+
+    openoa_service.load_plant_data()
+
+
+async def _run_tiny_analysis() -> None:
+    from app.services.analysis_executor import analysis_executor
+
+    # Default electrical losses: deterministic, a few seconds, and a result users can reuse
+    await analysis_executor.run("electrical_losses", "run_electrical_losses_analysis")
+
+
+async def run_prewarm(state: WarmupState = warmup_state, run_analysis: bool = False) -> WarmupState:
+    """Warm up the instance, recording per-stage timings in ``state``.
+
+    Stages: ``imports`` (analysis modules), ``plant_data`` (build and cache
+    the default dataset; skipped in mock mode) and, if requested,
+    ``analysis`` (one small analysis in the analysis worker pool). A failed
+    stage marks the warm-up failed and skips the remaining stages.
+
+    Args:
+        state: State object to update.
+        run_analysis: Whether to run the analysis stage.
+
+    Returns:
+        WarmupState: The updated state.
+    """
+    stages = [("imports", lambda: asyncio.to_thread(import_analysis_modules))]
+    if not settings.use_mock_data:
+        stages.append(("plant_data", lambda: asyncio.to_thread(_load_default_plant_data)))
+    if run_analysis:
+        stages.append(("analysis", _run_tiny_analysis))
+
+    state.status = "warming"
+    state.started_at = datetime.now()
+    for name, stage in stages:
+        start = time.perf_counter()
+        try:
+            await stage()
+        except Exception as e:
+            logger.error(f"Warm-up stage {name} failed: {e}", exc_info=True)
+            state.status = "failed"
+            state.error = f"{name}: {e}"
+            break
+        finally:
+            state.stages[name] = round(time.perf_counter() - start, 3)
+        logger.info(f"Warm-up stage {name} took {state.stages[name]:.2f}s")
+    else:
+        state.status = "ready"
+
+    state.finished_at = datetime.now()
+    return state
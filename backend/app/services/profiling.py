@@ -0,0 +1,410 @@
+"""On-demand profiling of single analysis runs.
+
+An admin can ask for one analysis to run under a profiler. Three modes are
+offered:
+
+- ``sampling``: a background thread samples the analysis thread's Python
+  stack every few milliseconds. Overhead is low, and the result is written
+  as folded stacks (``frame;frame;frame count``), the input format of
+  flamegraph.pl, speedscope and inferno.
+- ``deterministic``: ``cProfile`` records every call. Timings of small
+  functions are inflated, but call counts are exact. The result is a
+  pstats file (snakeviz, ``python -m pstats``) plus a text summary.
+- ``memory``: for each service stage (``load``, ``build_plant_data``,
+  ``run``, ...), records RSS before, after and at peak (the kernel's
+  high-water mark, on Linux). It also records the allocation sites that grew
+  most, from ``tracemalloc`` snapshot diffs.
+  Tracing slows the run several times over. tracemalloc is process-wide, so
+  allocations of concurrent requests are included; profile on a quiet
+  instance. With the shared PlantData store on, the ``load`` stage of a
+  published dataset measures attaching its memory-mapped snapshot, not
+  ``project_ENGIE.prepare``; set PLANT_DATA_SHARED_STORE=false to measure
+  the build.
+
+AEP shards normally run in a separate process pool; profiled runs execute
+them serially in the analysis thread, so every mode covers them.
+
+Profiles are stored on disk under the analysis id, so they can be
+downloaded from any worker. When profiling is off, the only cost is one
+``None`` check per analysis.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.metrics import process_rss_bytes
+from app.services.stage_timer import active_timer
+
+logger = logging.getLogger(__name__)
+
+# Default location of stored profiles
+PROFILE_DIR = Path(__file__).parent.parent.parent / "cache" / "profiles"
+
+PROFILE_MODES = ("sampling", "deterministic", "memory")
+
+# File suffix per download format
+PROFILE_FORMATS = {
+    "folded": ".folded",
+    "pstats": ".prof",
+    "text": ".txt",
+    "summary": ".json",
+}
+
+
+@dataclass
+class ProfileRequest:
+    """Picklable description of a profiled run, passed to the worker."""
+
+    profile_id: str
+    mode: str = "sampling"
+    profile_dir: str = str(PROFILE_DIR)
+    interval_seconds: float = 0.005
+    max_profiles: int = 50
+    top_allocations: int = 10
+    traceback_frames: int = 10
+
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval.
+
+    Stacks are recorded from the frame that entered the profiler downwards,
+    so executor and event loop frames are left out.
+    """
+
+    def __init__(self, interval_seconds: float = 0.005):
+        """Initialize the profiler.
+
+        Args:
+            interval_seconds: Delay between samples.
+        """
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target_id: Optional[int] = None
+        self._root = None
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._target_id = threading.get_ident()
+        self._root = sys._getframe(1)
+        self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._root = None
+
+    def folded(self) -> str:
+        """Return the samples as folded stacks, most frequent first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self._target_id)
+            names = []
+            while frame is not None and frame is not self._root:
+                names.append(_frame_label(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+                self.samples += 1
+
+
+class MemoryProfiler:
+    """Records memory use per stage of the active :class:`StageTimer`.
+
+    The whole run is recorded as stage ``total``. Stage results are listed
+    in the order stages finish, and nested stages are included in their
+    parent's numbers.
+    """
+
+    def __init__(self, top_allocations: int = 10, traceback_frames: int = 10):
+        """Initialize the profiler.
+
+        Args:
+            top_allocations: Allocation sites reported per stage.
+            traceback_frames: Frames kept per allocation site.
+        """
+        self.top_allocations = top_allocations
+        self.traceback_frames = traceback_frames
+        self.stages: List[Dict[str, Any]] = []
+        self._open: List[Dict[str, Any]] = []
+        self._timer = None
+
+    def __enter__(self) -> "MemoryProfiler":
+        _start_tracing(self.traceback_frames)
+        self._timer = active_timer()
+        if self._timer is not None:
+            self._timer.observer = self
+        self.stage_started("total")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            self.stage_finished("total")
+        finally:
+            if self._timer is not None:
+                self._timer.observer = None
+            _stop_tracing()
+
+    def stage_started(self, name: str) -> None:
+        """Take the snapshot a stage's allocations are compared against."""
+        traced, peak = tracemalloc.get_traced_memory()
+        peak_rss = _peak_rss_bytes()
+        if self._open:
+            self._open[-1]["peak_traced"] = max(self._open[-1]["peak_traced"], peak)
+            self._open[-1]["peak_rss"] = _max_known(self._open[-1]["peak_rss"], peak_rss)
+        tracemalloc.reset_peak()
+        _reset_peak_rss()
+        rss = process_rss_bytes()
+        self._open.append({
+            "name": name,
+            "snapshot": tracemalloc.take_snapshot(),
+            "traced": traced,
+            "peak_traced": traced,
+            "rss": rss,
+            "peak_rss": rss,
+        })
+
+    def stage_finished(self, name: str) -> None:
+        """Record a stage's memory use against its starting snapshot."""
+        entry = self._open.pop()
+        traced, peak = tracemalloc.get_traced_memory()
+        peak = max(entry["peak_traced"], peak)
+        rss = process_rss_bytes()
+        peak_rss = _max_known(entry["peak_rss"], _peak_rss_bytes(), rss)
+        if self._open:
+            self._open[-1]["peak_traced"] = max(self._open[-1]["peak_traced"], peak)
+            self._open[-1]["peak_rss"] = _max_known(self._open[-1]["peak_rss"], peak_rss)
+
+        # Snapshots are compared unfiltered: filter_traces costs seconds per million traces
+        growth = [
+            stat for stat in tracemalloc.take_snapshot().compare_to(entry["snapshot"], "traceback")
+            if stat.size_diff > 0 and not _is_profiler_frame(stat.traceback[-1])
+        ]
+        growth.sort(key=lambda stat: stat.size_diff, reverse=True)
+        self.stages.append({
+            "stage": name,
+            "rss_before_bytes": entry["rss"],
+            "rss_after_bytes": rss,
+            "peak_rss_bytes": peak_rss,
+            "allocated_bytes": traced - entry["traced"],
+            "peak_allocated_bytes": peak - entry["traced"],
+            "top_allocations": [
+                {
+                    "size_bytes": stat.size_diff,
+                    "count": stat.count_diff,
+                    "traceback": [f"{_short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback],
+                }
+                for stat in growth[:self.top_allocations]
+            ],
+        })
+
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def _start_tracing(frames: int) -> None:
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _tracing_started = True
+        _tracing_users += 1
+
+
+def _stop_tracing() -> None:
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        # Leave tracing on if it was started elsewhere (e.g. PYTHONTRACEMALLOC)
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """Peak RSS since the last reset (VmHWM), or None without /proc."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _reset_peak_rss() -> None:
+    """Reset VmHWM to the current RSS, where the kernel allows it."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _is_profiler_frame(frame: tracemalloc.Frame) -> bool:
+    return frame.filename in (__file__, tracemalloc.__file__)
+
+
+def _max_known(*values: Optional[int]) -> Optional[int]:
+    known = [value for value in values if value is not None]
+    return max(known) if known else None
+
+
+def _short_path(filename: str) -> str:
+    for marker in ("site-packages/", "/backend/"):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    return filename
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def run_profiled(func: Callable[[], Any], request: ProfileRequest) -> Any:
+    """Run ``func`` under a profiler and store the profile.
+
+    A profile that cannot be stored is logged; the analysis result is
+    still returned.
+
+    Args:
+        func: Zero-argument callable to profile.
+        request: Profiling options and the id to store the profile under.
+
+    Returns:
+        The return value of ``func``.
+    """
+    start = time.perf_counter()
+    files: Dict[str, str] = {}
+    summary: Dict[str, Any] = {"profile_id": request.profile_id, "mode": request.mode}
+
+    if request.mode == "deterministic":
+        profiler = cProfile.Profile()
+        try:
+            result = profiler.runcall(func)
+        finally:
+            summary["duration_seconds"] = round(time.perf_counter() - start, 3)
+            report = io.StringIO()
+            stats = pstats.Stats(profiler, stream=report)
+            stats.sort_stats("cumulative").print_stats(50)
+            files = {"pstats": stats, "text": report.getvalue()}
+    elif request.mode == "memory":
+        profiler = MemoryProfiler(request.top_allocations, request.traceback_frames)
+        try:
+            with profiler:
+                result = func()
+        finally:
+            summary["duration_seconds"] = round(time.perf_counter() - start, 3)
+            summary["stages"] = profiler.stages
+    else:
+        with SamplingProfiler(request.interval_seconds) as profiler:
+            try:
+                result = func()
+            finally:
+                summary["duration_seconds"] = round(time.perf_counter() - start, 3)
+        summary["samples"] = profiler.samples
+        summary["interval_seconds"] = request.interval_seconds
+        files = {"folded": profiler.folded()}
+
+    try:
+        save_profile(request, files, summary)
+    except OSError as e:
+        logger.warning(f"Could not store profile {request.profile_id}: {e}")
+    return result
+
+
+def save_profile(request: ProfileRequest, files: Dict[str, Any], summary: Dict[str, Any]) -> None:
+    """Write a profile's files and summary, then prune the oldest profiles.
+
+    Args:
+        request: The profiled run.
+        files: Content per format: text for "folded"/"text", a
+            ``pstats.Stats`` for "pstats".
+        summary: JSON-serializable description of the run.
+    """
+    profile_dir = Path(request.profile_dir)
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    summary["formats"] = sorted(files) + ["summary"]
+
+    for fmt, content in files.items():
+        path = profile_dir / f"{request.profile_id}{PROFILE_FORMATS[fmt]}"
+        if fmt == "pstats":
+            content.dump_stats(str(path))
+        else:
+            path.write_text(content)
+    # Written last: its presence marks the profile as complete
+    (profile_dir / f"{request.profile_id}.json").write_text(json.dumps(summary))
+    logger.info(f"Stored {request.mode} profile {request.profile_id} ({summary['duration_seconds']}s)")
+
+    _prune(profile_dir, request.max_profiles)
+
+
+def find_profile(profile_dir: Path, profile_id: str, fmt: str) -> Optional[Tuple[Path, Dict[str, Any]]]:
+    """Locate a stored profile file.
+
+    Args:
+        profile_dir: Directory profiles are stored in.
+        profile_id: Analysis id the profile was stored under.
+        fmt: One of ``PROFILE_FORMATS``.
+
+    Returns:
+        Tuple of (path, summary), or None if the profile or format does not exist.
+    """
+    summary_path = Path(profile_dir) / f"{profile_id}.json"
+    try:
+        summary = json.loads(summary_path.read_text())
+    except FileNotFoundError:
+        return None
+
+    path = summary_path.with_suffix(PROFILE_FORMATS[fmt])
+    if not path.exists():
+        return None
+    return path, summary
+
+
+def list_profiles(profile_dir: Path) -> List[Dict[str, Any]]:
+    """List stored profiles, newest first.
+
+    Args:
+        profile_dir: Directory profiles are stored in.
+
+    Returns:
+        Summaries without per-stage details.
+    """
+    summaries = []
+    for path in sorted(Path(profile_dir).glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+        try:
+            summary = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        summary.pop("stages", None)
+        summaries.append(summary)
+    return summaries
+
+
+def _prune(profile_dir: Path, max_profiles: int) -> None:
+    summaries = sorted(profile_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    for summary_path in summaries[:max(len(summaries) - max_profiles, 0)]:
+        for suffix in PROFILE_FORMATS.values():
+            summary_path.with_suffix(suffix).unlink(missing_ok=True)
@@ -0,0 +1,264 @@
+"""Memoization of analysis results.
+
+Real analyses take seconds to minutes, and the frontend re-submits identical
+requests on every tab switch. Results are cached under a key built from the
+analysis type, the normalized parameters that affect the computation, the
+seed, the dataset fingerprint and the installed OpenOA version.
+
+There are two tiers: an in-memory LRU for hot results and a directory of
+JSON files that survives restarts and is shared by all workers.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from app.core.lazy_imports import openoa_version
+
+logger = logging.getLogger(__name__)
+
+# Default location of the on-disk tier
+RESULT_CACHE_DIR = Path(__file__).parent.parent.parent / "cache" / "results"
+
+# Set while a run must compute its result (e.g. when profiling it)
+_bypass = ContextVar("result_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_result_cache():
+    """Make lookups in the current context miss, so results are recomputed.
+
+    Results computed meanwhile are still stored.
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def get_openoa_version() -> str:
+    """Return the installed OpenOA version, or "unknown"."""
+    return openoa_version() or "unknown"
+
+
+def make_result_key(
+    analysis_type: str,
+    params: Dict[str, Any],
+    seed: Optional[int],
+    dataset_id: str,
+    dataset_fingerprint: str,
+) -> str:
+    """Build a cache key for an analysis result.
+
+    Only parameters that change the computed part of a result should be
+    passed in ``params``; post-processing options are applied after lookup.
+
+    Args:
+        analysis_type: Analysis type (e.g. "aep").
+        params: Parameters that affect the computation.
+        seed: Random seed, or None if the caller accepts any draw.
+        dataset_id: Default dataset id or uploaded file id.
+        dataset_fingerprint: Fingerprint of the dataset's source files.
+
+    Returns:
+        str: Hex digest key.
+    """
+    payload = {
+        "analysis_type": analysis_type,
+        "params": params,
+        "seed": seed,
+        "dataset_id": dataset_id,
+        "dataset_fingerprint": dataset_fingerprint,
+        "openoa_version": get_openoa_version(),
+    }
+    canonical = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResultCache:
+    """Two-tier (memory LRU + disk) cache of JSON-serializable results."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = RESULT_CACHE_DIR,
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 10000,
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory for the on-disk tier. None disables it.
+            max_memory_entries: Maximum entries in the memory tier.
+            max_disk_entries: Maximum files in the disk tier. Beyond it, the
+                oldest are removed until it is 10% below the limit.
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        # Files in the disk tier, counted on the first write and kept up to date from then on
+        self._disk_entries: Optional[int] = None
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached result for ``key``, computing and storing it on a miss.
+
+        Args:
+            key: Key from :func:`make_result_key`.
+            compute: Zero-argument callable producing the result.
+
+        Returns:
+            dict: A copy of the result.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        result = compute()
+        self.put(key, result)
+        return dict(result)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a result in memory, then on disk.
+
+        Args:
+            key: Key from :func:`make_result_key`.
+
+        Returns:
+            dict or None: A copy of the cached result.
+        """
+        if _bypass.get():
+            return None
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._hits += 1
+                return dict(self._memory[key])
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._remember(key, result)
+        logger.info(f"Loaded cached result {key[:12]} from disk")
+        return dict(result)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result in both tiers.
+
+        Args:
+            key: Key from :func:`make_result_key`.
+            result: JSON-serializable result.
+        """
+        with self._lock:
+            self._remember(key, dict(result))
+        self._write_disk(key, result)
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if self.cache_dir is not None and self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+        with self._lock:
+            self._disk_entries = None
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache statistics.
+
+        Returns:
+            dict: Memory entry count and hit/miss counters.
+        """
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def _remember(self, key: str, result: Dict[str, Any]) -> None:
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(key), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cached result {key[:12]}: {e}")
+            return None
+
+    def _write_disk(self, key: str, result: Dict[str, Any]) -> None:
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write then rename so other workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(result, f, default=str)
+            path = self._path(key)
+            added = not path.exists()
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cached result {key[:12]}: {e}")
+            return
+
+        counted = sum(1 for _ in self.cache_dir.glob("*.json")) if self._disk_entries is None else None
+        # Trim below the limit, so the directory is not scanned on every write once full
+        keep = self.max_disk_entries - max(1, self.max_disk_entries // 10)
+        with self._lock:
+            if self._disk_entries is None:
+                self._disk_entries = counted if counted is not None else int(added)
+            elif added:
+                self._disk_entries += 1
+            if self._disk_entries <= self.max_disk_entries:
+                return
+            self._disk_entries = keep  # Keeps concurrent writers from trimming too
+        remaining = self._trim_disk(keep)
+        with self._lock:
+            self._disk_entries = remaining
+
+    def _trim_disk(self, keep: int) -> int:
+        """Remove the oldest files beyond ``keep``; returns how many files remain.
+
+        Files written by other workers are counted too, so the in-memory
+        count is corrected on every trim.
+        """
+        files = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue  # Removed by another worker meanwhile
+        files.sort()
+        for _, path in files[:max(len(files) - keep, 0)]:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Failed to remove cached result {path.name}: {e}")
+        return min(len(files), keep)
@@ -0,0 +1,301 @@
+"""Cross-process store of built PlantData objects.
+
+Every uvicorn worker used to build and hold its own copy of each dataset's
+frames, so memory grew linearly with the worker count. With this store, one
+process builds a dataset and publishes its frames as uncompressed Arrow IPC
+files, and every worker memory-maps them. Numeric columns are written
+without null bitmaps, so they convert to pandas without copying: the pages
+live once in the OS page cache and are shared by all workers, read-only.
+
+Frames that cannot be shared this way (e.g. the asset table, which holds
+shapely geometries) and the rest of the PlantData object are pickled; they
+are small. Snapshots of an upload are removed when the upload is deleted.
+"""
+
+import copy
+import hashlib
+import logging
+import os
+import pickle
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.services.plant_data_cache import PlantDataKey, _FRAME_ATTRIBUTES
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process build lock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Default location of the store
+SHARED_PLANT_DATA_DIR = Path(__file__).parent.parent.parent / "cache" / "plant_data"
+
+# Pickled PlantData (without shared frames) and the list of shared frames
+_SHELL_FILENAME = "plant.pkl"
+
+# Schema metadata keys: columns that hold the frame's index levels, and the
+# frequency of a DatetimeIndex
+_INDEX_METADATA_KEY = b"index_columns"
+_FREQ_METADATA_KEY = b"index_freq"
+
+
+class SharedPlantDataStore:
+    """Directory of memory-mappable PlantData snapshots, shared across processes."""
+
+    def __init__(self, root: Path = SHARED_PLANT_DATA_DIR):
+        """Initialize the store. The directory is created on first publish.
+
+        Args:
+            root: Directory holding one sub-directory per published dataset.
+        """
+        self.root = Path(root)
+
+    def get_or_publish(self, key: PlantDataKey, loader: Callable[[], Any]) -> Any:
+        """Attach to the published PlantData for ``key``, building and publishing it on a miss.
+
+        Only one process builds a given dataset at a time; the others wait
+        and then attach to its snapshot.
+
+        Args:
+            key: PlantData cache key.
+            loader: Zero-argument callable that builds the PlantData.
+
+        Returns:
+            PlantData whose shareable frames are read-only memory maps.
+        """
+        plant = self.get(key)
+        if plant is not None:
+            return plant
+
+        with self._build_lock(key):
+            plant = self.get(key)
+            if plant is not None:
+                return plant
+
+            built = loader()
+            # A snapshot that could not be attached (e.g. pruned midway) would block the new one
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            try:
+                self.publish(key, built)
+            except Exception as e:
+                logger.warning(f"Could not share PlantData for {key[0]}; keeping a private copy: {e}")
+                return built
+            return self.get(key) or built
+
+    def get(self, key: PlantDataKey) -> Optional[Any]:
+        """Attach to a published PlantData.
+
+        Args:
+            key: PlantData cache key.
+
+        Returns:
+            PlantData or None if it has not been published, or was removed
+            while being read.
+        """
+        entry = self._entry_dir(key)
+        try:
+            with open(entry / _SHELL_FILENAME, "rb") as f:
+                shell = pickle.load(f)
+
+            plant = shell["plant"]
+            for name in shell["frames"]:
+                object.__setattr__(plant, name, _read_frame(entry / f"{name}.arrow"))
+            for name in shell["reanalysis"]:
+                plant.reanalysis[name] = _read_frame(entry / f"reanalysis_{name}.arrow")
+        except FileNotFoundError:
+            return None
+        return plant
+
+    def publish(self, key: PlantDataKey, plant: Any) -> Path:
+        """Write a PlantData snapshot, replacing snapshots of older versions of the same dataset.
+
+        The snapshot is written to a temporary directory and renamed into
+        place, so readers never see a partial snapshot.
+
+        Args:
+            key: PlantData cache key.
+            plant: Built PlantData object.
+
+        Returns:
+            Path: The snapshot directory.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        entry = self._entry_dir(key)
+        tmp = Path(tempfile.mkdtemp(dir=self.root, prefix=".tmp-"))
+        try:
+            shell = copy.copy(plant)
+            frames = []
+            for name in _FRAME_ATTRIBUTES:
+                df = getattr(plant, name, None)
+                if _is_shareable(df):
+                    _write_frame(df, tmp / f"{name}.arrow")
+                    object.__setattr__(shell, name, None)
+                    frames.append(name)
+
+            reanalysis = []
+            private_reanalysis = {}
+            for name, df in (getattr(plant, "reanalysis", None) or {}).items():
+                if _is_shareable(df):
+                    _write_frame(df, tmp / f"reanalysis_{name}.arrow")
+                    reanalysis.append(name)
+                else:
+                    private_reanalysis[name] = df
+            object.__setattr__(shell, "reanalysis", private_reanalysis)
+
+            with open(tmp / _SHELL_FILENAME, "wb") as f:
+                pickle.dump({"plant": shell, "frames": frames, "reanalysis": reanalysis}, f)
+
+            try:
+                os.rename(tmp, entry)
+            except OSError:
+                if not (entry / _SHELL_FILENAME).exists():
+                    raise
+                # Published concurrently by another process
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        self._prune(key, keep=entry)
+        logger.info(f"Published shared PlantData for {key[0]} ({len(frames) + len(reanalysis)} frames)")
+        return entry
+
+    def remove_dataset(self, dataset_id: str) -> None:
+        """Remove every snapshot of a dataset, e.g. once its upload has been deleted.
+
+        Processes attached to a snapshot keep their mappings.
+
+        Args:
+            dataset_id: Dataset whose snapshots are removed, for any load
+                options and fingerprint.
+        """
+        name = _safe_name(dataset_id)
+        for path in self.root.glob(f"{name}-*"):
+            if path.name.rsplit("-", 2)[0] == name and path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+
+    def clear(self) -> None:
+        """Remove every snapshot. Processes attached to one keep their mappings."""
+        if self.root.exists():
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def _entry_dir(self, key: PlantDataKey) -> Path:
+        # <dataset>-<options>-<fingerprint>, so the versions of one load can be found by prefix
+        return self.root / f"{self._entry_prefix(key)}-{_digest(key[2])}"
+
+    def _entry_prefix(self, key: PlantDataKey) -> str:
+        return f"{_safe_name(key[0])}-{_digest(key[1])}"
+
+    def _prune(self, key: PlantDataKey, keep: Path) -> None:
+        # Snapshots of older fingerprints of the same dataset and options; open mappings stay valid
+        prefix = self._entry_prefix(key)
+        for path in self.root.glob(f"{prefix}-*"):
+            if path != keep and path.name.rsplit("-", 1)[0] == prefix and path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+
+    @contextmanager
+    def _build_lock(self, key: PlantDataKey):
+        if fcntl is None:
+            yield
+            return
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / f".{self._entry_dir(key).name}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _safe_name(dataset_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", dataset_id)
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha1(repr(value).encode()).hexdigest()[:16]
+
+
+def _is_shareable(df: Any) -> bool:
+    """Whether a frame converts to and from Arrow without copies or loss.
+
+    Data columns must be numeric (bit-packed booleans would be copied) and
+    index levels datetimes, numbers or strings.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return False
+    names = list(df.index.names) + list(df.columns)
+    if any(not isinstance(name, str) for name in names) or len(set(names)) != len(names):
+        return False
+    # Plain NumPy dtypes only: nullable extension dtypes carry a separate mask
+    if any(not isinstance(dtype, np.dtype) or dtype.kind not in "fiu" for dtype in df.dtypes):
+        return False
+    for level in range(df.index.nlevels):
+        values = df.index.get_level_values(level)
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in "Mfiu":
+            continue
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            continue
+        if values.dtype == object and pd.api.types.infer_dtype(values, skipna=False) == "string":
+            continue
+        return False
+    return True
+
+
+def _write_frame(df, path: Path) -> None:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    index = df.index.to_frame(index=False)
+    columns = {}
+    for name in index.columns:
+        values = index[name]
+        # Strings as a dictionary column: compact, and deduplicated when read back
+        if values.dtype == object:
+            columns[name] = pa.array(values.astype("category"))
+        else:
+            # Timezone-aware times are stored as UTC timestamps with the zone in the Arrow type
+            columns[name] = pa.array(values)
+    for name in df.columns:
+        # from_pandas=False keeps NaN as a value, so there is no null bitmap and reads are zero-copy
+        columns[name] = pa.array(np.ascontiguousarray(df[name].to_numpy()), from_pandas=False)
+
+    metadata = {_INDEX_METADATA_KEY: ",".join(index.columns)}
+    if getattr(df.index, "freqstr", None):
+        metadata[_FREQ_METADATA_KEY] = df.index.freqstr
+    table = pa.table(columns).replace_schema_metadata(metadata)
+    with pa.OSFile(str(path), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_frame(path: Path):
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    with pa.memory_map(str(path)) as source:
+        table = ipc.open_file(source).read_all()
+
+    metadata = table.schema.metadata
+    index_names = metadata[_INDEX_METADATA_KEY].decode().split(",")
+    df = table.drop_columns(index_names).to_pandas(split_blocks=True)
+
+    levels = []
+    for name in index_names:
+        values = table.column(name).to_pandas()
+        levels.append(values.astype(object) if isinstance(values.dtype, pd.CategoricalDtype) else values)
+    if _FREQ_METADATA_KEY in metadata:
+        df.index = pd.DatetimeIndex(levels[0], name=index_names[0], freq=metadata[_FREQ_METADATA_KEY].decode())
+    elif len(levels) == 1:
+        df.index = pd.Index(levels[0], name=index_names[0])
+    else:
+        df.index = pd.MultiIndex.from_arrays(levels, names=index_names)
+    return df
@@ -0,0 +1,123 @@
+"""Named stage timers for analysis requests.
+
+The service marks its stages (``load``, ``clean``, ``build_plant_data``,
+``validate``, ``run``, ``extract``) with :func:`stage`. While a
+:class:`StageTimer` is active in the current context the elapsed times are
+recorded; otherwise ``stage`` does nothing, so instrumented code costs
+nothing outside a request. Stages may nest: each stage records its own time
+excluding nested stages, so the values add up to the total.
+
+A timer can also notify an observer of stage boundaries, which the memory
+profiler uses to take per-stage snapshots.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+_current_timer: ContextVar[Optional["StageTimer"]] = ContextVar("stage_timer", default=None)
+
+
+class TimedResult(NamedTuple):
+    """Analysis result with the milliseconds spent in each stage."""
+
+    result: Dict[str, Any]
+    timings: Dict[str, float]
+
+
+class StageTimer:
+    """Accumulates the time spent in named stages."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        # Elapsed time of nested stages, per open stage
+        self._children: List[float] = []
+        # Optional object with stage_started(name) and stage_finished(name)
+        self.observer: Optional[Any] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block, adding its self time to ``name``.
+
+        Args:
+            name: Stage name. Repeated stages accumulate.
+        """
+        if self.observer is not None:
+            self.observer.stage_started(name)
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._children.pop()
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - nested
+            if self._children:
+                self._children[-1] += elapsed
+            if self.observer is not None:
+                self.observer.stage_finished(name)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Record a stage timed elsewhere (e.g. time spent queued)."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_nested(self, name: str, seconds: float) -> None:
+        """Record a stage timed elsewhere that ran inside the open stage (e.g. in a worker process).
+
+        Like a nested :meth:`stage`, its time is excluded from the open stage.
+        """
+        self.add(name, seconds)
+        if self._children:
+            self._children[-1] += seconds
+
+    def to_milliseconds(self) -> Dict[str, float]:
+        """Return the stage times in milliseconds, in the order first seen."""
+        return {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()}
+
+
+@contextmanager
+def collect_timings() -> Iterator[StageTimer]:
+    """Activate a new timer for :func:`stage` calls in the current context.
+
+    Yields:
+        StageTimer: The active timer.
+    """
+    timer = StageTimer()
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+def active_timer() -> Optional[StageTimer]:
+    """Return the timer active in the current context, if any."""
+    return _current_timer.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as stage ``name`` if a timer is active.
+
+    Args:
+        name: Stage name.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Format stage timings as a ``Server-Timing`` header value.
+
+    Args:
+        timings: Milliseconds per stage.
+
+    Returns:
+        str: e.g. ``load;dur=812.4, run;dur=5120.0``.
+    """
+    return ", ".join(f"{name};dur={ms}" for name, ms in timings.items())
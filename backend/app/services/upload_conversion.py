@@ -0,0 +1,163 @@
+"""Conversion of uploaded SCADA files to a typed columnar artifact.
+
+Parsing CSV/JSON text, mapping column names and parsing timestamps is the
+slow part of loading an upload. It is done once, in the background after
+the upload, and the normalized frame is written as an uncompressed Arrow
+(Feather v2) file next to the upload. Analyses memory-map that file
+instead of re-parsing the text.
+"""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Suffix of the columnar artifact written next to an upload
+COLUMNAR_SUFFIX = ".arrow"
+
+# Suffix of files still being written; orphan cleanup skips them until stale
+PARTIAL_SUFFIX = ".part"
+
+# Case-insensitive alternative names for the required OpenOA columns
+COLUMN_ALIASES = {
+    'time': ['date_time', 'timestamp', 'datetime', 'date', 'time'],
+    'WTUR_W': ['p_avg', 'power', 'power_kw', 'wtur_w', 'activepower'],
+    'WMET_HorWdSpd': ['ws_avg', 'wind_speed', 'windspeed', 'wind_spd', 'wmet_horwdspd', 'ws'],
+}
+REQUIRED_COLUMNS = ['time', 'WTUR_W', 'WMET_HorWdSpd']
+
+
+def columnar_path(file_path: str) -> Path:
+    """Return the columnar artifact path for an uploaded file.
+
+    Args:
+        file_path: Path of the uploaded CSV/JSON file.
+
+    Returns:
+        Path: ``<file_id>.arrow`` in the same directory.
+    """
+    path = Path(file_path)
+    return path.with_name(f"{path.stem}{COLUMNAR_SUFFIX}")
+
+
+def read_upload_frame(file_path: str):
+    """Read an uploaded CSV or JSON file into a DataFrame.
+
+    Args:
+        file_path: Path to CSV or JSON file.
+
+    Returns:
+        pandas.DataFrame: Raw upload contents.
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    import pandas as pd
+
+    if file_path.endswith('.csv'):
+        return pd.read_csv(file_path)
+    if file_path.endswith('.json'):
+        return pd.read_json(file_path)
+    raise ValueError(f"Unsupported file type: {file_path}")
+
+
+def normalize_scada_frame(df):
+    """Map column names, parse timestamps and derive asset ids.
+
+    Args:
+        df: Raw upload DataFrame. Modified in place.
+
+    Returns:
+        pandas.DataFrame: Frame with ``time`` (UTC), ``WTUR_W``,
+        ``WMET_HorWdSpd`` and a categorical ``asset_id`` column.
+
+    Raises:
+        ValueError: If required columns are missing.
+    """
+    import pandas as pd
+
+    # Case-insensitive column mapping for flexible CSV uploads
+    df_cols_lower = {col.lower(): col for col in df.columns}
+    for target_col, alt_names in COLUMN_ALIASES.items():
+        if target_col not in df.columns:
+            for alt_name_lower in alt_names:
+                if alt_name_lower in df_cols_lower:
+                    actual_col = df_cols_lower[alt_name_lower]
+                    df.rename(columns={actual_col: target_col}, inplace=True)
+                    logger.info(f"Mapped column '{actual_col}' to '{target_col}'")
+                    break
+
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_cols:
+        raise ValueError(
+            f"Missing required columns: {missing_cols}. "
+            f"Available: {list(df.columns)}. "
+            f"Required: time, WTUR_W (power), WMET_HorWdSpd (wind speed)"
+        )
+
+    # Convert time column to datetime with UTC timezone
+    df['time'] = pd.to_datetime(df['time'], utc=True)
+
+    # Ensure we have a turbine identifier column
+    if 'asset_id' not in df.columns and 'turbine' not in df.columns:
+        # If no turbine column, create from Wind_turbine_name or use default
+        if 'Wind_turbine_name' in df.columns:
+            df['asset_id'] = df['Wind_turbine_name']
+        else:
+            df['asset_id'] = 'TURBINE_01'
+    elif 'turbine' in df.columns:
+        df['asset_id'] = df['turbine']
+    df['asset_id'] = df['asset_id'].astype(str).astype('category')
+
+    return df
+
+
+def convert_upload(file_path: str) -> Path:
+    """Parse an upload once and write its normalized columnar artifact.
+
+    The artifact is written to a temporary file and renamed into place, so
+    readers never see a partial file.
+
+    Args:
+        file_path: Path of the uploaded CSV/JSON file.
+
+    Returns:
+        Path: The written artifact.
+
+    Raises:
+        ValueError: If the file cannot be parsed or lacks required columns.
+    """
+    import pyarrow.feather as feather
+
+    df = normalize_scada_frame(read_upload_frame(file_path))
+    dest = columnar_path(file_path)
+    fd, tmp_path = tempfile.mkstemp(dir=dest.parent, suffix=PARTIAL_SUFFIX)
+    os.close(fd)
+    try:
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, dest)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+    logger.info(f"Wrote columnar artifact {dest.name} ({len(df)} rows)")
+    return dest
+
+
+def load_columnar(file_path: str):
+    """Load the columnar artifact for an upload, if it has been written.
+
+    Args:
+        file_path: Path of the uploaded CSV/JSON file.
+
+    Returns:
+        pandas.DataFrame or None if no artifact exists yet.
+    """
+    import pyarrow.feather as feather
+
+    path = columnar_path(file_path)
+    if not path.exists():
+        return None
+    return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
@@ -0,0 +1,258 @@
+"""Streaming ingestion of uploaded plant data files.
+
+Uploads are copied to disk in fixed-size chunks while the row count and
+header are computed incrementally, so peak memory does not depend on the
+file size. CSV rows are counted by scanning for record terminators outside
+quoted fields; this is byte-level work done in C by ``bytes.split`` and
+``bytes.count``, and matches ``csv.DictReader`` (blank lines are skipped).
+The content hash used to deduplicate uploads is computed in the same pass.
+"""
+
+import codecs
+import csv
+import hashlib
+import io
+import json
+import logging
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Blank line: a newline preceded by another newline (lookbehind, so overlapping runs count)
+_BLANK_LINE = re.compile(rb"(?<=\n)\r?\n")
+
+# Stop looking for a header after this many bytes
+MAX_HEADER_BYTES = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit."""
+
+
+class CsvStats:
+    """Incrementally count CSV rows and read the header from byte chunks."""
+
+    def __init__(self):
+        self.columns: Optional[List[str]] = None
+        self._records = 0
+        self._blank = 0
+        self._in_quotes = False
+        # Tail of the unquoted stream; starts as a newline so leading blank lines are skipped
+        self._tail = b"\n"
+        self._last_byte = b"\n"
+        self._head = bytearray()
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume the next chunk of the file.
+
+        Args:
+            chunk: Raw bytes, split anywhere.
+        """
+        if not chunk:
+            return
+
+        # Quotes and newlines are ASCII, so they never occur inside UTF-8 sequences
+        parts = chunk.split(b'"')
+        for i, part in enumerate(parts):
+            if i > 0:
+                self._in_quotes = not self._in_quotes
+                self._tail = b'"'
+            if self._in_quotes or not part:
+                continue
+            self._records += part.count(b"\n")
+            # Prepend the previous tail so blank lines split across chunks are seen;
+            # matches that end inside the tail were counted last time
+            prefix = self._tail[-2:]
+            text = prefix + part
+            if b"\n\n" in text or b"\n\r\n" in text:
+                self._blank += sum(1 for m in _BLANK_LINE.finditer(text) if m.end() > len(prefix))
+            self._tail = self._tail[-2:] + part if len(part) < 2 else part
+        self._last_byte = chunk[-1:]
+
+        if self.columns is None:
+            self._head += chunk
+            if self._records > self._blank or len(self._head) > MAX_HEADER_BYTES:
+                self._read_header()
+
+    def finish(self) -> int:
+        """Finish the file and return the number of data rows.
+
+        Returns:
+            int: Rows excluding the header and blank lines.
+        """
+        if self.columns is None:
+            self._read_header()
+
+        rows = self._records - self._blank
+        if self._last_byte != b"\n":
+            rows += 1  # Unterminated last record
+        return max(rows - 1, 0) if self.columns else 0
+
+    def _read_header(self) -> None:
+        text = bytes(self._head).decode("utf-8-sig", errors="replace")
+        self.columns = next((row for row in csv.reader(io.StringIO(text)) if row), [])
+        self._head = bytearray()
+
+
+class UploadScanner:
+    """Validate and describe an upload from its byte chunks.
+
+    Checks UTF-8, counts CSV rows, reads the header and hashes the content
+    as chunks arrive, without holding the file in memory.
+    """
+
+    def __init__(self, file_type: str):
+        """Initialize the scanner.
+
+        Args:
+            file_type: "csv" or "json".
+        """
+        self.file_type = file_type
+        self.size = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._stats = CsvStats() if file_type == "csv" else None
+        self._digest = hashlib.sha256()
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume the next chunk of the file.
+
+        Args:
+            chunk: Raw bytes, in file order.
+
+        Raises:
+            UnicodeDecodeError: If the content is not valid UTF-8.
+        """
+        self.size += len(chunk)
+        self._decoder.decode(chunk)
+        self._digest.update(chunk)
+        if self._stats is not None:
+            self._stats.feed(chunk)
+
+    def finish(self, path: Path) -> Dict[str, Any]:
+        """Finish the file and return its description.
+
+        Args:
+            path: The complete file on disk; JSON files are parsed from it.
+
+        Returns:
+            dict: row_count, columns, file_size_bytes and content_hash (SHA-256 hex).
+
+        Raises:
+            UnicodeDecodeError: If the content ends mid-character.
+            json.JSONDecodeError: If a JSON file is malformed.
+        """
+        self._decoder.decode(b"", final=True)
+
+        if self._stats is not None:
+            row_count = self._stats.finish()
+            columns = self._stats.columns
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            row_count = len(data) if isinstance(data, list) else 1
+            if isinstance(data, list) and data and isinstance(data[0], dict):
+                columns = list(data[0].keys())
+            elif isinstance(data, dict):
+                columns = list(data.keys())
+            else:
+                columns = []
+
+        return {
+            "row_count": row_count,
+            "columns": columns,
+            "file_size_bytes": self.size,
+            "content_hash": self._digest.hexdigest(),
+        }
+
+
+def ingest_upload(
+    source: BinaryIO,
+    dest: Path,
+    file_type: str,
+    max_bytes: int,
+    max_json_bytes: int,
+    chunk_size: int = 1024 * 1024,
+) -> Dict[str, Any]:
+    """Copy an upload to disk in chunks and describe its contents.
+
+    Blocking; call it from a worker thread.
+
+    Args:
+        source: Readable binary file object (e.g. ``UploadFile.file``).
+        dest: Destination path. Removed again if ingestion fails.
+        file_type: "csv" or "json".
+        max_bytes: Maximum accepted file size.
+        max_json_bytes: Maximum size for JSON files, which are parsed in full.
+        chunk_size: Read/write chunk size in bytes.
+
+    Returns:
+        dict: row_count, columns, file_size_bytes and content_hash (SHA-256 hex).
+
+    Raises:
+        UploadTooLargeError: If the file exceeds the size limit.
+        ValueError: If the file is not valid UTF-8 CSV or JSON.
+    """
+    limit = min(max_bytes, max_json_bytes) if file_type == "json" else max_bytes
+    scanner = UploadScanner(file_type)
+
+    try:
+        with _as_value_error(), open(dest, "wb") as out:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                if scanner.size + len(chunk) > limit:
+                    raise UploadTooLargeError(
+                        f"File exceeds the {limit // (1024 * 1024)} MB limit for {file_type.upper()} uploads"
+                    )
+                scanner.feed(chunk)
+                out.write(chunk)
+            out.flush()
+            metadata = scanner.finish(dest)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+
+    logger.info(f"Ingested {metadata['file_size_bytes']} bytes ({metadata['row_count']} rows) into {dest.name}")
+    return metadata
+
+
+def scan_upload(path: Path, file_type: str, chunk_size: int = 1024 * 1024) -> Dict[str, Any]:
+    """Describe an upload that is already complete on disk.
+
+    Blocking; call it from a worker thread. Used for uploads assembled from
+    separately transferred chunks.
+
+    Args:
+        path: The complete file.
+        file_type: "csv" or "json".
+        chunk_size: Read size in bytes.
+
+    Returns:
+        dict: row_count, columns, file_size_bytes and content_hash (SHA-256 hex).
+
+    Raises:
+        ValueError: If the file is not valid UTF-8 CSV or JSON.
+    """
+    scanner = UploadScanner(file_type)
+    with _as_value_error(), open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            scanner.feed(chunk)
+        return scanner.finish(path)
+
+
+@contextmanager
+def _as_value_error():
+    """Report invalid content as a ValueError with a readable message."""
+    try:
+        yield
+    except UnicodeDecodeError as e:
+        raise ValueError(f"File is not valid UTF-8: {e}")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON format: {e}")
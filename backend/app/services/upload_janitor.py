@@ -0,0 +1,59 @@
+"""Periodic cleanup of uploaded files.
+
+Expiring old uploads and enforcing the disk quota used to happen inside the
+upload request, so upload latency grew with the number of stored files. The
+janitor does that work on a timer instead: it is started from the
+application lifespan and runs each pass in a worker thread.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from app.core.config import get_settings
+from app.services.file_storage import FileStorage
+from app.services.upload_sessions import ChunkedUploads
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+def upload_quota_bytes() -> Optional[int]:
+    """Return the configured upload disk quota in bytes, or None if unlimited."""
+    if settings.upload_quota_mb <= 0:
+        return None
+    return settings.upload_quota_mb * 1024 * 1024
+
+
+def janitor_pass() -> Dict[str, int]:
+    """Run one janitor pass with the configured limits. Blocking.
+
+    Returns:
+        dict: Number of files removed for each reason, files remaining and
+        expired upload sessions.
+    """
+    stats = FileStorage.run_janitor(settings.upload_max_age_hours, upload_quota_bytes())
+    stats["expired_sessions"] = ChunkedUploads.expire_sessions(settings.upload_max_age_hours)
+    return stats
+
+
+async def run_upload_janitor(interval_seconds: float) -> None:
+    """Run janitor passes every ``interval_seconds`` until cancelled.
+
+    A failing pass is logged and retried on the next tick.
+
+    Args:
+        interval_seconds: Delay between the end of one pass and the next.
+    """
+    while True:
+        try:
+            stats = await asyncio.to_thread(janitor_pass)
+            if stats["expired"] or stats["evicted"]:
+                logger.info(
+                    f"Upload janitor removed {stats['expired']} expired and "
+                    f"{stats['evicted']} evicted files ({stats['files_remaining']} remaining)"
+                )
+        except Exception as e:
+            logger.error(f"Upload janitor pass failed: {e}", exc_info=True)
+        await asyncio.sleep(interval_seconds)
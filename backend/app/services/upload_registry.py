@@ -0,0 +1,492 @@
+"""Persistent registry of uploaded files.
+
+Upload metadata lives in a SQLite database in WAL mode, so every uvicorn
+worker sees the same uploads and the registry survives restarts. Lookups
+go through the ``file_id`` primary key and expiry is a range delete on the
+indexed ``uploaded_at`` column. Quota eviction walks the indexed
+``last_accessed`` column, least recently used first.
+
+Uploads with identical content share one stored file, so several entries
+(aliases) can have the same ``stored_path``; the file is only deleted when
+no entry refers to it, and it counts once towards the quota.
+
+Resumable upload sessions live in the same database, so chunks of one
+upload can be sent to any worker.
+"""
+
+import abc
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+from uuid import uuid4
+
+# How long a statement waits for another connection's write lock
+_BUSY_TIMEOUT_SECONDS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    file_id TEXT PRIMARY KEY,
+    original_filename TEXT NOT NULL,
+    stored_path TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    uploaded_at REAL NOT NULL,
+    metadata TEXT NOT NULL,
+    columnar_status TEXT NOT NULL DEFAULT 'pending',
+    columnar_path TEXT,
+    columnar_error TEXT,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    last_accessed REAL
+);
+CREATE INDEX IF NOT EXISTS idx_uploads_uploaded_at ON uploads (uploaded_at);
+CREATE INDEX IF NOT EXISTS idx_uploads_last_accessed ON uploads (last_accessed);
+CREATE INDEX IF NOT EXISTS idx_uploads_stored_path ON uploads (stored_path);
+CREATE INDEX IF NOT EXISTS idx_uploads_columnar_path ON uploads (columnar_path);
+"""
+
+# Columns that may be changed after registration
+_UPDATABLE = {"columnar_status", "columnar_path", "columnar_error", "metadata", "size_bytes"}
+
+
+_SESSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS upload_sessions (
+    session_id TEXT PRIMARY KEY,
+    original_filename TEXT NOT NULL,
+    partial_path TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    total_size INTEGER NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'open',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_upload_sessions_updated_at ON upload_sessions (updated_at);
+CREATE TABLE IF NOT EXISTS upload_chunks (
+    session_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    PRIMARY KEY (session_id, chunk_index)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS upload_writers (
+    writer_id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_upload_writers_session_id ON upload_writers (session_id);
+"""
+
+
+class _SQLiteStore(abc.ABC):
+    """Per-thread connections to a WAL-mode SQLite database."""
+
+    def __init__(self, db_path: Path):
+        """Initialize the store. The database is created on first use.
+
+        Args:
+            db_path: SQLite database file.
+        """
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=_BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema(conn)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Run this thread's statements as one transaction holding the write lock.
+
+        Other connections cannot write until the block ends, so a check and
+        the action that depends on it cannot interleave with another worker's.
+        Not reentrant.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @abc.abstractmethod
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        """Create the store's tables on a new connection."""
+
+
+class UploadRegistry(_SQLiteStore):
+    """SQLite-backed registry of uploaded files, shared across processes."""
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Register a file.
+
+        Args:
+            entry: File info with file_id, original_filename, stored_path,
+                file_type, uploaded_at (datetime), metadata, size_bytes and
+                the columnar_* fields.
+        """
+        row = self._to_row(entry)
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{name}" for name in row)
+        self._connect().execute(f"INSERT OR REPLACE INTO uploads ({columns}) VALUES ({placeholders})", row)
+
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a file by ID.
+
+        Args:
+            file_id: Unique file identifier.
+
+        Returns:
+            dict or None if not registered.
+        """
+        row = self._connect().execute("SELECT * FROM uploads WHERE file_id = ?", (file_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def update(self, file_id: str, **fields) -> None:
+        """Update mutable fields of a registered file.
+
+        Args:
+            file_id: Unique file identifier.
+            **fields: Any of columnar_status, columnar_path, columnar_error,
+                metadata, size_bytes.
+
+        Raises:
+            ValueError: If a field cannot be updated.
+        """
+        unknown = set(fields) - _UPDATABLE
+        if unknown:
+            raise ValueError(f"Cannot update upload fields: {sorted(unknown)}")
+        if "metadata" in fields:
+            fields["metadata"] = json.dumps(fields["metadata"], default=str)
+
+        assignments = ", ".join(f"{name} = :{name}" for name in fields)
+        self._connect().execute(
+            f"UPDATE uploads SET {assignments} WHERE file_id = :file_id", {**fields, "file_id": file_id}
+        )
+
+    def touch(self, file_id: str, timeout: Optional[float] = None) -> None:
+        """Record that a file was just used, for LRU eviction.
+
+        Args:
+            file_id: Unique file identifier.
+            timeout: Seconds to wait for the write lock; None waits as long
+                as any other statement.
+
+        Raises:
+            sqlite3.OperationalError: If the database stayed locked.
+        """
+        conn = self._connect()
+        if timeout is None:
+            conn.execute("UPDATE uploads SET last_accessed = ? WHERE file_id = ?", (datetime.now().timestamp(), file_id))
+            return
+        conn.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+        try:
+            conn.execute("UPDATE uploads SET last_accessed = ? WHERE file_id = ?", (datetime.now().timestamp(), file_id))
+        finally:
+            conn.execute(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_SECONDS * 1000}")
+
+    def remove(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Unregister a file.
+
+        Args:
+            file_id: Unique file identifier.
+
+        Returns:
+            dict or None: The removed entry, if it was registered.
+        """
+        rows = self._connect().execute("DELETE FROM uploads WHERE file_id = ? RETURNING *", (file_id,)).fetchall()
+        return self._from_row(rows[0]) if rows else None
+
+    def remove_older_than(self, cutoff: datetime) -> List[Dict[str, Any]]:
+        """Unregister every file uploaded before ``cutoff``.
+
+        Args:
+            cutoff: Files uploaded before this time are removed.
+
+        Returns:
+            list[dict]: The removed entries, so their files can be deleted.
+        """
+        rows = self._connect().execute(
+            "DELETE FROM uploads WHERE uploaded_at < ? RETURNING *", (cutoff.timestamp(),)
+        ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def remove_least_recently_used(self, bytes_to_free: int) -> List[Dict[str, Any]]:
+        """Unregister the least recently used files until enough bytes are freed.
+
+        A shared file only frees space once its last alias is removed.
+
+        Args:
+            bytes_to_free: Total size_bytes of the files to remove.
+
+        Returns:
+            list[dict]: The removed entries, so their files can be deleted.
+        """
+        conn = self._connect()
+        victims = [row["file_id"] for row in conn.execute("SELECT file_id FROM uploads ORDER BY last_accessed")]
+
+        removed = []
+        freed = 0
+        for file_id in victims:
+            if freed >= bytes_to_free:
+                break
+            entry = self.remove(file_id)
+            if entry is None:
+                continue
+            removed.append(entry)
+            if not self.is_referenced(entry["stored_path"]):
+                freed += entry["size_bytes"]
+        return removed
+
+    def is_referenced(self, stored_path: str) -> bool:
+        """Return whether any registered file is stored at ``stored_path``.
+
+        Args:
+            stored_path: Path of a stored (possibly shared) file.
+        """
+        row = self._connect().execute("SELECT 1 FROM uploads WHERE stored_path = ? LIMIT 1", (stored_path,)).fetchone()
+        return row is not None
+
+    def is_registered_path(self, path: str) -> bool:
+        """Return whether ``path`` is the stored file or columnar artifact of a registered file.
+
+        Args:
+            path: Path of a file in the upload directory.
+        """
+        conn = self._connect()
+        for column in ("stored_path", "columnar_path"):
+            if conn.execute(f"SELECT 1 FROM uploads WHERE {column} = ? LIMIT 1", (path,)).fetchone():
+                return True
+        return False
+
+    def total_bytes(self) -> int:
+        """Return the total size_bytes of all stored files, counting shared files once."""
+        return self._connect().execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size_bytes) AS size FROM uploads GROUP BY stored_path)"
+        ).fetchone()[0]
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        """Return every registered file, keyed by file_id."""
+        rows = self._connect().execute("SELECT * FROM uploads ORDER BY uploaded_at").fetchall()
+        return {row["file_id"]: self._from_row(row) for row in rows}
+
+    def count(self) -> int:
+        """Return the number of registered files."""
+        return self._connect().execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
+
+    def paths(self) -> Set[str]:
+        """Return every stored and columnar path that belongs to a registered file."""
+        rows = self._connect().execute("SELECT stored_path, columnar_path FROM uploads").fetchall()
+        return {path for row in rows for path in row if path}
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _to_row(entry: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(entry)
+        row["uploaded_at"] = entry["uploaded_at"].timestamp()
+        row["last_accessed"] = row["uploaded_at"]
+        row["metadata"] = json.dumps(entry.get("metadata", {}), default=str)
+        return row
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        entry = dict(row)
+        entry["uploaded_at"] = datetime.fromtimestamp(entry["uploaded_at"])
+        if entry.get("last_accessed") is not None:
+            entry["last_accessed"] = datetime.fromtimestamp(entry["last_accessed"])
+        entry["metadata"] = json.loads(entry["metadata"])
+        return entry
+
+
+class UploadSessionStore(_SQLiteStore):
+    """SQLite-backed state of resumable upload sessions, shared across processes."""
+
+    def add(self, session: Dict[str, Any]) -> None:
+        """Register a new session.
+
+        Args:
+            session: session_id, original_filename, partial_path, file_type,
+                total_size and chunk_size.
+        """
+        now = datetime.now().timestamp()
+        row = {**session, "status": "open", "created_at": now, "updated_at": now}
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{name}" for name in row)
+        self._connect().execute(f"INSERT INTO upload_sessions ({columns}) VALUES ({placeholders})", row)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a session and the chunks received so far.
+
+        Args:
+            session_id: Session identifier.
+
+        Returns:
+            dict or None: The session with a sorted ``received_chunks`` list.
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM upload_sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        session = dict(row)
+        session["received_chunks"] = [
+            chunk["chunk_index"]
+            for chunk in conn.execute(
+                "SELECT chunk_index FROM upload_chunks WHERE session_id = ? ORDER BY chunk_index", (session_id,)
+            )
+        ]
+        return session
+
+    def mark_received(self, session_id: str, chunk_index: int) -> None:
+        """Record that a chunk has been written completely.
+
+        Args:
+            session_id: Session identifier.
+            chunk_index: Index of the written chunk.
+        """
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR IGNORE INTO upload_chunks (session_id, chunk_index) VALUES (?, ?)", (session_id, chunk_index)
+        )
+        conn.execute(
+            "UPDATE upload_sessions SET updated_at = ? WHERE session_id = ?", (datetime.now().timestamp(), session_id)
+        )
+
+    def begin_write(self, session_id: str, lease_seconds: float) -> Optional[str]:
+        """Register a chunk write, if the session is still open.
+
+        The write holds a lease that must be renewed, so a writer that died
+        mid-chunk stops blocking finalize once its lease expires.
+
+        Args:
+            session_id: Session identifier.
+            lease_seconds: Time until the write is presumed dead.
+
+        Returns:
+            str or None: ID of the write, to pass to renew_write and
+            end_write, or None if the session is not open.
+        """
+        writer_id = uuid4().hex
+        conn = self._connect()
+        # The status check and the registration must not interleave with start_finalizing
+        with self.transaction():
+            cursor = conn.execute(
+                "UPDATE upload_sessions SET updated_at = ? WHERE session_id = ? AND status = 'open'",
+                (datetime.now().timestamp(), session_id),
+            )
+            if cursor.rowcount != 1:
+                return None
+            conn.execute(
+                "INSERT INTO upload_writers (writer_id, session_id, expires_at) VALUES (?, ?, ?)",
+                (writer_id, session_id, time.time() + lease_seconds),
+            )
+        return writer_id
+
+    def renew_write(self, writer_id: str, lease_seconds: float) -> bool:
+        """Extend the lease of a chunk write started with begin_write.
+
+        Args:
+            writer_id: ID returned by begin_write.
+            lease_seconds: Time from now until the write is presumed dead.
+
+        Returns:
+            bool: False if the lease had already expired; the write must stop,
+            since the session may be finalizing.
+        """
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE upload_writers SET expires_at = ? WHERE writer_id = ? AND expires_at > ?",
+            (now + lease_seconds, writer_id, now),
+        )
+        return cursor.rowcount == 1
+
+    def end_write(self, writer_id: str) -> None:
+        """Unregister a chunk write started with begin_write.
+
+        Args:
+            writer_id: ID returned by begin_write.
+        """
+        self._connect().execute("DELETE FROM upload_writers WHERE writer_id = ?", (writer_id,))
+
+    def start_finalizing(self, session_id: str) -> bool:
+        """Atomically move an open session with no live chunk writes to 'finalizing'.
+
+        Args:
+            session_id: Session identifier.
+
+        Returns:
+            bool: Whether the session was updated.
+        """
+        cursor = self._connect().execute(
+            "UPDATE upload_sessions SET status = 'finalizing', updated_at = ? "
+            "WHERE session_id = ? AND status = 'open' AND NOT EXISTS ("
+            "SELECT 1 FROM upload_writers WHERE session_id = upload_sessions.session_id AND expires_at > ?)",
+            (datetime.now().timestamp(), session_id, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def set_status(self, session_id: str, status: str, expected: str) -> bool:
+        """Atomically move a session from one status to another.
+
+        Args:
+            session_id: Session identifier.
+            status: New status.
+            expected: Status the session must currently have.
+
+        Returns:
+            bool: Whether the session was in ``expected`` and was updated.
+        """
+        cursor = self._connect().execute(
+            "UPDATE upload_sessions SET status = ?, updated_at = ? WHERE session_id = ? AND status = ?",
+            (status, datetime.now().timestamp(), session_id, expected),
+        )
+        return cursor.rowcount == 1
+
+    def remove(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Forget a session and its chunks.
+
+        Args:
+            session_id: Session identifier.
+
+        Returns:
+            dict or None: The removed session, if it existed.
+        """
+        conn = self._connect()
+        conn.execute("DELETE FROM upload_chunks WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM upload_writers WHERE session_id = ?", (session_id,))
+        rows = conn.execute("DELETE FROM upload_sessions WHERE session_id = ? RETURNING *", (session_id,)).fetchall()
+        return dict(rows[0]) if rows else None
+
+    def remove_older_than(self, cutoff: datetime) -> List[Dict[str, Any]]:
+        """Forget every session with no activity since ``cutoff``.
+
+        Args:
+            cutoff: Sessions last updated before this time are removed.
+
+        Returns:
+            list[dict]: The removed sessions, so their partial files can be deleted.
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            "DELETE FROM upload_sessions WHERE updated_at < ? RETURNING *", (cutoff.timestamp(),)
+        ).fetchall()
+        for row in rows:
+            conn.execute("DELETE FROM upload_chunks WHERE session_id = ?", (row["session_id"],))
+            conn.execute("DELETE FROM upload_writers WHERE session_id = ?", (row["session_id"],))
+        return [dict(row) for row in rows]
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.executescript(_SESSION_SCHEMA)
@@ -0,0 +1,325 @@
+"""Resumable, chunked uploads of large plant data files.
+
+A client creates a session for a file of known size, PUTs fixed-size
+numbered chunks in any order (in parallel if it likes), asks which chunks
+have arrived, and finalizes. Every chunk is streamed straight to its final
+offset in a pre-sized partial file, so an interrupted transfer only resends
+the missing chunks and no chunk is ever assembled in memory. Finalizing
+describes the assembled file and hands it to :class:`FileStorage`; it is
+refused while any chunk is still being written, and no chunk is accepted
+once it has started. Chunk writes hold a lease, so a write whose worker
+died stops blocking finalize after WRITE_LEASE_SECONDS.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.services import file_storage, metrics
+from app.services.file_storage import REGISTRY_FILENAME, FileStorage
+from app.services.upload_ingest import UploadTooLargeError, scan_upload
+from app.services.upload_registry import UploadSessionStore
+
+logger = logging.getLogger(__name__)
+
+# Session state lives next to the upload registry, in the same database
+_store = UploadSessionStore(file_storage.UPLOAD_DIR / REGISTRY_FILENAME)
+
+# A chunk write whose lease is not renewed for this long (e.g. its worker
+# was killed) no longer keeps the session from being finalized
+WRITE_LEASE_SECONDS = 300
+
+
+class UploadSessionStateError(RuntimeError):
+    """Raised when a session cannot accept the request in its current state."""
+
+
+class ChunkedUploads:
+    """Manages resumable upload sessions."""
+
+    @staticmethod
+    def create_session(
+        filename: str,
+        file_type: str,
+        total_size: int,
+        chunk_size: int,
+        max_bytes: int
+    ) -> Dict[str, Any]:
+        """
+        Start a session and pre-size its partial file.
+
+        Args:
+            filename: Original filename
+            file_type: "csv" or "json"
+            total_size: Size of the complete file in bytes
+            chunk_size: Size of every chunk except the last
+            max_bytes: Maximum accepted file size
+
+        Returns:
+            Session status (see get_status)
+
+        Raises:
+            UploadTooLargeError: If total_size exceeds max_bytes
+        """
+        if total_size > max_bytes:
+            raise UploadTooLargeError(
+                f"File exceeds the {max_bytes // (1024 * 1024)} MB limit for {file_type.upper()} uploads"
+            )
+
+        session_id, partial_path = FileStorage.create_upload(filename)
+        # Sparse file of the final size; chunks are written at their offsets
+        with open(partial_path, 'wb') as f:
+            f.truncate(total_size)
+
+        _store.add({
+            'session_id': session_id,
+            'original_filename': filename,
+            'partial_path': str(partial_path),
+            'file_type': file_type,
+            'total_size': total_size,
+            'chunk_size': chunk_size,
+        })
+        logger.info(f"Started upload session {session_id} for {filename} ({total_size} bytes)")
+        return ChunkedUploads.get_status(session_id)
+
+    @staticmethod
+    def get_status(session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Describe a session and the byte ranges received so far.
+
+        Args:
+            session_id: ID returned by create_session
+
+        Returns:
+            Session status, or None if unknown or expired
+        """
+        session = _store.get(session_id)
+        if session is None:
+            return None
+
+        total_chunks = ChunkedUploads._total_chunks(session)
+        received = session['received_chunks']
+        received_set = set(received)
+        return {
+            'session_id': session_id,
+            'filename': session['original_filename'],
+            'status': session['status'],
+            'total_size': session['total_size'],
+            'chunk_size': session['chunk_size'],
+            'total_chunks': total_chunks,
+            'received_chunks': received,
+            'missing_chunks': [i for i in range(total_chunks) if i not in received_set],
+            'received_ranges': ChunkedUploads._byte_ranges(session, received),
+        }
+
+    @staticmethod
+    async def write_chunk(
+        session_id: str,
+        chunk_index: int,
+        body: AsyncIterator[bytes],
+        write_size: int = 1024 * 1024
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Stream one chunk to its offset in the partial file.
+
+        The body is written in pieces of about write_size bytes as it
+        arrives. Re-sending a chunk overwrites it, so failed or duplicate
+        PUTs are harmless.
+
+        Args:
+            session_id: ID returned by create_session
+            chunk_index: Zero-based chunk number
+            body: Request body stream
+            write_size: Bytes buffered before each write
+
+        Returns:
+            Updated session status, or None if unknown or expired
+
+        Raises:
+            ValueError: If the chunk index or length is wrong
+            UploadSessionStateError: If the session is being finalized, or
+                the body stalled until the write's lease expired
+        """
+        session = await asyncio.to_thread(_store.get, session_id)
+        if session is None:
+            return None
+        offset, length = ChunkedUploads._chunk_bounds(session, chunk_index)
+
+        # Registering the write under the store keeps finalize from starting until it ends
+        writer_id = await asyncio.to_thread(_store.begin_write, session_id, WRITE_LEASE_SECONDS)
+        if writer_id is None:
+            session = await asyncio.to_thread(_store.get, session_id)
+            if session is None:
+                return None
+            raise UploadSessionStateError(f"Upload session {session_id} is {session['status']}")
+        try:
+            start = time.perf_counter()
+            try:
+                fd = os.open(session['partial_path'], os.O_WRONLY)
+            except FileNotFoundError:
+                await asyncio.to_thread(_store.remove, session_id)
+                return None
+
+            written = 0
+            buffer = bytearray()
+            renewed = time.monotonic()
+
+            async def flush():
+                nonlocal written, renewed
+                # Renew well before the lease runs out; an expired lease means finalize may have started
+                if time.monotonic() - renewed > WRITE_LEASE_SECONDS / 3:
+                    if not await asyncio.to_thread(_store.renew_write, writer_id, WRITE_LEASE_SECONDS):
+                        raise UploadSessionStateError(f"Chunk {chunk_index} of upload session {session_id} stalled")
+                    renewed = time.monotonic()
+                await asyncio.to_thread(_write_at, fd, bytes(buffer), offset + written)
+                written += len(buffer)
+                buffer.clear()
+
+            try:
+                async for piece in body:
+                    if written + len(buffer) + len(piece) > length:
+                        raise ValueError(f"Chunk {chunk_index} must be {length} bytes")
+                    buffer += piece
+                    if len(buffer) >= write_size:
+                        await flush()
+                if buffer:
+                    await flush()
+            finally:
+                os.close(fd)
+
+            if written != length:
+                raise ValueError(f"Chunk {chunk_index} must be {length} bytes, got {written}")
+            metrics.upload_bytes_total.inc(written, method="chunked")
+            metrics.upload_duration_seconds.observe(time.perf_counter() - start, method="chunked")
+
+            await asyncio.to_thread(_store.mark_received, session_id, chunk_index)
+        finally:
+            await asyncio.to_thread(_store.end_write, writer_id)
+        return await asyncio.to_thread(ChunkedUploads.get_status, session_id)
+
+    @staticmethod
+    def finalize(session_id: str, chunk_size: int = 1024 * 1024) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Describe the assembled file and register it with FileStorage.
+
+        Blocking; call it from a worker thread. The session ID becomes the
+        file_id of the upload.
+
+        Args:
+            session_id: ID returned by create_session
+            chunk_size: Read size used to scan the assembled file
+
+        Returns:
+            Tuple of (file_id, metadata), or None if unknown or expired
+
+        Raises:
+            UploadSessionStateError: If chunks are missing or still being
+                written, or the session is already being finalized
+            ValueError: If the file is not valid UTF-8 CSV or JSON
+        """
+        status = ChunkedUploads.get_status(session_id)
+        if status is None:
+            return None
+        if status['missing_chunks']:
+            raise UploadSessionStateError(
+                f"Upload session {session_id} is missing {len(status['missing_chunks'])} chunks"
+            )
+        if not _store.start_finalizing(session_id):
+            session = _store.get(session_id)
+            if session is None:
+                return None
+            if session['status'] == 'open':
+                raise UploadSessionStateError(f"Upload session {session_id} has chunks still being written")
+            raise UploadSessionStateError(f"Upload session {session_id} is already being finalized")
+
+        session = _store.get(session_id)
+        partial_path = Path(session['partial_path'])
+        try:
+            metadata = scan_upload(partial_path, session['file_type'], chunk_size)
+            FileStorage.commit_upload(session_id, session['original_filename'], partial_path, metadata)
+        except FileNotFoundError:
+            _store.remove(session_id)
+            return None
+        except Exception:
+            # Let the client re-send chunks or abort
+            _store.set_status(session_id, 'open', expected='finalizing')
+            raise
+
+        _store.remove(session_id)
+        metrics.uploads_total.inc(method="chunked")
+        logger.info(f"Finalized upload session {session_id} ({metadata['file_size_bytes']} bytes)")
+        return session_id, metadata
+
+    @staticmethod
+    def abort(session_id: str) -> bool:
+        """
+        Cancel a session and delete its partial file.
+
+        Args:
+            session_id: ID returned by create_session
+
+        Returns:
+            True if aborted, False if not found
+        """
+        session = _store.remove(session_id)
+        if session is None:
+            return False
+
+        Path(session['partial_path']).unlink(missing_ok=True)
+        return True
+
+    @staticmethod
+    def expire_sessions(max_age_hours: int = 24) -> int:
+        """
+        Remove sessions without activity for max_age_hours, and their partial files.
+
+        Args:
+            max_age_hours: Inactivity limit
+
+        Returns:
+            Number of sessions removed
+        """
+        cutoff = datetime.now() - timedelta(hours=max_age_hours)
+        expired = _store.remove_older_than(cutoff)
+        for session in expired:
+            Path(session['partial_path']).unlink(missing_ok=True)
+        return len(expired)
+
+    @staticmethod
+    def _total_chunks(session: Dict[str, Any]) -> int:
+        return max(math.ceil(session['total_size'] / session['chunk_size']), 1)
+
+    @staticmethod
+    def _chunk_bounds(session: Dict[str, Any], chunk_index: int) -> Tuple[int, int]:
+        """Offset and length of a chunk; only the last chunk may be short."""
+        total_chunks = ChunkedUploads._total_chunks(session)
+        if not 0 <= chunk_index < total_chunks:
+            raise ValueError(f"Chunk index must be between 0 and {total_chunks - 1}")
+        offset = chunk_index * session['chunk_size']
+        return offset, min(session['chunk_size'], session['total_size'] - offset)
+
+    @staticmethod
+    def _byte_ranges(session: Dict[str, Any], chunk_indexes: List[int]) -> List[List[int]]:
+        """Merge received chunks into [start, end) byte ranges."""
+        ranges: List[List[int]] = []
+        for index in chunk_indexes:
+            start, length = ChunkedUploads._chunk_bounds(session, index)
+            if ranges and ranges[-1][1] == start:
+                ranges[-1][1] = start + length
+            else:
+                ranges.append([start, start + length])
+        return ranges
+
+
+def _write_at(fd: int, data: bytes, offset: int) -> None:
+    """Write all of data at offset, without moving a shared file position."""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
@@ -0,0 +1,115 @@
+"""Benchmark the SCADA file reader in ``project_Cubico``.
+
+Compares the single-pass, parallel ``read_scada_files`` (feeding both the
+SCADA and curtailment frames) with the original loader, which parsed headers
+with the python engine and read every file twice, turbine by turbine, on
+synthetic Kelmarsh-style files. Checks that both produce identical frames.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_cubico_loader [--turbines 6] [--years 2] [--days 365]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "examples"))
+
+from project_Cubico import (  # noqa: E402
+    CURTAILMENT_COLUMNS,
+    DATE_COLUMN,
+    SCADA_COLUMNS,
+    get_curtailment_df,
+    get_scada_df,
+    get_scada_headers,
+    read_scada_files,
+)
+
+# Kelmarsh files carry ~300 signals; the loader needs only a few of them
+UNUSED_SIGNALS = 60
+
+
+def make_scada_files(directory: Path, num_turbines: int, years: int, days: int, seed: int = 0) -> list:
+    """Write one Kelmarsh-style SCADA CSV per turbine and year."""
+    rng = np.random.default_rng(seed)
+    used = SCADA_COLUMNS + CURTAILMENT_COLUMNS
+    columns = used + [f"Signal {i} (unit)" for i in range(UNUSED_SIGNALS)]
+    files = []
+    for year in range(2016, 2016 + years):
+        times = pd.date_range(f"{year}-01-01", periods=days * 144, freq="10min")
+        for t in range(1, num_turbines + 1):
+            df = pd.DataFrame(rng.normal(size=(len(times), len(columns))).round(3), columns=columns)
+            df.insert(0, DATE_COLUMN, times.strftime("%Y-%m-%d %H:%M:%S"))
+            path = directory / f"Turbine_Data_Kelmarsh_{t}_{year}.csv"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(
+                    "# Exported\n# \n"
+                    f"# Turbine: Kelmarsh {t}\n# Turbine type: MM92\n# Time zone: UTC\n"
+                    f"# Time interval: {year}\n# \n# Signals\n# \n"
+                )
+                df.to_csv(f, index=False)
+            files.append(path)
+    return files
+
+
+def load_original(scada_files: list):
+    """The original loader, kept as the reference."""
+    params = {"index_col": 0, "skiprows": 2, "nrows": 4, "delimiter": ": ", "header": None, "engine": "python"}
+    headers = pd.concat((pd.read_csv(f, **params).rename(columns={1: f}) for f in scada_files), axis=1)
+    headers.index = headers.index.str.replace("# ", "")
+    headers = headers.transpose().reset_index().rename(columns={"index": "File"})
+
+    def get_scada_df(use_columns):
+        csv_params = {"index_col": DATE_COLUMN, "parse_dates": True, "skiprows": 9, "usecols": use_columns}
+        scada_lst = []
+        for turbine in headers["Turbine"].unique():
+            scada_wt = pd.concat(
+                pd.read_csv(f, **csv_params) for f in headers.loc[headers["Turbine"] == turbine]["File"]
+            )
+            scada_wt["Turbine"] = turbine
+            scada_wt.index.names = ["Timestamp"]
+            scada_lst.append(scada_wt.copy())
+        return pd.concat(scada_lst)
+
+    return get_scada_df([DATE_COLUMN, *SCADA_COLUMNS]), get_scada_df([DATE_COLUMN, *CURTAILMENT_COLUMNS])
+
+
+def load_single_pass(scada_files: list):
+    """The current loader, as used by ``project_Cubico.prepare``."""
+    headers = get_scada_headers(scada_files)
+    data = read_scada_files(headers)
+    return get_scada_df(headers, scada_data=data), get_curtailment_df(headers, scada_data=data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turbines", type=int, default=6)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_scada_files(Path(tmp), args.turbines, args.years, args.days)
+        size_mb = sum(f.stat().st_size for f in files) / 1e6
+
+        start = time.perf_counter()
+        expected = load_original(files)
+        original_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = load_single_pass(files)
+        single_s = time.perf_counter() - start
+
+    for a, e in zip(actual, expected):
+        pd.testing.assert_frame_equal(a, e)
+    print(f"{len(files)} files, {size_mb:.0f} MB")
+    print(f"original: {original_s:.2f}s  single pass: {single_s:.2f}s  speedup: {original_s / single_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
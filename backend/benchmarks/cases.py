@@ -0,0 +1,206 @@
+"""Benchmark cases for :mod:`benchmarks.suite`.
+
+Case names are ``<group>.<operation>[<parameters>]``, and are the keys of
+saved baselines, so rename cases only together with the baselines.
+
+- ``loading``: La Haute Borne ``prepare`` (raw files, cleansed snapshot
+  and a synthetic plant of each size), ``clean_scada`` on the real file and
+  on synthetic data, and ``_load_plant_data_from_file`` on uploads with and
+  without their columnar artifact.
+- ``ingestion``: streaming an upload to disk (``ingest_upload``) and
+  writing its columnar artifact (``convert_upload``).
+- ``analysis``: every ``OpenOAService.run_*`` per mode, AEP at each
+  iteration count. Result caching is bypassed; PlantData stays cached, as
+  between requests of a running server.
+
+Synthetic inputs come from :mod:`benchmarks.synthetic` with a fixed seed,
+so every run times the same data.
+
+Real-mode and loading cases need OpenOA and the example data; a case
+that cannot run is reported as failed and the others still run.
+"""
+
+import io
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Sequence
+
+from benchmarks.suite import Case
+
+DATASET = "la_haute_borne"
+SCADA_FILE = "la-haute-borne-data-2014-2015.csv"
+
+# Stand-in for a prior AEP result, so EYA gap cases time only the comparison
+AEP_RESULT = {"aep_gwh": 12.5, "uncertainty_pct": 6.0, "seed": 0, "iterations": 1000}
+
+# Effectively unlimited upload sizes for ingestion cases
+_NO_LIMIT = 1 << 62
+
+
+@dataclass
+class CaseOptions:
+    """Sizes and modes to build cases for."""
+
+    modes: Sequence[str] = ("mock", "real")
+    iterations: Sequence[int] = (100, 1000)
+    turbines: Sequence[int] = (4, 50)
+    days: int = 30
+    upload_rows: Sequence[int] = (10_000, 200_000)
+    workdir: Path = field(default_factory=lambda: Path("."))
+
+
+def build_cases(options: CaseOptions) -> List[Case]:
+    """Build every case for the given options."""
+    return [*loading_cases(options), *ingestion_cases(options), *analysis_cases(options)]
+
+
+@contextmanager
+def service_mode(mode: str) -> Iterator[None]:
+    """Run the service in mock or real mode, without cached results."""
+    from app.core.config import get_settings
+    from app.services.result_cache import bypass_result_cache
+
+    settings = get_settings()
+    previous = settings.use_mock_data
+    settings.use_mock_data = mode == "mock"
+    try:
+        with bypass_result_cache():
+            yield
+    finally:
+        settings.use_mock_data = previous
+
+
+def write_upload_csv(path: Path, rows: int, num_turbines: int = 4, seed: int = 0) -> Path:
+    """Write a gap-free synthetic SCADA upload of exactly ``rows`` rows."""
+    from benchmarks.synthetic import STEPS_PER_DAY, SyntheticPlant, write_upload
+
+    days = -(-rows // num_turbines) / STEPS_PER_DAY
+    plant = SyntheticPlant.from_profile("clean", num_turbines=num_turbines, days=days, start="2020-01-01", seed=seed)
+    write_upload(plant, path, max_rows=rows)
+    return path
+
+
+def _data_path() -> Path:
+    from app.core.lazy_imports import examples_path
+
+    return examples_path() / "data" / DATASET
+
+
+def loading_cases(options: CaseOptions) -> List[Case]:
+    """Dataset loading: prepare, clean_scada and uploaded-file loading."""
+    from app.core.lazy_imports import get_dataset_loader, import_example_module
+    from benchmarks.synthetic import SyntheticPlant, write_dataset, write_scada
+
+    def prepare(use_cleansed: bool):
+        return lambda: get_dataset_loader(DATASET)(_data_path(), use_cleansed=use_cleansed)
+
+    def clean_real_scada():
+        engie = import_example_module("project_ENGIE")
+        with engie.open_raw_file(_data_path(), SCADA_FILE) as f:
+            return engie.clean_scada(f)
+
+    cases = [
+        Case("loading.prepare[raw]", prepare(False)),
+        Case("loading.prepare[cleansed]", prepare(True), setup=prepare(True)),
+        Case(f"loading.clean_scada[{DATASET}]", clean_real_scada),
+    ]
+
+    for num_turbines in options.turbines:
+        plant = SyntheticPlant(num_turbines=num_turbines, days=options.days)
+        path = options.workdir / f"scada_{num_turbines}.csv"
+        root = options.workdir / f"plant_{num_turbines}"
+
+        cases.append(Case(
+            f"loading.clean_scada[turbines={num_turbines},days={options.days}]",
+            lambda path=path: import_example_module("project_ENGIE").clean_scada(path),
+            setup=lambda plant=plant, path=path: write_scada(plant, path),
+        ))
+        cases.append(Case(
+            f"loading.prepare[synthetic,turbines={num_turbines},days={options.days}]",
+            lambda root=root: get_dataset_loader(DATASET)(root / DATASET),
+            setup=lambda plant=plant, root=root: write_dataset(plant, root),
+        ))
+
+    for rows in options.upload_rows:
+        csv_path = options.workdir / "csv" / f"upload_{rows}.csv"
+        columnar_path = options.workdir / "columnar" / f"upload_{rows}.csv"
+
+        def write_columnar(path=columnar_path, rows=rows):
+            from app.services.upload_conversion import convert_upload
+
+            convert_upload(str(write_upload_csv(path, rows)))
+
+        cases.append(Case(
+            f"loading.load_plant_data_from_file[csv,rows={rows}]",
+            lambda path=csv_path: _load_upload(path),
+            setup=lambda path=csv_path, rows=rows: write_upload_csv(path, rows),
+        ))
+        cases.append(Case(
+            f"loading.load_plant_data_from_file[columnar,rows={rows}]",
+            lambda path=columnar_path: _load_upload(path),
+            setup=write_columnar,
+        ))
+    return cases
+
+
+def _load_upload(path: Path):
+    from app.services.openoa_service import openoa_service
+
+    return openoa_service._load_plant_data_from_file(str(path))
+
+
+def ingestion_cases(options: CaseOptions) -> List[Case]:
+    """Upload ingestion: streaming to disk with validation, and columnar conversion."""
+    cases = []
+    for rows in options.upload_rows:
+        source = options.workdir / "ingest" / f"source_{rows}.csv"
+
+        def ingest(source=source):
+            from app.services.upload_ingest import ingest_upload
+
+            data = io.BytesIO(source.read_bytes())
+            dest = source.with_name(f"ingested_{source.name}")
+            return ingest_upload(data, dest, "csv", _NO_LIMIT, _NO_LIMIT)
+
+        def convert(source=source):
+            from app.services.upload_conversion import convert_upload
+
+            return convert_upload(str(source))
+
+        def setup(source=source, rows=rows):
+            write_upload_csv(source, rows)
+
+        cases.append(Case(f"ingestion.ingest_upload[csv,rows={rows}]", ingest, setup=setup))
+        cases.append(Case(f"ingestion.convert_upload[rows={rows}]", convert, setup=setup))
+    return cases
+
+
+def analysis_cases(options: CaseOptions) -> List[Case]:
+    """Every OpenOAService.run_* per mode; AEP per iteration count."""
+    cases = []
+    for mode in options.modes:
+        for iterations in options.iterations:
+            cases.append(Case(
+                f"analysis.aep[{mode},iterations={iterations}]",
+                _analysis(mode, "run_aep_analysis_simple", iterations=iterations, seed=0),
+            ))
+        cases.extend([
+            Case(f"analysis.electrical_losses[{mode}]", _analysis(mode, "run_electrical_losses_analysis")),
+            Case(f"analysis.wake_losses[{mode}]", _analysis(mode, "run_wake_losses_analysis")),
+            Case(f"analysis.turbine_ideal_energy[{mode}]", _analysis(mode, "run_turbine_ideal_energy_analysis")),
+            Case(
+                f"analysis.eya_gap[{mode}]",
+                _analysis(mode, "run_eya_gap_analysis", expected_aep_gwh=[11.0, 12.0, 13.0], aep_result=AEP_RESULT),
+            ),
+        ])
+    return cases
+
+
+def _analysis(mode: str, method_name: str, **kwargs):
+    def run():
+        from app.services.openoa_service import openoa_service
+
+        with service_mode(mode):
+            return getattr(openoa_service, method_name)(**kwargs)
+    return run
@@ -0,0 +1,276 @@
+"""Benchmark suite with JSON baselines and regression reports.
+
+Times dataset loading (``project_ENGIE.prepare``, ``clean_scada``,
+``OpenOAService._load_plant_data_from_file``), upload ingestion and every
+``OpenOAService.run_*`` in mock and real mode. Results can be saved as a JSON
+baseline; later runs compared against it report cases whose median time grew
+by more than ``--threshold``, and exit with status 1 on any regression or
+failed case.
+
+Not collected by pytest. Usage (from the backend directory):
+    python -m benchmarks.suite --list
+    python -m benchmarks.suite --save benchmarks/baselines/main.json
+    python -m benchmarks.suite --compare benchmarks/baselines/main.json [--threshold 0.1]
+    python -m benchmarks.suite -k analysis --modes mock --iterations 100 1000
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+@dataclass
+class Case:
+    """One timed operation.
+
+    ``setup`` runs once, untimed, before the warm-up runs (e.g. to write
+    input files). ``func`` is called once per repetition.
+    """
+
+    name: str
+    func: Callable[[], Any]
+    setup: Optional[Callable[[], Any]] = None
+
+
+@dataclass
+class Comparison:
+    """A case's current median against its baseline."""
+
+    name: str
+    baseline_s: Optional[float]
+    current_s: Optional[float]
+    status: str  # regression, improvement, unchanged, new, failed
+
+    @property
+    def change(self) -> Optional[float]:
+        if not self.baseline_s or self.current_s is None:
+            return None
+        return self.current_s / self.baseline_s - 1
+
+
+def run_case(case: Case, repeat: int = 3, warmup: int = 1) -> Dict[str, Any]:
+    """Time a case.
+
+    Args:
+        case: The case to run.
+        repeat: Timed repetitions.
+        warmup: Untimed runs before timing (imports, caches, JIT-free warm-up).
+
+    Returns:
+        dict: median_s, min_s, max_s and repeat, or error if the case failed.
+    """
+    try:
+        if case.setup is not None:
+            case.setup()
+        for _ in range(warmup):
+            case.func()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            case.func()
+            times.append(time.perf_counter() - start)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+    return {
+        "median_s": round(statistics.median(times), 6),
+        "min_s": round(min(times), 6),
+        "max_s": round(max(times), 6),
+        "repeat": repeat,
+    }
+
+
+def compare_results(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = 0.1,
+    noise_floor_s: float = 0.001,
+) -> List[Comparison]:
+    """Compare median times against a baseline.
+
+    Args:
+        current: Results of this run, by case name.
+        baseline: Baseline results, by case name.
+        threshold: Relative change counted as a regression or improvement.
+        noise_floor_s: Absolute changes below this are ignored, so
+            microsecond-scale cases do not flap.
+
+    Returns:
+        One comparison per case of the current run.
+    """
+    comparisons = []
+    for name, result in current.items():
+        current_s = result.get("median_s")
+        baseline_s = baseline.get(name, {}).get("median_s")
+        if current_s is None:
+            status = "failed"
+        elif baseline_s is None:
+            status = "new"
+        elif current_s - baseline_s > max(baseline_s * threshold, noise_floor_s):
+            status = "regression"
+        elif baseline_s - current_s > max(current_s * threshold, noise_floor_s):
+            status = "improvement"
+        else:
+            status = "unchanged"
+        comparisons.append(Comparison(name, baseline_s, current_s, status))
+    return comparisons
+
+
+def environment_metadata() -> Dict[str, Any]:
+    """Describe the machine and code a run was measured on."""
+    from app.core.lazy_imports import openoa_version
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "openoa": openoa_version(),
+    }
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """Read a results or baseline file."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(path: Path, results: Dict[str, Dict[str, Any]], merge: bool = True) -> None:
+    """Write results as a baseline file.
+
+    Args:
+        path: Destination.
+        results: Results by case name. Failed cases are not saved.
+        merge: Keep results of cases in an existing file that were not run.
+    """
+    path = Path(path)
+    existing = load_results(path)["results"] if merge and path.exists() else {}
+    existing.update({name: result for name, result in results.items() if "error" not in result})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"metadata": environment_metadata(), "results": existing}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def select_cases(cases: Sequence[Case], keywords: Optional[Sequence[str]]) -> List[Case]:
+    """Keep cases whose name contains any of the keywords (all if none)."""
+    if not keywords:
+        return list(cases)
+    return [case for case in cases if any(keyword in case.name for keyword in keywords)]
+
+
+def _format_seconds(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    if seconds < 1:
+        return f"{seconds * 1000:.2f} ms"
+    return f"{seconds:.3f} s"
+
+
+def _print_report(comparisons: Sequence[Comparison], threshold: float) -> None:
+    print(f"\nCompared with baseline (threshold {threshold:.0%}):")
+    print(f"{'case':<60} {'baseline':>12} {'current':>12} {'change':>8}  status")
+    for comparison in comparisons:
+        change = f"{comparison.change:+.1%}" if comparison.change is not None else "-"
+        print(
+            f"{comparison.name:<60} {_format_seconds(comparison.baseline_s):>12} "
+            f"{_format_seconds(comparison.current_s):>12} {change:>8}  {comparison.status}"
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--keyword", nargs="+", help="Run cases whose name contains any of these")
+    parser.add_argument("--list", action="store_true", help="List case names and exit")
+    parser.add_argument("--modes", nargs="+", choices=["mock", "real"], default=["mock", "real"])
+    parser.add_argument("--iterations", type=int, nargs="+", default=[100, 1000], help="AEP Monte Carlo iterations")
+    parser.add_argument("--turbines", type=int, nargs="+", default=[4, 50], help="Synthetic plant sizes")
+    parser.add_argument("--days", type=int, default=30, help="Days of synthetic plant data")
+    parser.add_argument("--upload-rows", type=int, nargs="+", default=[10_000, 200_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Write this run's results to a JSON file")
+    parser.add_argument("--save", type=Path, help="Save results as (or merge them into) a baseline")
+    parser.add_argument("--compare", type=Path, help="Baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown reported as a regression")
+    parser.add_argument("--noise-floor", type=float, default=0.001, help="Ignore changes below this many seconds")
+    args = parser.parse_args(argv)
+
+    from benchmarks.cases import CaseOptions, build_cases
+
+    # Analyses log every step, and failed cases are reported below
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory(prefix="openoa-bench-") as workdir:
+        options = CaseOptions(
+            modes=args.modes,
+            iterations=args.iterations,
+            turbines=args.turbines,
+            days=args.days,
+            upload_rows=args.upload_rows,
+            workdir=Path(workdir),
+        )
+        cases = select_cases(build_cases(options), args.keyword)
+        if args.list:
+            print("\n".join(case.name for case in cases))
+            return 0
+
+        results: Dict[str, Dict[str, Any]] = {}
+        print(f"{'case':<60} {'median':>12} {'min':>12}")
+        for case in cases:
+            result = run_case(case, args.repeat, args.warmup)
+            results[case.name] = result
+            if "error" in result:
+                print(f"{case.name:<60} failed: {result['error']}")
+            else:
+                print(
+                    f"{case.name:<60} {_format_seconds(result['median_s']):>12} "
+                    f"{_format_seconds(result['min_s']):>12}"
+                )
+            sys.stdout.flush()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"metadata": environment_metadata(), "results": results}, f, indent=2, sort_keys=True)
+    failed = [name for name, result in results.items() if "error" in result]
+    if args.save:
+        save_results(args.save, results)
+        print(f"\nSaved baseline to {args.save}")
+        if failed:
+            print(f"Not saved, failed: {', '.join(failed)}")
+
+    if args.compare:
+        comparisons = compare_results(
+            results, load_results(args.compare)["results"], args.threshold, args.noise_floor
+        )
+        _print_report(comparisons, args.threshold)
+        regressions = [c.name for c in comparisons if c.status == "regression"]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        if failed:
+            print(f"\n{len(failed)} failed case(s): {', '.join(failed)}")
+        if regressions or failed:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
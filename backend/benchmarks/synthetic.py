@@ -0,0 +1,531 @@
+"""Deterministic synthetic plant data for scale testing.
+
+Generates SCADA, meter/curtailment, asset and ERA5/MERRA-2-style reanalysis
+data in the La Haute Borne raw file layout, for any number of turbines,
+period and data-quality profile, either as DataFrames or streamed to files
+in the example dataset layout (loadable with ``project_ENGIE.prepare``) or
+the upload format.
+
+Data is generated one calendar week at a time from an RNG keyed on the seed
+and the week, so output is identical whether built in memory or streamed,
+a longer period extends a shorter one, and memory stays at one week of data
+however large the files grow. Wind is a smooth function of absolute time
+shared by SCADA and reanalysis, so the two correlate as an AEP analysis
+expects.
+
+Not collected by pytest. Usage (from the backend directory):
+    python -m benchmarks.synthetic dataset /tmp/synthetic --turbines 50 --days 365
+    python -m benchmarks.synthetic upload /tmp/upload.csv --turbines 200 --days 3650 --profile poor
+"""
+
+import argparse
+import math
+import re
+import sys
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+STEP = pd.Timedelta("10min")
+HOUR = pd.Timedelta("1h")
+WEEK = pd.Timedelta(days=7)
+STEPS_PER_DAY = 144
+
+# Raw file names expected by project_ENGIE.prepare
+DATASET_DIR = "la_haute_borne"
+DATASET_FILES = {
+    "scada": "la-haute-borne-data-2014-2015.csv",
+    "plant_data": "plant_data.csv",
+    "asset": "la-haute-borne_asset_table.csv",
+    "era5": "era5_wind_la_haute_borne.csv",
+    "merra2": "merra2_la_haute_borne.csv",
+}
+
+# Data-quality presets; fields of SyntheticPlant
+PROFILES = {
+    "clean": dict(gap_fraction=0.0, noise_std=0.0, stuck_fraction=0.0, curtailment_fraction=0.0),
+    "typical": dict(gap_fraction=0.02, noise_std=0.3, stuck_fraction=0.01, curtailment_fraction=0.01),
+    "poor": dict(gap_fraction=0.15, noise_std=1.0, stuck_fraction=0.05, curtailment_fraction=0.05),
+}
+
+# RNG stream ids, so each kind of data draws independent numbers
+_SITE, _TURBINES, _PLANT, _ERA5, _MERRA2 = range(5)
+
+_CUT_IN, _RATED, _CUT_OUT = 3.0, 12.0, 25.0  # m/s
+_ELECTRICAL_LOSS = 0.02
+_CURTAILED_OUTPUT = 0.5  # Share of rated power allowed while curtailed
+_PLANT_CENTROID = (48.4497, 5.5896)
+
+
+@dataclass(frozen=True)
+class SyntheticPlant:
+    """Size, period and data quality of a synthetic plant.
+
+    The defaults match the ``typical`` profile.
+
+    Attributes:
+        num_turbines: Turbines in the plant.
+        days: Length of the SCADA and meter period, in days (may be fractional).
+        start: Start of the period, UTC.
+        seed: Seed all data derives from.
+        gap_fraction: Share of turbine time lost to outages, which are
+            missing from SCADA and reported as availability losses.
+        gap_length: Mean outage length, in 10-minute steps.
+        noise_std: Standard deviation of the nacelle anemometer error, m/s.
+        stuck_fraction: Share of turbine time with frozen vane and
+            temperature sensors.
+        curtailment_fraction: Share of plant time curtailed to half of
+            rated power.
+        mean_wind_speed: Long-term mean hub-height wind speed, m/s.
+        weibull_k: Weibull shape of the wind speed distribution.
+        rated_power_kw: Turbine rated power.
+        reanalysis_years: Years of reanalysis data before the period.
+    """
+
+    num_turbines: int = 4
+    days: float = 30
+    start: str = "2014-01-01"
+    seed: int = 0
+    gap_fraction: float = 0.02
+    gap_length: int = 36
+    noise_std: float = 0.3
+    stuck_fraction: float = 0.01
+    curtailment_fraction: float = 0.01
+    mean_wind_speed: float = 7.0
+    weibull_k: float = 2.0
+    rated_power_kw: float = 2050.0
+    reanalysis_years: int = 20
+
+    def __post_init__(self):
+        if self.num_turbines < 1:
+            raise ValueError("num_turbines must be at least 1")
+        if self.steps < 1:
+            raise ValueError("days must cover at least one 10-minute step")
+        for name in ("gap_fraction", "stuck_fraction", "curtailment_fraction"):
+            if not 0 <= getattr(self, name) < 1:
+                raise ValueError(f"{name} must be in [0, 1)")
+
+    @classmethod
+    def from_profile(cls, profile: str = "typical", **kwargs) -> "SyntheticPlant":
+        """Build a plant with a named data-quality profile.
+
+        Args:
+            profile: One of ``PROFILES``.
+            **kwargs: Other fields, or profile fields to override.
+
+        Raises:
+            ValueError: If the profile is unknown.
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile {profile!r}; expected one of {sorted(PROFILES)}")
+        return cls(**{**PROFILES[profile], **kwargs})
+
+    @property
+    def steps(self) -> int:
+        """10-minute steps in the period."""
+        return round(self.days * STEPS_PER_DAY)
+
+    @property
+    def start_time(self) -> pd.Timestamp:
+        return pd.Timestamp(self.start, tz="UTC")
+
+    @property
+    def end_time(self) -> pd.Timestamp:
+        """End of the period (exclusive)."""
+        return self.start_time + self.steps * STEP
+
+    @property
+    def capacity_mw(self) -> float:
+        return self.num_turbines * self.rated_power_kw / 1000
+
+    @property
+    def turbine_ids(self) -> np.ndarray:
+        width = max(3, len(str(self.num_turbines)))
+        return np.array([f"T{i:0{width}d}" for i in range(1, self.num_turbines + 1)])
+
+
+def _weeks(start: pd.Timestamp, end: pd.Timestamp, freq: pd.Timedelta, offset: pd.Timedelta = pd.Timedelta(0)):
+    """Yield (week index, epoch nanoseconds of every step in the week, mask of steps in [start, end))."""
+    week_ns, step_ns = WEEK.value, freq.value
+    steps = np.arange(week_ns // step_ns, dtype=np.int64) * step_ns + offset.value
+    for week in range(start.value // week_ns, -(-end.value // week_ns)):
+        times = week * week_ns + steps
+        yield week, times, (times >= start.value) & (times < end.value)
+
+
+@lru_cache(maxsize=None)
+def _site_waves(seed: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Periods (hours), amplitudes and phases of the weather sinusoids."""
+    rng = np.random.default_rng([seed, _SITE])
+    periods = np.concatenate([np.exp(rng.uniform(np.log(3), np.log(500), 12)), [24, 8766]])
+    amplitudes = np.concatenate([rng.uniform(0.5, 1.0, 12), [0.4, 0.5]])
+    phases = rng.uniform(0, 2 * np.pi, (3, len(periods)))
+    return periods, amplitudes, phases
+
+
+def _site_wind(plant: SyntheticPlant, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Hub-height wind speed and direction, and air temperature, at the given epoch nanoseconds.
+
+    Sums of seeded sinusoids of absolute time, so every data set sees the
+    same weather regardless of how it is chunked.
+    """
+    periods, amplitudes, phases = _site_waves(plant.seed)
+    hours = times / HOUR.value
+
+    def wave(phase):
+        z = (amplitudes * np.sin(2 * np.pi * hours[:, None] / periods + phase)).sum(axis=1)
+        return z / np.sqrt((amplitudes ** 2).sum() / 2)
+
+    # Gaussian to Weibull through the normal CDF
+    from scipy.special import ndtr
+
+    scale = plant.mean_wind_speed / math.gamma(1 + 1 / plant.weibull_k)
+    speed = scale * (-np.log1p(-ndtr(wave(phases[0])) * (1 - 1e-12))) ** (1 / plant.weibull_k)
+    direction = (240 + 50 * wave(phases[1])) % 360
+    temperature = 10 - 8 * np.cos(2 * np.pi * hours / 8766) + 3 * np.sin(2 * np.pi * hours / 24 + phases[2, 0])
+    return speed, direction, temperature
+
+
+def _power_curve(speed: np.ndarray, rated_power_kw: float) -> np.ndarray:
+    ramp = (speed ** 3 - _CUT_IN ** 3) / (_RATED ** 3 - _CUT_IN ** 3)
+    power = rated_power_kw * np.clip(ramp, 0, 1)
+    return np.where(speed >= _CUT_OUT, 0.0, power)
+
+
+def _runs(rng: np.random.Generator, shape: Tuple[int, int], fraction: float, mean_length: float) -> np.ndarray:
+    """Mask of random runs covering about ``fraction`` of each column."""
+    steps, cols = shape
+    count = rng.poisson(fraction * steps / mean_length, cols)
+    col = np.repeat(np.arange(cols), count)
+    begin = rng.integers(0, steps, col.size)
+    length = rng.geometric(1 / mean_length, col.size)
+    edges = np.zeros((steps + 1, cols), dtype=np.int32)
+    np.add.at(edges, (begin, col), 1)
+    np.add.at(edges, (np.minimum(begin + length, steps), col), -1)
+    return np.cumsum(edges, axis=0)[:-1] > 0
+
+
+def _hold(values: np.ndarray, stuck: np.ndarray) -> np.ndarray:
+    """Repeat the last value before each stuck run through the run."""
+    index = np.where(stuck, 0, np.arange(len(values))[:, None])
+    return np.take_along_axis(values, np.maximum.accumulate(index, axis=0), axis=0)
+
+
+def iter_plant_weeks(plant: SyntheticPlant) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """Generate SCADA and meter/curtailment data a week at a time.
+
+    Yields:
+        (scada, plant_data) per calendar week, in the columns of the La Haute
+        Borne SCADA file and ``plant_data.csv``, with UTC timestamps.
+    """
+    factors = np.random.default_rng([plant.seed, _TURBINES]).uniform(0.93, 1.03, plant.num_turbines)
+    turbine_ids = plant.turbine_ids
+
+    for week, times, keep in _weeks(plant.start_time, plant.end_time, STEP):
+        rng = np.random.default_rng([plant.seed, _PLANT, week])
+        shape = (len(times), plant.num_turbines)
+        site_speed, site_direction, site_temperature = _site_wind(plant, times)
+
+        speed = np.clip(site_speed[:, None] * factors * (1 + rng.normal(0, 0.05, shape)), 0, None)
+        outage = _runs(rng, shape, plant.gap_fraction, plant.gap_length)
+        curtailed = _runs(rng, (len(times), 1), plant.curtailment_fraction, 12)
+        stuck = _runs(rng, shape, plant.stuck_fraction, 24)
+
+        available = _power_curve(speed, plant.rated_power_kw)
+        cap = np.where(curtailed, _CURTAILED_OUTPUT * plant.rated_power_kw, np.inf)
+        power = np.where(outage, 0.0, np.minimum(available, cap))
+        pitch = np.where(speed > _RATED, 2 * (speed - _RATED), -1.0) + rng.normal(0, 0.2, shape)
+        measured_speed = np.clip(speed + rng.normal(0, 1, shape) * plant.noise_std, 0, None)
+        wind_direction = (site_direction[:, None] + rng.normal(0, 5, shape)) % 360
+        vane = _hold(rng.normal(0, 4, shape).round(2), stuck)
+        temperature = _hold((site_temperature[:, None] + rng.normal(0, 0.5, shape)).round(1), stuck)
+
+        rows = (keep[:, None] & ~outage).ravel()
+        scada = pd.DataFrame({
+            "Wind_turbine_name": np.broadcast_to(turbine_ids, shape).ravel()[rows],
+            "Date_time": pd.to_datetime(np.repeat(times, plant.num_turbines)[rows], utc=True),
+            "Ba_avg": pitch.round(2).ravel()[rows],
+            "P_avg": power.round(2).ravel()[rows],
+            "Ws_avg": measured_speed.round(2).ravel()[rows],
+            "Va_avg": vane.ravel()[rows],
+            "Ot_avg": temperature.ravel()[rows],
+            "Ya_avg": ((wind_direction - vane) % 360).round(2).ravel()[rows],
+            "Wa_avg": wind_direction.round(2).ravel()[rows],
+        })
+
+        net_energy = power.sum(axis=1) / 6 * (1 - _ELECTRICAL_LOSS) * (1 + rng.normal(0, 0.002, len(times)))
+        lost_to_outages = np.where(outage, available, 0).sum(axis=1) / 6
+        lost_to_curtailment = np.where(outage, 0, available - np.minimum(available, cap)).sum(axis=1) / 6
+        plant_data = pd.DataFrame({
+            "time_utc": pd.to_datetime(times[keep], utc=True),
+            "net_energy_kwh": net_energy[keep].round(3),
+            "availability_kwh": lost_to_outages[keep].round(3),
+            "curtailment_kwh": lost_to_curtailment[keep].round(3),
+        })
+        yield scada, plant_data
+
+
+def iter_reanalysis(plant: SyntheticPlant, product: str, batch_weeks: int = 52) -> Iterator[pd.DataFrame]:
+    """Generate hourly reanalysis data.
+
+    Covers ``reanalysis_years`` before the plant period through its end.
+    Values are drawn a week at a time like the plant data; weeks are
+    batched into frames because hourly weeks are too small to be worth a
+    DataFrame each.
+
+    Args:
+        plant: The plant.
+        product: ``era5`` (100 m, on the hour) or ``merra2`` (50 m, on the half hour).
+        batch_weeks: Weeks per yielded frame. Does not change the data.
+
+    Yields:
+        Frames in the columns of the La Haute Borne reanalysis files, with
+        naive UTC timestamps and without the index column.
+
+    Raises:
+        ValueError: If the product is unknown.
+    """
+    if product not in ("era5", "merra2"):
+        raise ValueError(f"Unknown reanalysis product {product!r}")
+    start = plant.start_time - pd.DateOffset(years=plant.reanalysis_years)
+    offset = pd.Timedelta(0) if product == "era5" else pd.Timedelta("30min")
+    shear = 1.0 if product == "era5" else 0.9  # 50 m is slower than hub height
+    stream = _ERA5 if product == "era5" else _MERRA2
+
+    batch_times, batch_values = [], []
+    for week, times, keep in _weeks(start, plant.end_time, HOUR, offset):
+        rng = np.random.default_rng([plant.seed, stream, week])
+        n = len(times)
+        site_speed, site_direction, site_temperature = _site_wind(plant, times)
+        speed = np.clip(site_speed * shear * (1 + rng.normal(0, 0.08, n)), 0.1, None)
+        radians = np.deg2rad(site_direction + rng.normal(0, 3, n))
+        temperature = site_temperature + 273.15 + rng.normal(0, 0.3, n)
+        pressure = 97000 + 800 * np.sin(2 * np.pi * times / (HOUR.value * 24 * 9.3)) + rng.normal(0, 50, n)
+        batch_times.append(times[keep])
+        batch_values.append(np.stack([speed, radians, temperature, pressure])[:, keep])
+        if len(batch_times) == batch_weeks:
+            yield _reanalysis_frame(product, np.concatenate(batch_times), np.concatenate(batch_values, axis=1))
+            batch_times, batch_values = [], []
+    if batch_times:
+        yield _reanalysis_frame(product, np.concatenate(batch_times), np.concatenate(batch_values, axis=1))
+
+
+def _reanalysis_frame(product: str, times: np.ndarray, values: np.ndarray) -> pd.DataFrame:
+    speed, radians, temperature, pressure = values
+    u, v = -speed * np.sin(radians), -speed * np.cos(radians)
+    density = pressure / (287.05 * temperature)
+    stamps = pd.to_datetime(times)
+
+    if product == "era5":
+        frame = pd.DataFrame({
+            "datetime": stamps,
+            "u_100": u, "v_100": v,
+            "t_2m": temperature, "surf_pres": pressure,
+            "ws_100m": speed, "dens_100m": density,
+        })
+    else:
+        frame = pd.DataFrame({
+            "datetime": stamps,
+            "surface_pressure": pressure,
+            "surface_skin_temperature": temperature - 0.5,
+            "u_10": 0.7 * u, "v_10": 0.7 * v,
+            "u_50": u, "v_50": v,
+            "temp_2m": temperature, "temp_10m": temperature - 0.1,
+            "u_850": 1.6 * u, "v_850": 1.6 * v,
+            "temp_850": temperature - 9.0,
+            "ws_50m": speed, "dens_50m": density,
+        })
+    return frame.round(4)
+
+
+def asset_frame(plant: SyntheticPlant) -> pd.DataFrame:
+    """Asset table in the columns of the La Haute Borne asset file; turbines on a grid."""
+    columns = math.ceil(math.sqrt(plant.num_turbines))
+    index = np.arange(plant.num_turbines)
+    latitude, longitude = _PLANT_CENTROID
+    return pd.DataFrame({
+        "Wind_turbine_name": plant.turbine_ids,
+        "Latitude": (latitude + 0.004 * (index // columns)).round(4),
+        "Longitude": (longitude + 0.006 * (index % columns)).round(4),
+        "elevation_m": 411,
+        "Rated_power": plant.rated_power_kw,
+        "Hub_height_m": 80,
+        "Rotor_diameter_m": 82,
+        "Manufacturer": "Synthetic",
+        "Model": f"SYN{plant.rated_power_kw:g}",
+    })
+
+
+def scada_frame(plant: SyntheticPlant) -> pd.DataFrame:
+    """All SCADA data in memory. Prefer the writers for large plants."""
+    return pd.concat([scada for scada, _ in iter_plant_weeks(plant)], ignore_index=True)
+
+
+def plant_data_frame(plant: SyntheticPlant) -> pd.DataFrame:
+    """All meter and curtailment data, as in ``plant_data.csv``."""
+    return pd.concat([plant_data for _, plant_data in iter_plant_weeks(plant)], ignore_index=True)
+
+
+def reanalysis_frame(plant: SyntheticPlant, product: str) -> pd.DataFrame:
+    """All data of a reanalysis product in memory."""
+    return pd.concat(iter_reanalysis(plant, product), ignore_index=True)
+
+
+class _CsvSink:
+    """Append DataFrames to a CSV file, with timestamps at second resolution."""
+
+    def __init__(self, path: Path, index_column: bool = False):
+        self.path = Path(path)
+        self.index_column = index_column
+        self.rows = 0
+        self._writer = None
+
+    def write(self, frame: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        if self.index_column:
+            frame = frame.copy()
+            frame.insert(0, "", np.arange(self.rows, self.rows + len(frame)))
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        for i, column in enumerate(table.schema):
+            if pa.types.is_timestamp(column.type):
+                table = table.set_column(i, column.name, table[i].cast(pa.timestamp("s", column.type.tz)))
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            options = pa_csv.WriteOptions(quoting_style="none")
+            self._writer = pa_csv.CSVWriter(str(self.path), table.schema, write_options=options)
+        self._writer.write_table(table)
+        self.rows += len(frame)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_dataset(plant: SyntheticPlant, root: Path) -> Path:
+    """Write a complete dataset in the La Haute Borne layout.
+
+    Writes ``root/plant_meta.yml`` (the example metadata with this plant's
+    capacity) and the raw files under ``root/la_haute_borne``, streaming a
+    week at a time.
+
+    Args:
+        plant: The plant.
+        root: Destination directory.
+
+    Returns:
+        Path: The data directory, to pass to ``project_ENGIE.prepare``.
+    """
+    from app.core.lazy_imports import examples_path
+
+    root = Path(root)
+    data_dir = root / DATASET_DIR
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    meta = (examples_path() / "data" / "plant_meta.yml").read_text()
+    meta = re.sub(r"(?m)^capacity: [\d.]+", f"capacity: {plant.capacity_mw:g}", meta)
+    (root / "plant_meta.yml").write_text(meta)
+
+    asset_frame(plant).to_csv(data_dir / DATASET_FILES["asset"], index=False)
+    with _CsvSink(data_dir / DATASET_FILES["scada"]) as scada_sink, \
+            _CsvSink(data_dir / DATASET_FILES["plant_data"]) as plant_sink:
+        for scada, plant_data in iter_plant_weeks(plant):
+            scada_sink.write(scada)
+            plant_sink.write(plant_data)
+    for product in ("era5", "merra2"):
+        with _CsvSink(data_dir / DATASET_FILES[product], index_column=True) as sink:
+            for frame in iter_reanalysis(plant, product):
+                sink.write(frame)
+    return data_dir
+
+
+def write_scada(plant: SyntheticPlant, path: Path) -> int:
+    """Write only the SCADA file of the La Haute Borne layout (input of ``clean_scada``).
+
+    Returns:
+        int: Rows written.
+    """
+    with _CsvSink(path) as sink:
+        for scada, _ in iter_plant_weeks(plant):
+            sink.write(scada)
+    return sink.rows
+
+
+def write_upload(plant: SyntheticPlant, path: Path, max_rows: Optional[int] = None) -> int:
+    """Write SCADA data in the upload format (time, asset_id, WTUR_W, WMET_HorWdSpd).
+
+    Args:
+        plant: The plant.
+        path: Destination CSV file.
+        max_rows: Stop after this many rows.
+
+    Returns:
+        int: Rows written.
+    """
+    with _CsvSink(path) as sink:
+        for scada, _ in iter_plant_weeks(plant):
+            if max_rows is not None:
+                scada = scada.iloc[:max_rows - sink.rows]
+            sink.write(pd.DataFrame({
+                "time": scada["Date_time"],
+                "asset_id": scada["Wind_turbine_name"],
+                "WTUR_W": scada["P_avg"],
+                "WMET_HorWdSpd": scada["Ws_avg"],
+            }))
+            if sink.rows == max_rows:
+                break
+    return sink.rows
+
+
+def _file_sizes(paths: Sequence[Path]) -> Dict[str, int]:
+    return {path.name: path.stat().st_size for path in paths}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("format", choices=["dataset", "upload"], help="La Haute Borne layout or upload CSV")
+    parser.add_argument("output", type=Path, help="Directory (dataset) or CSV file (upload)")
+    parser.add_argument("--turbines", type=int, default=4)
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--start", default="2014-01-01")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical")
+    parser.add_argument("--reanalysis-years", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    plant = SyntheticPlant.from_profile(
+        args.profile,
+        num_turbines=args.turbines,
+        days=args.days,
+        start=args.start,
+        seed=args.seed,
+        reanalysis_years=args.reanalysis_years,
+    )
+    started = time.perf_counter()
+    if args.format == "dataset":
+        data_dir = write_dataset(plant, args.output)
+        sizes = _file_sizes(sorted(data_dir.iterdir()))
+    else:
+        write_upload(plant, args.output)
+        sizes = _file_sizes([args.output])
+
+    for name, size in sizes.items():
+        print(f"{name:<45} {size / 1e6:>10.1f} MB")
+    print(f"Wrote {sum(sizes.values()) / 1e6:.1f} MB in {time.perf_counter() - started:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
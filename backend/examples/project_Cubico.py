@@ -35,6 +35,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from zipfile import ZipFile
 
 import yaml
@@ -79,10 +80,41 @@ def download_asset_data(
     downloader.download_zenodo_data(record_id, outfile_path)
 
 
+# Columns read from every SCADA file: the SCADA signals and the curtailment/availability losses
+DATE_COLUMN = "# Date and time"
+SCADA_COLUMNS = [
+    "Power (kW)",
+    "Wind speed (m/s)",
+    "Wind direction (°)",
+    "Nacelle position (°)",
+    "Nacelle ambient temperature (°C)",
+    "Blade angle (pitch position) A (°)",
+]
+CURTAILMENT_COLUMNS = [
+    "Lost Production to Curtailment (Total) (kWh)",
+    "Lost Production to Downtime (kWh)",
+]
+
+
+def _read_file_header(scada_file: str | Path) -> dict[str, str]:
+    """Read the "# Key: Value" lines (lines 3-6) at the top of a SCADA file."""
+    header = {"File": scada_file}
+    with open(scada_file, encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            if i >= 6:
+                break
+            if i >= 2 and ": " in line:
+                key, value = line.rstrip("\r\n").split(": ", 1)
+                header[key.replace("# ", "")] = value
+    return header
+
+
 def get_scada_headers(scada_files: list[str]) -> pd.DataFrame:
     """
     Get just the headers from the SCADA files.
 
+    Only the first few lines of each file are read, without a CSV parser.
+
     Args:
         scada_files(obj:`list[str]`): List of SCADA file paths.
 
@@ -90,27 +122,73 @@ def get_scada_headers(scada_files: list[str]) -> pd.DataFrame:
         scada_headers(:obj:`dataframe`): Dataframe containing details of all the SCADA files.
     """
 
-    csv_params = {
-        "index_col": 0,
-        "skiprows": 2,
-        "nrows": 4,
-        "delimiter": ": ",
-        "header": None,
-        "engine": "python",
-    }
+    return pd.DataFrame([_read_file_header(f) for f in scada_files])
+
 
-    scada_headers = pd.concat(
-        (pd.read_csv(f, **csv_params).rename(columns={1: f}) for f in scada_files), axis=1
+def _read_scada_file(scada_file: str | Path, turbine: str, use_columns: list[str]) -> pd.DataFrame:
+    """Read the selected columns of one SCADA file with explicit dtypes."""
+    data_columns = [c for c in use_columns if c != DATE_COLUMN]
+    df = pd.read_csv(
+        scada_file,
+        skiprows=9,
+        usecols=[DATE_COLUMN, *data_columns],
+        dtype=dict.fromkeys(data_columns, "float64"),
+        engine="c",
     )
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.pop(DATE_COLUMN), format="ISO8601"))
+    df.index.names = ["Timestamp"]
+    df["Turbine"] = turbine
+    return df
 
-    scada_headers.index = scada_headers.index.str.replace("# ", "")
 
-    scada_headers = scada_headers.transpose().reset_index().rename(columns={"index": "File"})
+def read_scada_files(
+    scada_headers: pd.DataFrame,
+    use_columns: list[str] | None = None,
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """
+    Read every SCADA file once, in parallel, keeping only the needed columns.
 
-    return scada_headers
+    Files are read by a thread pool (the C parser releases the GIL while tokenizing) and
+    combined with a single concatenation, ordered by turbine then by file.
 
+    Args:
+        scada_headers(:obj:`dataframe`): Dataframe containing details of all SCADA files.
+        use_columns(obj:`list[str]`): Columns to read, besides the timestamp. Defaults to the
+            SCADA and curtailment columns, so one read feeds both ``get_scada_df`` and
+            ``get_curtailment_df``.
+        max_workers(:obj:`int`): Number of reader threads. Defaults to the
+            ``ThreadPoolExecutor`` default.
 
-def get_scada_df(scada_headers: pd.DataFrame, use_columns: list[str] | None = None) -> pd.DataFrame:
+    Returns:
+        scada_data(:obj:`dataframe`): Dataframe indexed by Timestamp with a Turbine column.
+    """
+
+    if use_columns is None:
+        use_columns = SCADA_COLUMNS + CURTAILMENT_COLUMNS
+
+    turbines = scada_headers["Turbine"].unique()
+    order = {turbine: i for i, turbine in enumerate(turbines)}
+    files = scada_headers.assign(_order=scada_headers["Turbine"].map(order)).sort_values(
+        "_order", kind="stable"
+    )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        frames = list(
+            pool.map(
+                lambda row: _read_scada_file(row[0], row[1], use_columns),
+                zip(files["File"], files["Turbine"]),
+            )
+        )
+
+    return pd.concat(frames)
+
+
+def get_scada_df(
+    scada_headers: pd.DataFrame,
+    use_columns: list[str] | None = None,
+    scada_data: pd.DataFrame | None = None,
+) -> pd.DataFrame:
     """
     Extract the desired SCADA data.
 
@@ -118,64 +196,43 @@ def get_scada_df(scada_headers: pd.DataFrame, use_columns: list[str] | None = No
         scada_headers(:obj:`dataframe`): Dataframe containing details of all SCADA files.
         usecolumns(obj:`list[str]`): Selection of columns to be imported from the SCADA files.
             Defaults to None.
+        scada_data(:obj:`dataframe`): Result of ``read_scada_files`` to select the columns from
+            instead of reading the files again. Defaults to None.
 
     Returns:
         scada(:obj:`dataframe`): Dataframe with SCADA data.
     """
 
     if use_columns is None:
-        use_columns = [
-            "# Date and time",
-            "Power (kW)",
-            "Wind speed (m/s)",
-            "Wind direction (°)",
-            "Nacelle position (°)",
-            "Nacelle ambient temperature (°C)",
-            "Blade angle (pitch position) A (°)",
-        ]
-
-    csv_params = {
-        "index_col": "# Date and time",
-        "parse_dates": True,
-        "skiprows": 9,
-        "usecols": use_columns,
-    }
-
-    scada_lst = list()
-    for turbine in scada_headers["Turbine"].unique():
-        scada_wt = pd.concat(
-            pd.read_csv(f, **csv_params)
-            for f in list(scada_headers.loc[scada_headers["Turbine"] == turbine]["File"])
-        )
-
-        scada_wt["Turbine"] = turbine
-        scada_wt.index.names = ["Timestamp"]
-        scada_lst.append(scada_wt.copy())
+        use_columns = [DATE_COLUMN, *SCADA_COLUMNS]
 
-    scada = pd.concat(scada_lst)
+    data_columns = [c for c in use_columns if c != DATE_COLUMN]
+    if scada_data is None:
+        scada_data = read_scada_files(scada_headers, data_columns)
 
-    return scada
+    # Keep the file's column order, as ``usecols`` would
+    return scada_data[[c for c in scada_data.columns if c in data_columns] + ["Turbine"]]
 
 
-def get_curtailment_df(scada_headers: pd.DataFrame) -> pd.DataFrame:
+def get_curtailment_df(
+    scada_headers: pd.DataFrame, scada_data: pd.DataFrame | None = None
+) -> pd.DataFrame:
     """
     Get the curtailment and availability data.
 
     Args:
         scada_headers(:obj:`dataframe`): Dataframe containing details of all SCADA files.
+        scada_data(:obj:`dataframe`): Result of ``read_scada_files`` to select the columns from
+            instead of reading the files again. Defaults to None.
 
     Returns:
         curtailment_df(:obj:`dataframe`): Dataframe with curtailment data.
     """
 
     # Curtailment data is available as a subset of the SCADA data
-    use_columns = [
-        "# Date and time",
-        "Lost Production to Curtailment (Total) (kWh)",
-        "Lost Production to Downtime (kWh)",
-    ]
+    use_columns = [DATE_COLUMN, *CURTAILMENT_COLUMNS]
 
-    curtailment_df = get_scada_df(scada_headers, use_columns)
+    curtailment_df = get_scada_df(scada_headers, use_columns, scada_data)
 
     return curtailment_df
 
@@ -252,7 +309,9 @@ def prepare(asset: str = "kelmarsh", return_value: str = "plantdata") -> PlantDa
     logger.info("Reading in the SCADA data")
     scada_files = Path(path).rglob("Turbine_Data*.csv")
     scada_headers = get_scada_headers(scada_files)
-    scada_df = get_scada_df(scada_headers)
+    # One parallel pass over the files feeds both the SCADA and the curtailment data
+    scada_data = read_scada_files(scada_headers)
+    scada_df = get_scada_df(scada_headers, scada_data=scada_data)
     scada_df = scada_df.reset_index()
 
     ##############
@@ -268,7 +327,7 @@ def prepare(asset: str = "kelmarsh", return_value: str = "plantdata") -> PlantDa
     #####################################
 
     logger.info("Reading in the curtailment and availability losses data")
-    curtail_df = get_curtailment_df(scada_headers)
+    curtail_df = get_curtailment_df(scada_headers, scada_data=scada_data)
     curtail_df = curtail_df.reset_index()
 
     ###################
@@ -33,8 +33,13 @@ steps taken to correct the raw data for use in the PRUF OA code.
 
 from __future__ import annotations
 
+import os
 import re
+import json
+import hashlib
+import tempfile
 from pathlib import Path
+from contextlib import contextmanager
 from zipfile import ZipFile
 
 import numpy as np
@@ -43,15 +48,28 @@ import pandas as pd
 import openoa.utils.unit_conversion as un
 import openoa.utils.met_data_processing as met
 from openoa.plant import PlantData
-from openoa.utils import filters, timeseries
+from openoa.utils import timeseries
 from openoa.logging import logging
 
 logger = logging.getLogger()
 
+# Bump when the cleaning steps change so that stale snapshots are rebuilt
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FRAMES = ("scada", "meter", "curtail", "asset", "reanalysis_era5", "reanalysis_merra2")
+RAW_FILES = (
+    "la-haute-borne-data-2014-2015.csv",
+    "plant_data.csv",
+    "merra2_la_haute_borne.csv",
+    "era5_wind_la_haute_borne.csv",
+    "la-haute-borne_asset_table.csv",
+)
+
 
 def extract_data(path="data/la_haute_borne"):
     """
     Extract zip file containing project engie data.
+
+    Not needed by :py:func:`prepare`, which reads the files straight from the archive.
     """
     path = Path(path).resolve()
     if not path.exists():
@@ -60,11 +78,98 @@ def extract_data(path="data/la_haute_borne"):
             zipfile.extractall(path)
 
 
+@contextmanager
+def open_raw_file(path: str | Path, name: str):
+    """Opens one raw La Haute Borne file for reading.
+
+    The extracted copy in `path` is used if it exists; otherwise the member is streamed
+    straight out of the zip archive of the same name, so the archive never has to be
+    extracted to disk.
+
+    Args:
+        path (str | Path): The file path to the La Haute Borne data folder.
+        name (str): The file name, e.g. "plant_data.csv".
+
+    Yields:
+        BinaryIO: The open file, suitable for ``pd.read_csv``.
+    """
+    path = Path(path)
+    if (path / name).exists():
+        with open(path / name, "rb") as f:
+            yield f
+    else:
+        with ZipFile(path.with_suffix(".zip")) as archive, archive.open(name) as f:
+            yield f
+
+
+def unresponsive_flag_by_group(
+    df: pd.DataFrame, group_col: str, threshold: int, col: list[str]
+) -> pd.DataFrame:
+    """Flags repeated values in `col` for every group (turbine) at once.
+
+    Equivalent to calling `filters.unresponsive_flag` on each group separately: a value is flagged
+    when it is part of a run of at least `threshold` consecutive equal values within its group (rows
+    in frame order). NaNs never form runs. Rather than looping over groups, the rows are stably
+    sorted by group so each group is contiguous, and runs are measured with a cumulative sum of
+    change points, so the cost is independent of the number of groups.
+
+    Args:
+        df (:obj:`pd.DataFrame`): The data to flag.
+        group_col (:obj:`str`): The column identifying each group, e.g. the turbine name.
+        threshold (:obj:`int`): The minimum run length to flag.
+        col (:obj:`list[str]`): The columns to check.
+
+    Returns:
+        pd.DataFrame: Boolean flags for `col`, with the same index as `df`.
+    """
+    codes, _ = pd.factorize(df[group_col])
+    order = np.argsort(codes, kind="stable")
+    groups = codes[order]
+    values = df[col].to_numpy(dtype=float)[order]
+
+    # A run starts at each group boundary and wherever the value changes (NaN always counts as a change)
+    changed = np.ones(values.shape, dtype=bool)
+    changed[1:] = (values[1:] - values[:-1] != 0) | (groups[1:] != groups[:-1])[:, None]
+
+    # Label runs per column, then look up each row's run length
+    run_id = np.cumsum(changed, axis=0) - 1
+    flag = np.empty(values.shape, dtype=bool)
+    for j in range(values.shape[1]):
+        flag[order, j] = np.bincount(run_id[:, j])[run_id[:, j]] >= threshold
+
+    return pd.DataFrame(flag, index=df.index, columns=col)
+
+
+def flag_unresponsive_sensors(scada_df: pd.DataFrame) -> pd.DataFrame:
+    """Blanks out unresponsive sensor readings for all turbines in two vectorized passes.
+
+    Readings where the wind vane direction repeats 3 or more times in a row are removed for all
+    sensors, then temperature readings that repeat 20 or more times in a row are removed.
+
+    Args:
+        scada_df (:obj:`pd.DataFrame`): The SCADA data, with a "Wind_turbine_name" column.
+
+    Returns:
+        pd.DataFrame: The SCADA data with unresponsive readings set to NaN.
+    """
+    sensor_cols = ["Ba_avg", "P_avg", "Ws_avg", "Va_avg", "Ot_avg", "Ya_avg", "Wa_avg"]
+
+    # Cancel out readings where the wind vane direction repeats more than 3 times in a row
+    ix_flag = unresponsive_flag_by_group(scada_df, "Wind_turbine_name", 3, col=["Va_avg"])["Va_avg"]
+    scada_df.loc[ix_flag, sensor_cols] = np.nan
+
+    # Cancel out the temperature readings where the value repeats more than 20 times in a row
+    ix_flag = unresponsive_flag_by_group(scada_df, "Wind_turbine_name", 20, col=["Ot_avg"])["Ot_avg"]
+    scada_df.loc[ix_flag, "Ot_avg"] = np.nan
+
+    return scada_df
+
+
 def clean_scada(scada_file: str | Path) -> pd.DataFrame:
     """Reads in and cleans up the SCADA data
 
     Args:
-        scada_file (:obj: `str` | `Path`): The file object corresponding to the SCADA data.
+        scada_file (:obj: `str` | `Path` | file-like): The SCADA data file, or an open file object.
 
     Returns:
         pd.DataFrame: The cleaned up SCADA data that is ready for loading into a `PlantData` object.
@@ -89,18 +194,7 @@ def clean_scada(scada_file: str | Path) -> pd.DataFrame:
     # Filter out the unresponsive sensors
     # Due to data discretization, there appear to be a large number of repeating values
     logger.info("Flagging unresponsive sensors")
-    turbine_id_list = scada_df.Wind_turbine_name.unique()
-    sensor_cols = ["Ba_avg", "P_avg", "Ws_avg", "Va_avg", "Ot_avg", "Ya_avg", "Wa_avg"]
-    for t_id in turbine_id_list:
-        ix_turbine = scada_df["Wind_turbine_name"] == t_id
-
-        # Cancel out readings where the wind vane direction repeats more than 3 times in a row
-        ix_flag = filters.unresponsive_flag(scada_df.loc[ix_turbine], 3, col=["Va_avg"])
-        scada_df.loc[ix_flag.loc[ix_flag["Va_avg"]].index, sensor_cols] = np.nan
-
-        # Cancel out the temperature readings where the value repeats more than 20 times in a row
-        ix_flag = filters.unresponsive_flag(scada_df.loc[ix_turbine], 20, col=["Ot_avg"])
-        scada_df.loc[ix_flag.loc[ix_flag["Ot_avg"]].index, "Ot_avg"] = np.nan
+    scada_df = flag_unresponsive_sensors(scada_df)
 
     logger.info("Converting pitch to the range [-180, 180]")
     scada_df.loc[:, "Ba_avg"] = scada_df["Ba_avg"] % 360
@@ -113,9 +207,104 @@ def clean_scada(scada_file: str | Path) -> pd.DataFrame:
     return scada_df
 
 
+def raw_data_fingerprint(path: str | Path) -> str:
+    """Fingerprints the raw La Haute Borne files from their names, sizes, and modification times.
+
+    Args:
+        path (str | Path): The file path to the La Haute Borne data folder.
+
+    Returns:
+        str: Hex digest that changes whenever a raw file (or the zip archive) changes.
+    """
+    path = Path(path)
+    digest = hashlib.sha1(f"v{SNAPSHOT_VERSION};".encode())
+    for raw in [path.with_suffix(".zip"), *(path / name for name in RAW_FILES)]:
+        if raw.exists():
+            stat = raw.stat()
+            digest.update(f"{raw.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def write_cleansed_data(
+    path: str | Path,
+    scada_df: pd.DataFrame,
+    meter_df: pd.DataFrame,
+    curtail_df: pd.DataFrame,
+    asset_df: pd.DataFrame,
+    reanalysis: dict[str, pd.DataFrame],
+    fingerprint: str,
+) -> Path:
+    """Writes the cleaned data frames to `path`/cleansed as uncompressed Arrow IPC (Feather v2)
+    files so they can be memory-mapped by :py:func:`load_cleansed_data`.
+
+    Files are written to a temporary folder and moved into place, with the manifest written
+    last, so concurrent readers never see a partial snapshot.
+
+    Args:
+        path (str | Path): The folder containing the La Haute Borne data folder.
+        scada_df (pd.DataFrame): Cleaned SCADA data.
+        meter_df (pd.DataFrame): Meter data.
+        curtail_df (pd.DataFrame): Availability and curtailment data.
+        asset_df (pd.DataFrame): Asset data.
+        reanalysis (dict[str, pd.DataFrame]): The "era5" and "merra2" reanalysis data.
+        fingerprint (str): Fingerprint of the raw files the frames were built from.
+
+    Returns:
+        Path: The cleansed data folder.
+    """
+    import pyarrow.feather as feather
+
+    logger.info("Writing the cleansed data snapshot")
+    cleansed = Path(path) / "cleansed"
+    cleansed.mkdir(parents=True, exist_ok=True)
+
+    frames = dict(
+        scada=scada_df,
+        meter=meter_df,
+        curtail=curtail_df,
+        asset=asset_df,
+        reanalysis_era5=reanalysis["era5"],
+        reanalysis_merra2=reanalysis["merra2"],
+    )
+    with tempfile.TemporaryDirectory(dir=cleansed) as tmp:
+        for name, df in frames.items():
+            # Feather requires a default index; every frame carries its time stamps as a column
+            feather.write_feather(
+                df.reset_index(drop=True), Path(tmp) / f"{name}.arrow", compression="uncompressed"
+            )
+        for name in frames:
+            os.replace(Path(tmp) / f"{name}.arrow", cleansed / f"{name}.arrow")
+
+        manifest = Path(tmp) / "manifest.json"
+        manifest.write_text(json.dumps({"fingerprint": fingerprint, "frames": list(frames)}))
+        os.replace(manifest, cleansed / "manifest.json")
+
+    return cleansed
+
+
+def cleansed_data_fingerprint(path: str | Path) -> str | None:
+    """Returns the raw-data fingerprint stored with the snapshot in `path`/cleansed, if any.
+
+    Args:
+        path (str | Path): The folder containing the La Haute Borne data folder.
+
+    Returns:
+        str | None: The stored fingerprint, or None if there is no complete snapshot.
+    """
+    manifest = Path(path) / "cleansed" / "manifest.json"
+    if not manifest.exists():
+        return None
+    try:
+        return json.loads(manifest.read_text()).get("fingerprint")
+    except (OSError, ValueError):
+        return None
+
+
 def load_cleansed_data(path: str | Path, return_value="plantdata") -> PlantData:
     """Loads the already created data in `path`/cleansed, if previously parsed.
 
+    The Arrow files are memory-mapped rather than parsed, so loading takes well under a second.
+
     Args:
         path (str | Path, optional):The file path to the La Haute Borne data. Defaults to
             "data/la_haute_borne".
@@ -125,16 +314,24 @@ def load_cleansed_data(path: str | Path, return_value="plantdata") -> PlantData:
     Returns:
         PlantData | tuple[pandas.DataFrame, ...]
     """
+    import pyarrow.feather as feather
+
     logger.info("Reading in the previously cleansed data")
 
-    path = path / "cleansed"
-    scada_df = pd.read_csv(path / "scada.csv")
-    meter_df = pd.read_csv(path / "meter.csv")
-    curtail_df = pd.read_csv(path / "curtail.csv")
-    asset_df = pd.read_csv(path / "asset.csv")
+    path = Path(path)
+    cleansed = path / "cleansed"
+
+    def read(name: str) -> pd.DataFrame:
+        table = feather.read_table(cleansed / f"{name}.arrow", memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    scada_df = read("scada")
+    meter_df = read("meter")
+    curtail_df = read("curtail")
+    asset_df = read("asset")
     reanalysis = dict(
-        era5=pd.read_csv(path / "reanalysis_era5.csv"),
-        merra2=pd.read_csv(path / "reanalysis_merra2.csv"),
+        era5=read("reanalysis_era5"),
+        merra2=read("reanalysis_merra2"),
     )
 
     # Return the appropriate data format
@@ -144,7 +341,7 @@ def load_cleansed_data(path: str | Path, return_value="plantdata") -> PlantData:
         # Build and return PlantData
         engie_plantdata = PlantData(
             analysis_type="MonteCarloAEP",  # Choosing a random type that doesn't fail validation
-            metadata=path / "metadata.yml",
+            metadata=path / "plant_meta.yml",
             scada=scada_df,
             meter=meter_df,
             curtail=curtail_df,
@@ -162,22 +359,22 @@ def prepare(
     """
     Do all loading and preparation of the data for this plant.
     args:
-    - path (str): Path to la_haute_borne data folder. If it doesn't exist, we will try to extract a zip file of the same name.
+    - path (str): Path to la_haute_borne data folder. If it doesn't exist, the files are read straight from the zip file of the same name, without extracting it.
     - scada_df (pandas.DataFrame): Override the scada dataframe with one provided by the user.
     - return_value (str): "plantdata" will return a fully constructed PlantData object. "dataframes" will return a list of dataframes instead.
-    - use_cleansed (bool): Use previously prepared data if the the "cleansed" folder exists above the main `path`. Defaults to False.
+    - use_cleansed (bool): Use previously prepared data if the the "cleansed" folder exists above the main `path`
+      and was built from the current raw files. Otherwise the data is prepared from the raw files and a new
+      snapshot is written to the "cleansed" folder. Defaults to False.
     """
 
     if isinstance(path, str):
         path = Path(path).resolve()
 
-    # Load the pre-cleaned data, if available
-    if use_cleansed and (path.parent / "cleansed").is_dir():
+    # Load the pre-cleaned data, if available and built from the current raw files
+    fingerprint = raw_data_fingerprint(path) if use_cleansed else None
+    if use_cleansed and cleansed_data_fingerprint(path.parent) == fingerprint:
         return load_cleansed_data(path=path.parent, return_value=return_value)
 
-    # Extract data if necessary
-    extract_data(path)
-
     ###################
     # Plant Metadata - not used
     ###################
@@ -190,13 +387,15 @@ def prepare(
     ###################
     # SCADA DATA #
     ###################
-    scada_df = clean_scada(path / "la-haute-borne-data-2014-2015.csv")
+    with open_raw_file(path, "la-haute-borne-data-2014-2015.csv") as f:
+        scada_df = clean_scada(f)
 
     ##############
     # METER DATA #
     ##############
     logger.info("Reading in the meter data")
-    meter_curtail_df = pd.read_csv(path / "plant_data.csv")
+    with open_raw_file(path, "plant_data.csv") as f:
+        meter_curtail_df = pd.read_csv(f)
     meter_df = meter_curtail_df.copy()
 
     # Create datetime field
@@ -223,7 +422,8 @@ def prepare(
     logger.info("Reading in the reanalysis data and calculating the extra fields")
 
     # MERRA2
-    reanalysis_merra2_df = pd.read_csv(path / "merra2_la_haute_borne.csv")
+    with open_raw_file(path, "merra2_la_haute_borne.csv") as f:
+        reanalysis_merra2_df = pd.read_csv(f)
 
     # Create datetime field with a UTC base
     reanalysis_merra2_df["datetime"] = pd.to_datetime(
@@ -240,7 +440,8 @@ def prepare(
     reanalysis_merra2_df.drop(["Unnamed: 0"], axis=1, inplace=True)
 
     # ERA5
-    reanalysis_era5_df = pd.read_csv(path / "era5_wind_la_haute_borne.csv")
+    with open_raw_file(path, "era5_wind_la_haute_borne.csv") as f:
+        reanalysis_era5_df = pd.read_csv(f)
 
     # remove a duplicated datetime column
     reanalysis_era5_df = reanalysis_era5_df.loc[:, ~reanalysis_era5_df.columns.duplicated()].copy()
@@ -271,11 +472,23 @@ def prepare(
     ##############
 
     logger.info("Reading in the asset data")
-    asset_df = pd.read_csv(path / "la-haute-borne_asset_table.csv")
+    with open_raw_file(path, "la-haute-borne_asset_table.csv") as f:
+        asset_df = pd.read_csv(f)
 
     # Assign type to turbine for all assets
     asset_df["type"] = "turbine"
 
+    if use_cleansed:
+        write_cleansed_data(
+            path.parent,
+            scada_df,
+            meter_df,
+            curtail_df,
+            asset_df,
+            dict(era5=reanalysis_era5_df, merra2=reanalysis_merra2_df),
+            fingerprint=fingerprint,
+        )
+
     # Return the appropriate data format
     if return_value == "dataframes":
         return (
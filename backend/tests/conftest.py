@@ -3,10 +3,14 @@
 This file contains shared fixtures and configuration for all tests.
 """
 
+from pathlib import Path
+
 import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.services import file_storage, upload_sessions
+from app.services.upload_registry import UploadRegistry, UploadSessionStore
 
 
 @pytest.fixture
@@ -30,3 +34,26 @@ def test_headers() -> dict:
         "Content-Type": "application/json",
         "Accept": "application/json"
     }
+
+
+@pytest.fixture
+def upload_dir(monkeypatch, tmp_path) -> Path:
+    """Isolated upload directory and file registry.
+    
+    Returns:
+        Path: The upload directory.
+    """
+    monkeypatch.setattr(file_storage, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(file_storage, "_registry", UploadRegistry(tmp_path / file_storage.REGISTRY_FILENAME))
+    return tmp_path
+
+
+@pytest.fixture
+def upload_session_dir(monkeypatch, upload_dir) -> Path:
+    """Like upload_dir, with an isolated upload session store as well.
+    
+    Returns:
+        Path: The upload directory.
+    """
+    monkeypatch.setattr(upload_sessions, "_store", UploadSessionStore(upload_dir / file_storage.REGISTRY_FILENAME))
+    return upload_dir
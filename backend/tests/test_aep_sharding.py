@@ -0,0 +1,138 @@
+"""Tests for sharded Monte Carlo AEP helpers.
+
+The shard split and seed derivation determine reproducibility, so they
+are tested directly without running OpenOA.
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.config import get_settings
+from app.services import aep_sharding
+from app.services.aep_sharding import run_sharded_monte_carlo, shard_seeds, split_simulations
+from app.services.analysis_executor import _call_service
+from app.services.openoa_service import openoa_service
+from app.services.profiling import ProfileRequest, find_profile
+from app.services.stage_timer import collect_timings, stage
+
+
+class _FakeMonteCarloAEP:
+    """Stand-in for MonteCarloAEP that draws from the same global RNGs."""
+
+    def __init__(self, plant, **kwargs):
+        self.plant = plant
+
+    def run(self, num_sim, progress_bar=True):
+        time.sleep(0.02)  # Long enough to be sampled when profiled
+        self.results = pd.DataFrame({
+            "aep_GWh": np.random.normal(20.0, 1.0, num_sim),
+            "avail_pct": [random.random() for _ in range(num_sim)],
+        })
+
+
+class TestSplitSimulations:
+    """Test suite for split_simulations."""
+
+    def test_sizes_sum_to_total(self):
+        """Shard sizes should add up to the requested simulation count."""
+        sizes = split_simulations(1003, 4)
+        assert sum(sizes) == 1003
+        assert sizes == [251, 251, 251, 250]
+
+    def test_never_creates_empty_shards(self):
+        """More shards than simulations should collapse to one per simulation."""
+        assert split_simulations(3, 8) == [1, 1, 1]
+
+    def test_at_least_one_shard(self):
+        """A shard count below one should still run everything."""
+        assert split_simulations(100, 0) == [100]
+
+
+class TestShardSeeds:
+    """Test suite for shard_seeds."""
+
+    def test_same_seed_gives_same_streams(self):
+        """Seeds should be reproducible for a given seed and shard count."""
+        assert shard_seeds(42, 4) == shard_seeds(42, 4)
+
+    def test_shards_get_distinct_seeds(self):
+        """Each shard should get its own RNG stream."""
+        seeds = shard_seeds(42, 16)
+        assert len(set(seeds)) == 16
+
+    def test_different_seeds_differ(self):
+        """Different user seeds should give different shard seeds."""
+        assert shard_seeds(1, 4) != shard_seeds(2, 4)
+
+    def test_seeds_fit_legacy_numpy_range(self):
+        """Seeds must be valid for numpy.random.seed (0 <= seed < 2**32)."""
+        assert all(0 <= seed < 2**32 for seed in shard_seeds(2**32 - 1, 8))
+
+
+class TestRunShardedMonteCarlo:
+    """Test suite for run_sharded_monte_carlo."""
+
+    @pytest.fixture
+    def serial_shards(self, monkeypatch):
+        """Run shards one at a time in-process against a fake analysis."""
+        import openoa.analysis
+
+        monkeypatch.setattr(openoa.analysis, "MonteCarloAEP", _FakeMonteCarloAEP)
+        monkeypatch.setattr(openoa_service, "load_plant_data", lambda file_path=None: object())
+        pool = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(aep_sharding, "_get_pool", lambda: pool)
+        yield
+        pool.shutdown()
+
+    def test_same_seed_and_shards_give_identical_results(self, serial_shards):
+        """The merged frame should be reproducible for a given seed and shard count."""
+        first = run_sharded_monte_carlo(iterations=103, seed=7, num_shards=4)
+        random.seed(0)
+        np.random.seed(0)
+        second = run_sharded_monte_carlo(iterations=103, seed=7, num_shards=4)
+
+        assert len(first) == 103
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_different_seed_gives_different_results(self, serial_shards):
+        """Another seed should draw different simulations."""
+        first = run_sharded_monte_carlo(iterations=20, seed=7, num_shards=4)
+        second = run_sharded_monte_carlo(iterations=20, seed=8, num_shards=4)
+
+        assert not first["aep_GWh"].equals(second["aep_GWh"])
+
+    def test_shard_stages_are_reported(self, serial_shards, monkeypatch):
+        """Stages timed in the shards should be reported per shard, not folded into the caller's stage."""
+        def load_plant_data(file_path=None):
+            with stage("load"):
+                time.sleep(0.05)
+            return object()
+
+        monkeypatch.setattr(openoa_service, "load_plant_data", load_plant_data)
+
+        with collect_timings() as timer:
+            with stage("run"):
+                run_sharded_monte_carlo(iterations=20, seed=7, num_shards=2)
+
+        # Two shards in series: about 0.05 s of loading each, reported as their mean
+        assert 0.04 < timer.stages["load"] < 0.1
+        assert timer.stages["run"] > 0.02
+
+    def test_profiled_run_covers_the_shards(self, serial_shards, monkeypatch, tmp_path):
+        """A profiled AEP should run its shards in the profiled thread, not in the shard pool."""
+        def no_pool():
+            raise AssertionError("profiled shards ran in the shard pool")
+
+        monkeypatch.setattr(aep_sharding, "_get_pool", no_pool)
+        monkeypatch.setattr(get_settings(), "use_mock_data", False)
+        request = ProfileRequest("aep-1", mode="sampling", profile_dir=str(tmp_path), interval_seconds=0.001)
+
+        timed = _call_service("run_aep_analysis_simple", {"iterations": 20, "seed": 7, "num_shards": 2}, request)
+
+        assert timed.result["iterations"] == 20
+        assert "MonteCarloAEP.run" in find_profile(tmp_path, "aep-1", "folded")[0].read_text()
@@ -0,0 +1,139 @@
+"""Tests for the analysis worker pool.
+
+Verifies that analyses run off the event loop and respect
+per-analysis-type concurrency limits.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.analysis_executor import AnalysisExecutor
+from app.services.openoa_service import openoa_service
+
+
+class TestAnalysisExecutor:
+    """Test suite for AnalysisExecutor."""
+
+    def test_rejects_unknown_kind(self):
+        """Only thread and process pools are supported."""
+        with pytest.raises(ValueError):
+            AnalysisExecutor(kind="fiber")
+
+    def test_runs_service_method_in_worker_thread(self, monkeypatch):
+        """Service methods should run outside the event loop thread."""
+        def thread_analysis(**kwargs):
+            return {"thread": threading.get_ident(), **kwargs}
+
+        monkeypatch.setattr(openoa_service, "thread_analysis", thread_analysis, raising=False)
+        executor = AnalysisExecutor(kind="thread", max_workers=2)
+
+        async def main():
+            return await executor.run("aep", "thread_analysis", iterations=500)
+
+        try:
+            result = asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        assert result["iterations"] == 500
+        assert result["thread"] != threading.get_ident()
+
+    def test_event_loop_stays_responsive(self, monkeypatch):
+        """Other coroutines should keep running while an analysis is in progress."""
+        def slow_analysis(**kwargs):
+            time.sleep(0.3)
+            return {"done": True}
+
+        monkeypatch.setattr(openoa_service, "slow_analysis", slow_analysis, raising=False)
+        executor = AnalysisExecutor(kind="thread", max_workers=2)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        async def main():
+            return await asyncio.gather(executor.run("aep", "slow_analysis"), ticker())
+
+        try:
+            result, _ = asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        assert result == {"done": True}
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.3
+
+    def test_per_type_concurrency_limit(self, monkeypatch):
+        """No more than the configured number of analyses of one type should run at once."""
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def tracked_analysis(**kwargs):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            return {}
+
+        monkeypatch.setattr(openoa_service, "tracked_analysis", tracked_analysis, raising=False)
+        executor = AnalysisExecutor(kind="thread", max_workers=4, limits={"wake_losses": 1})
+
+        async def main():
+            await asyncio.gather(*[executor.run("wake_losses", "tracked_analysis") for _ in range(4)])
+
+        try:
+            asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        assert active["peak"] == 1
+        assert executor.stats()["running"]["wake_losses"] == 0
+
+    def test_cancelled_analysis_keeps_its_slot(self, monkeypatch):
+        """Cancelling a started analysis should not let another of its type start early."""
+        started = threading.Event()
+        release = threading.Event()
+        runs = []
+
+        def blocking_analysis(**kwargs):
+            runs.append(time.perf_counter())
+            started.set()
+            release.wait(5)
+            return {}
+
+        monkeypatch.setattr(openoa_service, "blocking_analysis", blocking_analysis, raising=False)
+        executor = AnalysisExecutor(kind="thread", max_workers=4, limits={"aep": 1})
+
+        async def main():
+            first = asyncio.create_task(executor.run("aep", "blocking_analysis"))
+            await asyncio.to_thread(started.wait, 5)
+            first.cancel()
+            second = asyncio.create_task(executor.run("aep", "blocking_analysis"))
+            await asyncio.sleep(0.1)
+
+            # The cancelled worker still runs, so its slot is still taken
+            assert not first.done()
+            assert len(runs) == 1
+            assert executor.stats()["running"]["aep"] == 1
+            assert executor.stats()["waiting"]["aep"] == 1
+
+            release.set()
+            await second
+            with pytest.raises(asyncio.CancelledError):
+                await first
+
+        try:
+            asyncio.run(main())
+        finally:
+            release.set()
+            executor.shutdown()
+
+        assert len(runs) == 2
+        assert executor.stats()["running"]["aep"] == 0
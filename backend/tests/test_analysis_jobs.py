@@ -0,0 +1,200 @@
+"""Tests for asynchronous analysis jobs.
+
+Covers the 202 submission path, polling, cancellation, and the
+job store's TTL and size limits.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.analysis_executor import AnalysisExecutor
+from app.services.file_storage import FileStorage
+from app.services.job_store import JobStore, JobStoreFullError
+from app.services.openoa_service import openoa_service
+
+
+@pytest.fixture
+def live_client(monkeypatch) -> TestClient:
+    """Test client that keeps one event loop alive so background jobs can finish."""
+    monkeypatch.setattr(
+        FileStorage, "run_janitor", lambda *args, **kwargs: {"expired": 0, "evicted": 0, "files_remaining": 0}
+    )
+    with TestClient(app) as client:
+        yield client
+
+
+def _wait_for_job(client: TestClient, job_id: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        data = client.get(f"/api/v1/analysis/jobs/{job_id}").json()
+        if data["status"] not in ("pending", "running"):
+            return data
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not finish within {timeout}s")
+
+
+class TestAnalysisJobEndpoints:
+    """Test suite for the analysis job API."""
+
+    def test_async_submission_returns_202(self, live_client: TestClient):
+        """Async submissions should return 202 with a job ID and Location header."""
+        response = live_client.post("/api/v1/analysis/aep?async=true", json={"iterations": 500})
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        data = response.json()
+        assert data["id"].startswith("aep_")
+        assert data["status"] == "pending"
+        assert response.headers["location"] == f"/api/v1/analysis/jobs/{data['id']}"
+
+    def test_async_job_completes(self, live_client: TestClient):
+        """Polling a job should eventually return the completed result."""
+        response = live_client.post("/api/v1/analysis/aep?async=true", json={"iterations": 500})
+        job_id = response.json()["id"]
+
+        data = _wait_for_job(live_client, job_id)
+
+        assert data["status"] == "completed"
+        assert data["result"]["iterations"] == 500
+        assert data["completed_at"] is not None
+        assert "total" in data["timings"]
+
+    def test_sync_request_still_returns_200(self, live_client: TestClient):
+        """Requests without async=true should keep blocking and returning 200."""
+        response = live_client.post("/api/v1/analysis/wake-losses", json={})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "completed"
+
+    def test_unknown_job_returns_404(self, client: TestClient):
+        """Unknown job IDs should return 404."""
+        assert client.get("/api/v1/analysis/jobs/missing").status_code == status.HTTP_404_NOT_FOUND
+        assert client.delete("/api/v1/analysis/jobs/missing").status_code == status.HTTP_404_NOT_FOUND
+
+    def test_delete_finished_job_removes_it(self, live_client: TestClient):
+        """Deleting a finished job should remove it from the store."""
+        job_id = live_client.post("/api/v1/analysis/eya-gap?async=true", json={"expected_aep_gwh": 30}).json()["id"]
+        _wait_for_job(live_client, job_id)
+
+        response = live_client.delete(f"/api/v1/analysis/jobs/{job_id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert live_client.get(f"/api/v1/analysis/jobs/{job_id}").status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestJobStore:
+    """Test suite for JobStore."""
+
+    def test_cancel_running_job(self):
+        """Cancelling an unfinished job should mark it cancelled."""
+        store = JobStore(max_jobs=10, ttl_seconds=60)
+
+        async def main():
+            store.submit("slow", lambda: asyncio.sleep(10))
+            await asyncio.sleep(0)
+            job = store.cancel("slow")
+            await asyncio.sleep(0)
+            return job
+
+        job = asyncio.run(main())
+
+        assert job.status == "cancelled"
+        assert job.completed_at is not None
+
+    def test_cancelled_running_job_keeps_its_slot(self, monkeypatch):
+        """A cancelled job whose worker is still running should report cancelling and hold its slot."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_analysis(**kwargs):
+            started.set()
+            release.wait(5)
+            return {}
+
+        monkeypatch.setattr(openoa_service, "blocking_analysis", blocking_analysis, raising=False)
+        executor = AnalysisExecutor(kind="thread", max_workers=4, limits={"aep": 1})
+        store = JobStore(max_jobs=10, ttl_seconds=60)
+
+        async def main():
+            store.submit("first", lambda: executor.run_timed("aep", "blocking_analysis"))
+            await asyncio.to_thread(started.wait, 5)
+            assert store.cancel("first").status == "cancelling"
+            store.submit("second", lambda: executor.run_timed("aep", "blocking_analysis"))
+            await asyncio.sleep(0.1)
+
+            assert store.get("first").status == "cancelling"
+            assert executor.stats()["running"]["aep"] == 1
+            assert executor.stats()["waiting"]["aep"] == 1
+
+            release.set()
+            for _ in range(100):
+                if store.get("second").status == "completed":
+                    break
+                await asyncio.sleep(0.01)
+            return store.get("first"), store.get("second")
+
+        try:
+            first, second = asyncio.run(main())
+        finally:
+            release.set()
+            executor.shutdown()
+
+        assert first.status == "cancelled"
+        assert first.result is None
+        assert second.status == "completed"
+
+    def test_failed_job_records_error(self):
+        """Exceptions raised by the analysis should mark the job failed."""
+        store = JobStore(max_jobs=10, ttl_seconds=60)
+
+        async def boom():
+            raise ValueError("bad data")
+
+        async def main():
+            store.submit("bad", boom)
+            await asyncio.sleep(0.01)
+            return store.get("bad")
+
+        job = asyncio.run(main())
+
+        assert job.status == "failed"
+        assert job.error == "bad data"
+
+    def test_finished_jobs_expire(self):
+        """Finished jobs should disappear after the TTL."""
+        store = JobStore(max_jobs=10, ttl_seconds=0)
+
+        async def done():
+            return {"ok": True}
+
+        async def main():
+            store.submit("quick", done)
+            await asyncio.sleep(0.01)
+            return store.get("quick")
+
+        assert asyncio.run(main()) is None
+
+    def test_full_store_evicts_finished_then_rejects(self):
+        """A full store should evict finished jobs but never unfinished ones."""
+        store = JobStore(max_jobs=2, ttl_seconds=60)
+
+        async def done():
+            return {}
+
+        async def main():
+            store.submit("finished", done)
+            await asyncio.sleep(0.01)
+            store.submit("slow_1", lambda: asyncio.sleep(10))
+            store.submit("slow_2", lambda: asyncio.sleep(10))
+            assert store.get("finished") is None
+            with pytest.raises(JobStoreFullError):
+                store.submit("slow_3", lambda: asyncio.sleep(10))
+            store.cancel("slow_1")
+            store.cancel("slow_2")
+
+        asyncio.run(main())
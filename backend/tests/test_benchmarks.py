@@ -0,0 +1,111 @@
+"""Tests for the benchmark suite runner and baseline comparison."""
+
+import json
+import logging
+
+from benchmarks import cases as cases_module
+from benchmarks.cases import CaseOptions, analysis_cases, loading_cases
+from benchmarks.suite import Case, compare_results, main, run_case, save_results, select_cases
+
+
+class TestBenchmarkSuite:
+    """Test suite for benchmark runs and baselines."""
+
+    def test_run_case_reports_timings(self):
+        """A case should run setup once, warm up, then time each repetition."""
+        calls = []
+        case = Case("demo", lambda: calls.append("run"), setup=lambda: calls.append("setup"))
+
+        result = run_case(case, repeat=3, warmup=1)
+
+        assert calls == ["setup", "run", "run", "run", "run"]
+        assert result["repeat"] == 3
+        assert result["min_s"] <= result["median_s"] <= result["max_s"]
+
+    def test_failing_case_is_reported(self):
+        """A failing case should return its error instead of raising."""
+        result = run_case(Case("broken", lambda: 1 / 0))
+
+        assert result == {"error": "ZeroDivisionError: division by zero"}
+
+    def test_compare_results_flags_regressions(self):
+        """Slowdowns beyond the threshold and noise floor should be regressions."""
+        baseline = {
+            "slow": {"median_s": 1.0},
+            "fast": {"median_s": 1.0},
+            "tiny": {"median_s": 0.0001},
+            "same": {"median_s": 1.0},
+        }
+        current = {
+            "slow": {"median_s": 1.2},
+            "fast": {"median_s": 0.5},
+            "tiny": {"median_s": 0.0003},
+            "same": {"median_s": 1.05},
+            "added": {"median_s": 1.0},
+            "broken": {"error": "ValueError: bad"},
+        }
+
+        statuses = {c.name: c.status for c in compare_results(current, baseline, threshold=0.1)}
+
+        assert statuses == {
+            "slow": "regression",
+            "fast": "improvement",
+            "tiny": "unchanged",
+            "same": "unchanged",
+            "added": "new",
+            "broken": "failed",
+        }
+
+    def test_save_results_merges_into_baseline(self, tmp_path):
+        """Saving a partial run should keep other cases and skip failures."""
+        path = tmp_path / "baseline.json"
+        save_results(path, {"a": {"median_s": 1.0}, "b": {"median_s": 2.0}})
+
+        save_results(path, {"a": {"median_s": 0.5}, "c": {"error": "boom"}})
+
+        saved = json.loads(path.read_text())
+        assert saved["results"] == {"a": {"median_s": 0.5}, "b": {"median_s": 2.0}}
+        assert "python" in saved["metadata"]
+
+    def test_compare_fails_when_a_case_fails(self, tmp_path, monkeypatch, capsys):
+        """A failed case should fail a comparison run even without regressions."""
+        def broken():
+            raise ValueError("bad data")
+
+        monkeypatch.setattr(
+            cases_module, "build_cases", lambda options: [Case("ok", lambda: None), Case("broken", broken)]
+        )
+        baseline = tmp_path / "baseline.json"
+        save_results(baseline, {"ok": {"median_s": 1.0}, "broken": {"median_s": 1.0}})
+
+        try:
+            status = main(["--compare", str(baseline), "--repeat", "1", "--warmup", "0"])
+        finally:
+            logging.disable(logging.NOTSET)
+
+        assert status == 1
+        assert "1 failed case(s): broken" in capsys.readouterr().out
+
+    def test_mock_analysis_cases_run(self):
+        """Every analysis should have a mock case that runs."""
+        cases = select_cases(analysis_cases(CaseOptions(modes=["mock"], iterations=[10])), ["analysis."])
+
+        assert {case.name for case in cases} == {
+            "analysis.aep[mock,iterations=10]",
+            "analysis.electrical_losses[mock]",
+            "analysis.wake_losses[mock]",
+            "analysis.turbine_ideal_energy[mock]",
+            "analysis.eya_gap[mock]",
+        }
+        for case in cases:
+            assert "error" not in run_case(case, repeat=1, warmup=0)
+
+    def test_upload_loading_runs_after_prepare(self, tmp_path):
+        """Upload cases build era5-only PlantData after prepare built merra2 ones, in one process."""
+        options = CaseOptions(turbines=[2], days=2, upload_rows=[500], workdir=tmp_path)
+        cases = select_cases(loading_cases(options), ["synthetic", "load_plant_data_from_file"])
+
+        assert [case.name for case in cases][0].startswith("loading.prepare[synthetic")
+        for case in cases:
+            result = run_case(case, repeat=1, warmup=0)
+            assert "error" not in result, f"{case.name}: {result.get('error')}"
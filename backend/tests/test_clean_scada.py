@@ -0,0 +1,54 @@
+"""Tests for the vectorized unresponsive-sensor flagging in project_ENGIE.
+
+The vectorized implementation must match OpenOA's per-series
+``filters.unresponsive_flag`` applied to each turbine separately.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("openoa")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "examples"))
+
+from openoa.utils import filters  # noqa: E402
+from project_ENGIE import unresponsive_flag_by_group  # noqa: E402
+
+
+def _reference(df: pd.DataFrame, threshold: int, col: list) -> pd.DataFrame:
+    flags = [
+        filters.unresponsive_flag(group, threshold, col=col)
+        for _, group in df.groupby("Wind_turbine_name", sort=False)
+    ]
+    return pd.concat(flags).loc[df.index]
+
+
+class TestUnresponsiveFlagByGroup:
+    """Test suite for unresponsive_flag_by_group."""
+
+    @pytest.mark.parametrize("threshold", [2, 3, 20])
+    def test_matches_per_turbine_filter(self, threshold):
+        """Flags should equal the per-turbine OpenOA filter, including NaN handling."""
+        rng = np.random.default_rng(threshold)
+        n = 3000
+        df = pd.DataFrame({
+            "Wind_turbine_name": rng.choice(["T1", "T2", "T3"], n),
+            "Va_avg": rng.integers(0, 2, n).astype(float),
+            "Ot_avg": np.repeat(rng.integers(0, 3, n // 10), 10).astype(float),
+        }, index=rng.permutation(n) * 2)
+        df.loc[df.sample(frac=0.05, random_state=0).index, "Va_avg"] = np.nan
+
+        actual = unresponsive_flag_by_group(df, "Wind_turbine_name", threshold, col=["Va_avg", "Ot_avg"])
+
+        pd.testing.assert_frame_equal(actual, _reference(df, threshold, ["Va_avg", "Ot_avg"]))
+
+    def test_runs_do_not_span_turbines(self):
+        """Equal values on different turbines should not form a run."""
+        df = pd.DataFrame({"Wind_turbine_name": ["A", "B", "A", "B"], "Va_avg": [1.0, 1.0, 2.0, 2.0]})
+
+        flags = unresponsive_flag_by_group(df, "Wind_turbine_name", 2, col=["Va_avg"])
+
+        assert not flags["Va_avg"].any()
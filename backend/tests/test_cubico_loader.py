@@ -0,0 +1,114 @@
+"""Tests for the single-pass, parallel SCADA reader in project_Cubico.
+
+The reader must produce the same SCADA and curtailment frames as the
+original per-turbine ``pd.read_csv`` loop, from one read of each file.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("openoa.utils.downloader")  # Needs the optional cdsapi dependency
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "examples"))
+
+import project_Cubico  # noqa: E402
+from project_Cubico import (  # noqa: E402
+    CURTAILMENT_COLUMNS,
+    DATE_COLUMN,
+    SCADA_COLUMNS,
+    get_curtailment_df,
+    get_scada_df,
+    get_scada_headers,
+    read_scada_files,
+)
+
+EXTRA_COLUMNS = ["Rotor speed (RPM)", "Generator RPM (RPM)"]
+
+
+def _write_scada_file(path: Path, turbine: str, start: str, rows: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    columns = [SCADA_COLUMNS[1], EXTRA_COLUMNS[0], SCADA_COLUMNS[0], *SCADA_COLUMNS[2:], *CURTAILMENT_COLUMNS, EXTRA_COLUMNS[1]]
+    df = pd.DataFrame(rng.normal(size=(rows, len(columns))).round(3), columns=columns)
+    df.iloc[::7, 2] = np.nan
+    df.insert(0, DATE_COLUMN, pd.date_range(start, periods=rows, freq="10min").strftime("%Y-%m-%d %H:%M:%S"))
+    preamble = [
+        "# This file was exported by Greenbyte Platform on 2022-01-12 10:00:00",
+        "# ",
+        f"# Turbine: {turbine}",
+        "# Turbine type: MM92",
+        "# Time zone: UTC",
+        f"# Time interval: {start} - 2017-01-01 00:00:00",
+        "# ",
+        "# Signals: 12",
+        "# ",
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(preamble) + "\n")
+        df.to_csv(f, index=False)
+
+
+@pytest.fixture
+def scada_files(tmp_path):
+    files = []
+    for year in (2016, 2017):
+        for turbine in ("Kelmarsh 1", "Kelmarsh 2", "Kelmarsh 3"):
+            path = tmp_path / f"Turbine_Data_{turbine.replace(' ', '_')}_{year}.csv"
+            _write_scada_file(path, turbine, f"{year}-01-01 00:00:00", 50, seed=year + len(files))
+            files.append(path)
+    return files
+
+
+def _reference_headers(scada_files):
+    params = {"index_col": 0, "skiprows": 2, "nrows": 4, "delimiter": ": ", "header": None, "engine": "python"}
+    headers = pd.concat((pd.read_csv(f, **params).rename(columns={1: f}) for f in scada_files), axis=1)
+    headers.index = headers.index.str.replace("# ", "")
+    return headers.transpose().reset_index().rename(columns={"index": "File"})
+
+
+def _reference_scada(scada_headers, use_columns):
+    params = {"index_col": DATE_COLUMN, "parse_dates": True, "skiprows": 9, "usecols": use_columns}
+    frames = []
+    for turbine in scada_headers["Turbine"].unique():
+        df = pd.concat(pd.read_csv(f, **params) for f in scada_headers.loc[scada_headers["Turbine"] == turbine, "File"])
+        df["Turbine"] = turbine
+        df.index.names = ["Timestamp"]
+        frames.append(df)
+    return pd.concat(frames)
+
+
+class TestCubicoLoader:
+    """Test suite for the project_Cubico SCADA reader."""
+
+    def test_headers_match_csv_parser(self, scada_files):
+        """The line scan should produce the same header table as the python CSV engine."""
+        pd.testing.assert_frame_equal(
+            get_scada_headers(scada_files), _reference_headers(scada_files), check_names=False
+        )
+
+    def test_single_read_matches_reference(self, scada_files, monkeypatch):
+        """SCADA and curtailment frames from one read should equal separate reference reads."""
+        headers = get_scada_headers(scada_files)
+        reads = []
+        original = project_Cubico._read_scada_file
+        monkeypatch.setattr(
+            project_Cubico, "_read_scada_file", lambda *args: reads.append(args[0]) or original(*args)
+        )
+
+        data = read_scada_files(headers, max_workers=4)
+        scada = get_scada_df(headers, scada_data=data)
+        curtail = get_curtailment_df(headers, scada_data=data)
+
+        assert sorted(reads) == sorted(scada_files)
+        pd.testing.assert_frame_equal(scada, _reference_scada(headers, [DATE_COLUMN, *SCADA_COLUMNS]))
+        pd.testing.assert_frame_equal(curtail, _reference_scada(headers, [DATE_COLUMN, *CURTAILMENT_COLUMNS]))
+
+    def test_get_scada_df_reads_files_when_not_given_data(self, scada_files):
+        """The original call signature should still work on its own."""
+        headers = get_scada_headers(scada_files)
+
+        pd.testing.assert_frame_equal(
+            get_scada_df(headers), _reference_scada(headers, [DATE_COLUMN, *SCADA_COLUMNS])
+        )
@@ -0,0 +1,97 @@
+"""Tests for the La Haute Borne loader: reading the zip archive and the cleansed snapshot."""
+
+import sys
+from pathlib import Path
+from zipfile import ZipFile
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("openoa")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "examples"))
+
+from project_ENGIE import open_raw_file  # noqa: E402
+
+
+@pytest.fixture
+def archive(tmp_path):
+    with ZipFile(tmp_path / "la_haute_borne.zip", "w") as zf:
+        zf.writestr("plant_data.csv", "time_utc,net_energy_kwh\n2014-01-01 00:00:00,1.5\n")
+    return tmp_path / "la_haute_borne"
+
+
+class TestOpenRawFile:
+    """Test suite for open_raw_file."""
+
+    def test_reads_member_without_extracting(self, archive):
+        """Without an extracted folder the member should be streamed from the archive."""
+        with open_raw_file(archive, "plant_data.csv") as f:
+            df = pd.read_csv(f)
+
+        assert df["net_energy_kwh"].tolist() == [1.5]
+        assert not archive.exists()
+
+    def test_prefers_extracted_copy(self, archive):
+        """An extracted file should be read instead of the archive member."""
+        archive.mkdir()
+        (archive / "plant_data.csv").write_text("time_utc,net_energy_kwh\n2014-01-01 00:00:00,2.5\n")
+
+        with open_raw_file(archive, "plant_data.csv") as f:
+            assert pd.read_csv(f)["net_energy_kwh"].tolist() == [2.5]
+
+    def test_missing_member_raises(self, archive):
+        """Unknown files should raise KeyError from the archive."""
+        with pytest.raises(KeyError):
+            with open_raw_file(archive, "missing.csv"):
+                pass
+
+
+@pytest.fixture
+def synthetic_dataset(tmp_path):
+    from benchmarks.synthetic import SyntheticPlant, write_dataset
+
+    return write_dataset(SyntheticPlant(num_turbines=2, days=2, reanalysis_years=1), tmp_path)
+
+
+def _frames(result):
+    scada, meter, curtail, asset, reanalysis = result
+    frames = dict(scada=scada, meter=meter, curtail=curtail, asset=asset, **reanalysis)
+    # Snapshots are written with a default index
+    return {name: df.reset_index(drop=True) for name, df in frames.items()}
+
+
+class TestCleansedSnapshot:
+    """Test suite for the memory-mapped cleansed snapshot used by prepare(use_cleansed=True)."""
+
+    def test_snapshot_matches_fresh_prepare(self, synthetic_dataset, monkeypatch):
+        """Frames loaded from the snapshot should equal those built from the raw files."""
+        import project_ENGIE
+
+        fresh = _frames(project_ENGIE.prepare(synthetic_dataset, return_value="dataframes"))
+        project_ENGIE.prepare(synthetic_dataset, return_value="dataframes", use_cleansed=True)
+
+        # A snapshot hit must not touch the raw files again
+        monkeypatch.setattr(project_ENGIE, "clean_scada", lambda f: pytest.fail("raw SCADA was re-read"))
+        cached = _frames(project_ENGIE.prepare(synthetic_dataset, return_value="dataframes", use_cleansed=True))
+
+        assert cached.keys() == fresh.keys()
+        for name, df in fresh.items():
+            pd.testing.assert_frame_equal(cached[name], df, obj=name)
+
+    def test_changed_raw_file_invalidates_snapshot(self, synthetic_dataset):
+        """Rewriting a raw file should change the fingerprint and rebuild the snapshot."""
+        import project_ENGIE
+
+        project_ENGIE.prepare(synthetic_dataset, return_value="dataframes", use_cleansed=True)
+        stored = project_ENGIE.cleansed_data_fingerprint(synthetic_dataset.parent)
+        assert stored == project_ENGIE.raw_data_fingerprint(synthetic_dataset)
+
+        meter = synthetic_dataset / "plant_data.csv"
+        lines = meter.read_text().splitlines(keepends=True)
+        meter.write_text("".join(lines[:-1]))  # Drop the last interval
+
+        assert project_ENGIE.raw_data_fingerprint(synthetic_dataset) != stored
+        project_ENGIE.prepare(synthetic_dataset, return_value="dataframes", use_cleansed=True)
+        assert project_ENGIE.cleansed_data_fingerprint(synthetic_dataset.parent) == (
+            project_ENGIE.raw_data_fingerprint(synthetic_dataset)
+        )
@@ -0,0 +1,110 @@
+"""Tests for EYA gap analysis.
+
+Covers reuse of a prior AEP analysis by ID, cached AEP lookup,
+and evaluating several expected-AEP scenarios in one call.
+"""
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.services import openoa_service as service_module
+from app.services.file_storage import FileStorage
+from app.services.openoa_service import openoa_service
+from app.services.result_cache import ResultCache
+
+
+class TestEYAGapEndpoint:
+    """Test suite for the EYA gap endpoint."""
+
+    def test_uses_prior_aep_analysis(self, client: TestClient):
+        """An AEP analysis ID should be used as the source of the actual AEP."""
+        aep = client.post("/api/v1/analysis/aep", json={"iterations": 500}).json()
+
+        response = client.post(
+            "/api/v1/analysis/eya-gap",
+            json={"expected_aep_gwh": 30, "aep_analysis_id": aep["id"]},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        result = response.json()["result"]
+        assert result["aep_source"] == "analysis_id"
+        assert result["actual_aep_gwh"] == aep["result"]["aep_gwh"]
+        assert result["aep_iterations"] == 500
+
+    def test_evaluates_multiple_scenarios(self, client: TestClient):
+        """A list of expected AEP values should give one scenario each."""
+        response = client.post("/api/v1/analysis/eya-gap", json={"expected_aep_gwh": [20, 30, 40]})
+
+        assert response.status_code == status.HTTP_200_OK
+        scenarios = response.json()["result"]["scenarios"]
+        assert [s["expected_aep_gwh"] for s in scenarios] == [20, 30, 40]
+        probabilities = [s["exceedance_probability_pct"] for s in scenarios]
+        assert probabilities == sorted(probabilities, reverse=True)
+
+    def test_aep_analysis_of_other_dataset_returns_409(self, client: TestClient, monkeypatch, tmp_path):
+        """An AEP analysis run on another dataset should not be compared against."""
+        aep = client.post("/api/v1/analysis/aep", json={"iterations": 500}).json()
+        upload = tmp_path / "upload.csv"
+        upload.write_text("time,asset_id,WTUR_W\n")
+        monkeypatch.setattr(FileStorage, "get_file_path", staticmethod(lambda file_id: str(upload)))
+
+        response = client.post(
+            "/api/v1/analysis/eya-gap",
+            json={"expected_aep_gwh": 30, "aep_analysis_id": aep["id"], "file_id": "other"},
+        )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_unknown_aep_analysis_returns_404(self, client: TestClient):
+        """Unknown AEP analysis IDs should return 404."""
+        response = client.post(
+            "/api/v1/analysis/eya-gap",
+            json={"expected_aep_gwh": 30, "aep_analysis_id": "aep_missing"},
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_non_aep_analysis_returns_400(self, client: TestClient):
+        """Referring to an analysis of another type should return 400."""
+        wake = client.post("/api/v1/analysis/wake-losses", json={}).json()
+
+        response = client.post(
+            "/api/v1/analysis/eya-gap",
+            json={"expected_aep_gwh": 30, "aep_analysis_id": wake["id"]},
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize("expected", [0, -5, [], [30, 0]])
+    def test_rejects_invalid_expected_aep(self, client: TestClient, expected):
+        """Expected AEP values must be positive and non-empty."""
+        response = client.post("/api/v1/analysis/eya-gap", json={"expected_aep_gwh": expected})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TestRealEYAGap:
+    """Test the real EYA gap path without running OpenOA."""
+
+    def test_reuses_cached_aep_result(self, monkeypatch, tmp_path):
+        """The latest cached AEP result for the dataset should be reused."""
+        def no_aep(*args, **kwargs):
+            raise AssertionError("AEP should not be recomputed")
+
+        cache = ResultCache(cache_dir=tmp_path)
+        monkeypatch.setattr(service_module.settings, "use_mock_data", False)
+        monkeypatch.setattr(openoa_service, "_result_cache", cache)
+        monkeypatch.setattr(openoa_service, "_run_real_aep_analysis", no_aep)
+        cache.put(
+            openoa_service._result_key("aep_latest"),
+            {"aep_gwh": 12.0, "uncertainty_pct": 5.0, "seed": 7, "iterations": 1000},
+        )
+
+        result = openoa_service.run_eya_gap_analysis([12.0, 15.0])
+
+        assert result["aep_source"] == "cache"
+        assert result["aep_seed"] == 7
+        assert result["scenarios"][0]["exceedance_probability_pct"] == 50.0
+        assert result["scenarios"][1]["gap_pct"] == -20.0
+        assert result["scenarios"][1]["meets_expectations"] is False
@@ -0,0 +1,97 @@
+"""Cold-start budget for the API process.
+
+Importing ``app.main`` must stay fast and must not pull in pandas, OpenOA or
+other heavy modules; those are imported lazily through
+``app.core.lazy_imports``. The budget can be changed with the
+IMPORT_TIME_BUDGET_SECONDS environment variable (e.g. on slow CI runners).
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.core import lazy_imports
+from app.core.lazy_imports import HEAVY_MODULES, get_dataset_loader, import_example_module
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+IMPORT_TIME_BUDGET_SECONDS = float(os.environ.get("IMPORT_TIME_BUDGET_SECONDS", "2.0"))
+
+_MEASURE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def _measure_import() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _MEASURE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestImportTime:
+    """Test suite for the API cold-start budget."""
+
+    def test_app_import_within_budget(self):
+        """Importing app.main in a fresh interpreter should stay within budget."""
+        # Best of two runs, so a single slow disk read does not fail the test
+        seconds = min(_measure_import()["seconds"] for _ in range(2))
+        assert seconds < IMPORT_TIME_BUDGET_SECONDS, (
+            f"Importing app.main took {seconds:.2f}s (budget {IMPORT_TIME_BUDGET_SECONDS:.2f}s)"
+        )
+
+    def test_app_import_skips_heavy_modules(self):
+        """Heavy modules should only be imported when an analysis needs them."""
+        modules = set(_measure_import()["modules"])
+        assert not modules & set(HEAVY_MODULES)
+
+
+class TestLazyImports:
+    """Test suite for the lazy import helpers."""
+
+    def test_example_module_import_leaves_sys_path_alone(self, monkeypatch):
+        """Example modules should load by file path without growing sys.path."""
+        monkeypatch.delitem(sys.modules, "project_ENGIE", raising=False)
+        pytest.importorskip("openoa")
+        path_before = list(sys.path)
+
+        module = import_example_module("project_ENGIE")
+
+        assert sys.path == path_before
+        assert sys.modules["project_ENGIE"] is module
+        assert import_example_module("project_ENGIE") is module
+
+    def test_dataset_loader_resolved_once(self, monkeypatch):
+        """Registered loaders should be looked up once and then reused."""
+        calls = []
+
+        def fake_import(name):
+            calls.append(name)
+            return type("Module", (), {"prepare": staticmethod(lambda: "plant")})
+
+        get_dataset_loader.cache_clear()
+        monkeypatch.setattr(lazy_imports, "import_example_module", fake_import)
+        try:
+            assert get_dataset_loader("la_haute_borne")() == "plant"
+            assert get_dataset_loader("la_haute_borne")() == "plant"
+        finally:
+            get_dataset_loader.cache_clear()
+
+        assert calls == ["project_ENGIE"]
+
+    def test_unknown_dataset_loader(self):
+        """Unregistered datasets should raise KeyError."""
+        with pytest.raises(KeyError):
+            get_dataset_loader("unknown")
@@ -0,0 +1,103 @@
+"""Tests for the Prometheus metrics endpoint."""
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.services import metrics
+from app.services.metrics import MetricsRegistry
+
+SCADA_CSV = (
+    b"Date_time,Wind_turbine_name,P_avg,Ws_avg\n"
+    b"2014-01-01T01:00:00+01:00,R80736,642.8,7.1\n"
+)
+
+
+class TestMetricsRegistry:
+    """Test suite for metric rendering."""
+
+    def test_counter_and_histogram_exposition(self):
+        """Counters and histograms should render in the text format with cumulative buckets."""
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests.", ("route",))
+        latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+
+        requests.inc(route="/a")
+        requests.inc(2, route="/a")
+        latency.observe(0.05, route="/a")
+        latency.observe(0.5, route="/a")
+        text = registry.render()
+
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{route="/a"} 3' in text
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 2' in text
+        assert 'latency_seconds_count{route="/a"} 2' in text
+        assert 'latency_seconds_sum{route="/a"} 0.55' in text
+
+    def test_label_values_are_escaped(self):
+        """Quotes, backslashes and newlines in label values should be escaped."""
+        registry = MetricsRegistry()
+        registry.counter("c_total", "C.", ("name",)).inc(name='a"b\\c\nd')
+
+        assert 'c_total{name="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+    def test_failing_gauge_is_skipped(self):
+        """A broken scrape-time source should not hide other metrics."""
+        registry = MetricsRegistry()
+
+        def broken():
+            raise RuntimeError("database locked")
+
+        registry.gauge("broken", "Broken.", broken)
+        registry.gauge("working", "Working.", lambda: [({}, 1)])
+        text = registry.render()
+
+        assert "broken" not in text
+        assert "working 1" in text
+
+
+class TestMetricsEndpoint:
+    """Test suite for GET /metrics."""
+
+    def test_returns_prometheus_text(self, client: TestClient):
+        """The endpoint should serve the text exposition format."""
+        response = client.get("/metrics")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "process_resident_memory_bytes" in response.text
+        assert "openoa_analyses_in_flight" in response.text
+
+    def test_analysis_latency_recorded(self, client: TestClient):
+        """Each analysis should be counted and timed per type and mode."""
+        before = metrics.analysis_duration_seconds.count(analysis_type="wake_losses", mode="mock")
+
+        client.post("/api/v1/analysis/wake-losses", json={})
+
+        assert metrics.analysis_duration_seconds.count(analysis_type="wake_losses", mode="mock") == before + 1
+        assert 'openoa_analyses_total{analysis_type="wake_losses",mode="mock",status="completed"}' in client.get(
+            "/metrics"
+        ).text
+
+    def test_upload_counters_and_storage_gauges(self, client: TestClient, upload_dir):
+        """Uploads should add to byte counters, and storage gauges should see the file."""
+        before = metrics.upload_bytes_total.value(method="multipart")
+
+        client.post("/api/v1/upload-plant-data", files={"file": ("scada.csv", SCADA_CSV, "text/csv")})
+        text = client.get("/metrics").text
+
+        assert metrics.upload_bytes_total.value(method="multipart") == before + len(SCADA_CSV)
+        assert "openoa_stored_files 1" in text
+
+    def test_cache_gauges_omitted_in_process_mode(self, client: TestClient, monkeypatch):
+        """The API process's caches are unused when analyses run in worker processes."""
+        assert "\nopenoa_plant_data_cache_hits_total " in client.get("/metrics").text
+
+        monkeypatch.setattr(get_settings(), "analysis_executor", "process")
+        text = client.get("/metrics").text
+
+        assert "# HELP openoa_plant_data_cache_hits_total" in text
+        assert "\nopenoa_plant_data_cache_hits_total " not in text
+        assert "\nopenoa_result_cache_misses_total " not in text
@@ -0,0 +1,50 @@
+"""Tests for the OpenOA workarounds.
+
+Each test runs in a fresh interpreter, since the fixes apply once per
+process and depend on when OpenOA is imported.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+_BEFORE_IMPORT = """
+import sys
+from app.core import openoa_compat
+openoa_compat.install()
+assert "openoa" not in sys.modules, "install() imported OpenOA"
+from openoa.plant import PlantData
+assert hasattr(PlantData.__init__, "__wrapped__"), "PlantData was not patched on import"
+"""
+
+_AFTER_IMPORT = """
+from openoa.plant import PlantData
+from app.core import openoa_compat
+openoa_compat.install()
+openoa_compat.install()
+assert hasattr(PlantData.__init__, "__wrapped__"), "PlantData was not patched"
+assert not hasattr(PlantData.__init__.__wrapped__, "__wrapped__"), "PlantData was patched twice"
+"""
+
+
+def _run(code: str) -> None:
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+class TestInstall:
+    """Test suite for openoa_compat.install."""
+
+    def test_patches_plant_data_when_openoa_is_imported(self):
+        """Installing before OpenOA is imported should not import it, and patch it on import."""
+        pytest.importorskip("openoa")
+        _run(_BEFORE_IMPORT)
+
+    def test_patches_already_imported_openoa_once(self):
+        """Installing after OpenOA was imported should patch it right away, once."""
+        pytest.importorskip("openoa")
+        _run(_AFTER_IMPORT)
@@ -0,0 +1,144 @@
+"""Tests for the PlantData cache.
+
+Uses plain Python objects in place of PlantData so no OpenOA data is loaded.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.plant_data_cache import PlantDataCache, fingerprint_files, make_cache_key
+
+
+def _sizeof(value: dict) -> int:
+    return value["size"]
+
+
+class TestPlantDataCache:
+    """Test suite for PlantDataCache."""
+
+    def test_loader_called_once_per_key(self):
+        """Repeated lookups should reuse the first load."""
+        cache = PlantDataCache(max_bytes=100, sizeof=_sizeof)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return {"size": 10}
+
+        key = make_cache_key("default", {"use_cleansed": False}, "abc")
+        cache.get_or_load(key, loader)
+        cache.get_or_load(key, loader)
+
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_returns_private_copy(self):
+        """Callers should not be able to mutate the cached object."""
+        cache = PlantDataCache(max_bytes=100, sizeof=_sizeof)
+        key = make_cache_key("default", {}, "abc")
+
+        first = cache.get_or_load(key, lambda: {"size": 10, "types": ["MonteCarloAEP"]})
+        first["types"].append("WakeLosses")
+        second = cache.get_or_load(key, lambda: {"size": 10, "types": []})
+
+        assert second["types"] == ["MonteCarloAEP"]
+
+    def test_copies_share_frame_data(self):
+        """Callers get their own frames over the cached arrays, not copies of the data."""
+        class Plant:
+            def __init__(self):
+                self.scada = pd.DataFrame({"WTUR_W": np.arange(4.0)}, index=pd.Index(list("abcd"), name="asset_id"))
+                self.reanalysis = {"era5": pd.DataFrame({"WMETR_HorWdSpd": np.ones(4)})}
+
+        cache = PlantDataCache(max_bytes=1024 * 1024)
+        key = make_cache_key("default", {}, "abc")
+
+        first = cache.get_or_load(key, Plant)
+        first.scada.reset_index(inplace=True)
+        first.reanalysis["merra2"] = first.reanalysis["era5"]
+        second = cache.get_or_load(key, Plant)
+
+        assert np.shares_memory(first.scada["WTUR_W"].to_numpy(), second.scada["WTUR_W"].to_numpy())
+        assert second.scada.index.name == "asset_id"
+        assert list(second.reanalysis) == ["era5"]
+
+    def test_failed_load_releases_load_lock(self):
+        """A loader error should propagate without leaving its load lock behind."""
+        cache = PlantDataCache(max_bytes=100, sizeof=_sizeof)
+        key = make_cache_key("default", {}, "abc")
+
+        def loader():
+            raise ValueError("bad file")
+
+        with pytest.raises(ValueError):
+            cache.get_or_load(key, loader)
+
+        assert cache._load_locks == {}
+        assert cache.get_or_load(key, lambda: {"size": 10}) == {"size": 10}
+
+    def test_evicts_least_recently_used(self):
+        """Entries beyond the byte limit should be evicted oldest first."""
+        cache = PlantDataCache(max_bytes=25, sizeof=_sizeof)
+        key_a = make_cache_key("a", {}, "1")
+        key_b = make_cache_key("b", {}, "1")
+        key_c = make_cache_key("c", {}, "1")
+
+        cache.get_or_load(key_a, lambda: {"size": 10})
+        cache.get_or_load(key_b, lambda: {"size": 10})
+        cache.get_or_load(key_a, lambda: {"size": 10})  # a is now most recent
+        cache.get_or_load(key_c, lambda: {"size": 10})
+
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["total_bytes"] == 20
+
+        reloaded = []
+        cache.get_or_load(key_b, lambda: reloaded.append(1) or {"size": 10})
+        assert reloaded == [1]
+
+    def test_oversized_entry_not_cached(self):
+        """Objects larger than the cache should be returned but not stored."""
+        cache = PlantDataCache(max_bytes=5, sizeof=_sizeof)
+        key = make_cache_key("big", {}, "1")
+
+        value = cache.get_or_load(key, lambda: {"size": 10})
+
+        assert value == {"size": 10}
+        assert cache.stats()["entries"] == 0
+
+    def test_invalidate_drops_dataset(self):
+        """Invalidating a dataset should remove all of its entries."""
+        cache = PlantDataCache(max_bytes=100, sizeof=_sizeof)
+        cache.get_or_load(make_cache_key("a", {"x": 1}, "1"), lambda: {"size": 10})
+        cache.get_or_load(make_cache_key("a", {"x": 2}, "1"), lambda: {"size": 10})
+        cache.get_or_load(make_cache_key("b", {}, "1"), lambda: {"size": 10})
+
+        assert cache.invalidate("a") == 2
+        assert cache.stats()["entries"] == 1
+        assert cache.stats()["total_bytes"] == 10
+
+
+class TestFingerprint:
+    """Test suite for source-file fingerprints."""
+
+    def test_fingerprint_changes_when_file_changes(self, tmp_path):
+        """Rewriting a source file should change the fingerprint."""
+        data_file = tmp_path / "scada.csv"
+        data_file.write_text("time,power\n")
+        before = fingerprint_files([data_file])
+
+        data_file.write_text("time,power\n2020-01-01,1.0\n")
+
+        assert fingerprint_files([data_file]) != before
+
+    def test_fingerprint_ignores_missing_files(self, tmp_path):
+        """Missing files should not raise."""
+        assert fingerprint_files([tmp_path / "missing.csv"]) == fingerprint_files([])
+
+    def test_cache_key_is_order_independent(self):
+        """Option order should not affect the key."""
+        key_1 = make_cache_key("a", {"x": 1, "y": 2}, "f")
+        key_2 = make_cache_key("a", {"y": 2, "x": 1}, "f")
+        assert key_1 == key_2
@@ -0,0 +1,118 @@
+"""Tests for startup warm-up and the readiness endpoint."""
+
+import asyncio
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app import main
+from app.api.routes import health
+from app.main import app
+from app.services import prewarm
+from app.services.file_storage import FileStorage
+from app.services.openoa_service import openoa_service
+from app.services.plant_data_cache import PlantDataCache
+from app.services.prewarm import WarmupState, run_prewarm
+from benchmarks.synthetic import SyntheticPlant, write_dataset, write_upload
+
+
+class TestRunPrewarm:
+    """Test suite for run_prewarm."""
+
+    def test_records_stage_timings(self):
+        """Each stage should be timed and the state marked ready."""
+        state = asyncio.run(run_prewarm(WarmupState()))
+
+        assert state.status == "ready"
+        assert state.ready
+        assert "imports" in state.stages
+        assert state.finished_at >= state.started_at
+
+    def test_runs_analysis_stage_when_requested(self, monkeypatch):
+        """The analysis stage should only run when requested."""
+        calls = []
+
+        async def fake_analysis():
+            calls.append(1)
+
+        monkeypatch.setattr(prewarm, "_run_tiny_analysis", fake_analysis)
+        asyncio.run(run_prewarm(WarmupState()))
+        state = asyncio.run(run_prewarm(WarmupState(), run_analysis=True))
+
+        assert calls == [1]
+        assert "analysis" in state.stages
+
+    def test_failed_stage_stops_warm_up(self, monkeypatch):
+        """A failing stage should be reported and later stages skipped."""
+        def fail():
+            raise ImportError("no module named openoa")
+
+        async def fake_analysis():
+            raise AssertionError("analysis should not run")
+
+        monkeypatch.setattr(prewarm, "import_analysis_modules", fail)
+        monkeypatch.setattr(prewarm, "_run_tiny_analysis", fake_analysis)
+        state = asyncio.run(run_prewarm(WarmupState(), run_analysis=True))
+
+        assert state.status == "failed"
+        assert state.error.startswith("imports:")
+        assert list(state.stages) == ["imports"]
+
+    def test_upload_loads_after_plant_data_stage(self, monkeypatch, tmp_path):
+        """Building the default (merra2) PlantData in-process should not break later upload loads."""
+        plant = SyntheticPlant(num_turbines=2, days=2, reanalysis_years=1)
+        write_dataset(plant, tmp_path / "data")
+        upload = tmp_path / "upload.csv"
+        write_upload(plant, upload, max_rows=2000)
+        monkeypatch.setattr(prewarm.settings, "use_mock_data", False)
+        monkeypatch.setattr(openoa_service, "_get_examples_path", lambda: tmp_path)
+        monkeypatch.setattr(openoa_service, "_plant_cache", PlantDataCache(max_bytes=0))
+
+        state = asyncio.run(run_prewarm(WarmupState()))
+
+        assert state.status == "ready", state.error
+        assert "plant_data" in state.stages
+        assert openoa_service._load_plant_data_from_file(str(upload)).scada is not None
+
+
+class TestReadinessEndpoint:
+    """Test suite for the /ready endpoint."""
+
+    def test_not_ready_while_warming(self, monkeypatch):
+        """Readiness should be 503 until warm-up finishes."""
+        state = WarmupState()
+        state.status = "warming"
+        state.stages["imports"] = 1.5
+        monkeypatch.setattr(health, "warmup_state", state)
+
+        response = TestClient(app).get("/ready")
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["status"] == "warming"
+        assert response.json()["stages"] == {"imports": 1.5}
+
+    def test_ready_after_warm_up(self, monkeypatch):
+        """Readiness should be 200 with stage timings once warm."""
+        state = asyncio.run(run_prewarm(WarmupState()))
+        monkeypatch.setattr(health, "warmup_state", state)
+
+        response = TestClient(app).get("/ready")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["ready"] is True
+        assert "imports" in response.json()["stages"]
+
+    def test_ready_when_prewarm_disabled(self, monkeypatch):
+        """Without warm-up the instance should be ready as soon as it starts."""
+        state = WarmupState()
+        monkeypatch.setattr(health, "warmup_state", state)
+        monkeypatch.setattr(main, "warmup_state", state)
+        monkeypatch.setattr(
+            FileStorage, "run_janitor", lambda *args, **kwargs: {"expired": 0, "evicted": 0, "files_remaining": 0}
+        )
+
+        with TestClient(app) as client:
+            response = client.get("/ready")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "disabled"
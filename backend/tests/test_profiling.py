@@ -0,0 +1,174 @@
+"""Tests for profiling of single analysis runs."""
+
+import json
+import os
+import time
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.services.profiling import ProfileRequest, SamplingProfiler, find_profile, list_profiles, run_profiled
+from app.services.stage_timer import collect_timings, stage
+
+ADMIN_HEADERS = {"X-Admin-Token": "secret"}
+
+
+def _busy(seconds: float) -> int:
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+@pytest.fixture
+def admin_settings(monkeypatch, tmp_path):
+    """Enable admin features and store profiles in a temporary directory."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profile_sampling_interval_ms", 1.0)
+    return settings
+
+
+class TestProfiling:
+    """Test suite for the profilers and profile storage."""
+
+    def test_sampling_profiler_records_folded_stacks(self):
+        """Samples should be folded into root-first stacks of the profiled code."""
+        with SamplingProfiler(interval_seconds=0.001) as profiler:
+            _busy(0.1)
+
+        assert profiler.samples > 0
+        stack, count = profiler.folded().splitlines()[0].rsplit(" ", 1)
+        assert stack.startswith("_busy (test_profiling.py:")
+        assert int(count) > 0
+
+    def test_sampling_mode_stores_folded_profile(self, tmp_path):
+        """Sampling runs should store folded stacks and a summary under the profile id."""
+        request = ProfileRequest("run-1", mode="sampling", profile_dir=str(tmp_path), interval_seconds=0.001)
+
+        assert run_profiled(lambda: _busy(0.05) and "done", request) == "done"
+
+        path, summary = find_profile(tmp_path, "run-1", "folded")
+        assert "_busy" in path.read_text()
+        assert summary["mode"] == "sampling"
+        assert summary["formats"] == ["folded", "summary"]
+        assert find_profile(tmp_path, "run-1", "pstats") is None
+
+    def test_deterministic_mode_stores_pstats(self, tmp_path):
+        """Deterministic runs should store a pstats file and a text report."""
+        request = ProfileRequest("run-2", mode="deterministic", profile_dir=str(tmp_path))
+
+        run_profiled(lambda: _busy(0.01), request)
+
+        path, _ = find_profile(tmp_path, "run-2", "pstats")
+        assert path.stat().st_size > 0
+        assert "_busy" in find_profile(tmp_path, "run-2", "text")[0].read_text()
+
+    def test_memory_mode_records_stages(self, tmp_path):
+        """Memory runs should report allocations per stage, including the allocating line."""
+        request = ProfileRequest("run-3", mode="memory", profile_dir=str(tmp_path))
+
+        def analysis():
+            with stage("load"):
+                data = [bytearray(1024) for _ in range(2000)]
+            with stage("run"):
+                return len(data)
+
+        with collect_timings():
+            assert run_profiled(analysis, request) == 2000
+
+        _, summary = find_profile(tmp_path, "run-3", "summary")
+        stages = {entry["stage"]: entry for entry in summary["stages"]}
+        assert list(stages) == ["load", "run", "total"]
+        load = stages["load"]
+        assert load["allocated_bytes"] >= 2000 * 1024
+        assert load["peak_allocated_bytes"] >= load["allocated_bytes"]
+        assert "test_profiling.py" in load["top_allocations"][0]["traceback"][-1]
+        assert stages["run"]["allocated_bytes"] < 2000 * 1024
+        assert "stages" not in list_profiles(tmp_path)[0]
+
+    def test_oldest_profiles_are_pruned(self, tmp_path):
+        """Only the newest max_profiles profiles should be kept."""
+        for i in range(3):
+            run_profiled(lambda: None, ProfileRequest(f"run-{i}", profile_dir=str(tmp_path), max_profiles=2))
+            summary_path = tmp_path / f"run-{i}.json"
+            os.utime(summary_path, (i, i))
+
+        run_profiled(lambda: None, ProfileRequest("run-3", profile_dir=str(tmp_path), max_profiles=2))
+
+        assert sorted(p.stem for p in tmp_path.glob("*.json")) == ["run-2", "run-3"]
+        assert not (tmp_path / "run-0.folded").exists()
+
+
+class TestProfilingEndpoints:
+    """Test suite for ?profile=true and the profile download endpoint."""
+
+    def test_profile_requires_admin_token(self, client: TestClient, admin_settings):
+        """Profiling without a valid admin token should be rejected."""
+        response = client.post("/api/v1/analysis/electrical-losses?profile=true", json={})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_profile_disabled_without_admin_token_setting(self, client: TestClient):
+        """Profiling should be unavailable when ADMIN_TOKEN is unset."""
+        response = client.post(
+            "/api/v1/analysis/electrical-losses?profile=true", json={}, headers=ADMIN_HEADERS
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_unknown_profile_mode(self, client: TestClient, admin_settings):
+        """An unknown profiler should be rejected."""
+        response = client.post(
+            "/api/v1/analysis/electrical-losses?profile=true&profile_mode=perf", json={}, headers=ADMIN_HEADERS
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_profiled_analysis_can_be_downloaded(self, client: TestClient, admin_settings):
+        """A profiled analysis should link to its stored profile."""
+        response = client.post("/api/v1/analysis/wake-losses?profile=true", json={}, headers=ADMIN_HEADERS)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["profile_url"] == f"/api/v1/analysis/profiles/{data['id']}"
+
+        summary = client.get(data["profile_url"], headers=ADMIN_HEADERS)
+        assert summary.status_code == status.HTTP_200_OK
+        assert json.loads(summary.content)["mode"] == "sampling"
+
+        folded = client.get(f"{data['profile_url']}?format=folded", headers=ADMIN_HEADERS)
+        assert folded.status_code == status.HTTP_200_OK
+        assert folded.headers["content-type"].startswith("text/plain")
+
+    def test_memory_profile_is_listed(self, client: TestClient, admin_settings):
+        """Memory profiles should report service stages and appear in the profile list."""
+        analysis_id = client.post(
+            "/api/v1/analysis/electrical-losses?profile=true&profile_mode=memory", json={}, headers=ADMIN_HEADERS
+        ).json()["id"]
+
+        summary = client.get(f"/api/v1/analysis/profiles/{analysis_id}", headers=ADMIN_HEADERS).json()
+        profiles = client.get("/api/v1/analysis/profiles", headers=ADMIN_HEADERS).json()
+
+        assert summary["stages"][-1]["stage"] == "total"
+        assert profiles[0]["profile_id"] == analysis_id
+        assert profiles[0]["mode"] == "memory"
+
+    def test_unprofiled_analysis_has_no_profile(self, client: TestClient, admin_settings):
+        """Analyses run without profile=true should store nothing."""
+        analysis_id = client.post("/api/v1/analysis/wake-losses", json={}).json()["id"]
+
+        response = client.get(f"/api/v1/analysis/profiles/{analysis_id}", headers=ADMIN_HEADERS)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert list(os.scandir(admin_settings.profile_dir)) == []
+
+    def test_download_requires_admin_token(self, client: TestClient, admin_settings):
+        """Profiles should only be downloadable by admins."""
+        response = client.get("/api/v1/analysis/profiles/anything")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
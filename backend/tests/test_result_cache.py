@@ -0,0 +1,156 @@
+"""Tests for analysis result memoization.
+
+Covers key construction, the memory and disk tiers, and that
+post-processing parameters are applied without recomputing.
+"""
+
+import logging
+import os
+from pathlib import Path
+
+from app.services import openoa_service as service_module
+from app.services.openoa_service import openoa_service
+from app.services.result_cache import ResultCache, make_result_key
+
+
+def _key(**overrides) -> str:
+    args = {
+        "analysis_type": "aep",
+        "params": {"iterations": 500, "reg_model": "lin"},
+        "seed": 42,
+        "dataset_id": "la_haute_borne",
+        "dataset_fingerprint": "abc",
+    }
+    args.update(overrides)
+    return make_result_key(**args)
+
+
+class TestMakeResultKey:
+    """Test suite for make_result_key."""
+
+    def test_key_ignores_param_order(self):
+        """Equivalent parameter dicts should give the same key."""
+        assert _key(params={"iterations": 500, "reg_model": "lin"}) == _key(
+            params={"reg_model": "lin", "iterations": 500}
+        )
+
+    def test_key_changes_with_inputs(self):
+        """Seed, parameters and dataset fingerprint should all affect the key."""
+        base = _key()
+        assert _key(seed=7) != base
+        assert _key(params={"iterations": 1000, "reg_model": "lin"}) != base
+        assert _key(dataset_fingerprint="def") != base
+        assert _key(analysis_type="wake_losses") != base
+
+
+class TestResultCache:
+    """Test suite for ResultCache."""
+
+    def test_computes_once(self, tmp_path):
+        """A second lookup should be served from the cache."""
+        cache = ResultCache(cache_dir=tmp_path)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"aep_gwh": 12.3}
+
+        assert cache.get_or_compute("k", compute) == {"aep_gwh": 12.3}
+        assert cache.get_or_compute("k", compute) == {"aep_gwh": 12.3}
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_returns_copies(self, tmp_path):
+        """Mutating a returned result should not change the cached one."""
+        cache = ResultCache(cache_dir=tmp_path)
+        cache.put("k", {"aep_gwh": 12.3})
+
+        cache.get("k")["aep_gwh"] = 0
+
+        assert cache.get("k") == {"aep_gwh": 12.3}
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        """Results written to disk should be visible to a fresh cache."""
+        ResultCache(cache_dir=tmp_path).put("k", {"aep_gwh": 12.3})
+
+        assert ResultCache(cache_dir=tmp_path).get("k") == {"aep_gwh": 12.3}
+
+    def test_memory_tier_is_bounded(self):
+        """The least recently used entries should be evicted from memory."""
+        cache = ResultCache(cache_dir=None, max_memory_entries=2)
+        cache.put("a", {})
+        cache.put("b", {})
+        cache.get("a")
+        cache.put("c", {})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {}
+        assert cache.stats()["memory_entries"] == 2
+
+    def test_disk_tier_is_bounded(self, tmp_path):
+        """The disk tier should keep at most max_disk_entries files, removing the oldest."""
+        cache = ResultCache(cache_dir=tmp_path, max_disk_entries=10)
+        for i in range(11):
+            cache.put(f"key{i}", {})
+            os.utime(tmp_path / f"key{i}.json", (i, i))
+
+        assert {path.stem for path in tmp_path.glob("*.json")} == {f"key{i}" for i in range(2, 11)}
+
+    def test_writes_below_the_limit_do_not_scan_the_disk_tier(self, tmp_path, monkeypatch):
+        """Only the first write and writes beyond the limit should list the cache directory."""
+        cache = ResultCache(cache_dir=tmp_path, max_disk_entries=10)
+        scans = []
+        glob = Path.glob
+
+        def counting_glob(path, pattern):
+            scans.append(pattern)
+            return glob(path, pattern)
+
+        monkeypatch.setattr(Path, "glob", counting_glob)
+        for i in range(10):
+            cache.put(f"key{i}", {})
+        cache.put("key0", {})  # Overwriting does not add a file
+
+        assert len(scans) == 1
+
+    def test_trim_ignores_files_removed_meanwhile(self, tmp_path, monkeypatch, caplog):
+        """A file deleted by another worker during a trim should not fail the write."""
+        cache = ResultCache(cache_dir=tmp_path, max_disk_entries=2)
+        cache.put("a", {})
+        cache.put("b", {})
+        glob = Path.glob
+
+        def glob_then_delete(path, pattern):
+            paths = list(glob(path, pattern))
+            (tmp_path / "a.json").unlink()
+            return paths
+
+        monkeypatch.setattr(Path, "glob", glob_then_delete)
+        with caplog.at_level(logging.WARNING, logger="app.services.result_cache"):
+            cache.put("c", {})
+
+        assert not caplog.records
+        assert (tmp_path / "c.json").exists()
+
+
+class TestServiceMemoization:
+    """Test memoization inside OpenOAService."""
+
+    def test_electrical_threshold_does_not_recompute(self, monkeypatch, tmp_path):
+        """Changing only the loss threshold should reuse the computed losses."""
+        calls = []
+
+        def compute(file_path=None, **kwargs):
+            calls.append(kwargs)
+            return {"total_loss_pct": 2.5, "plant_capacity_mw": 8.2}
+
+        monkeypatch.setattr(service_module.settings, "use_mock_data", False)
+        monkeypatch.setattr(openoa_service, "_compute_electrical_losses", compute)
+        monkeypatch.setattr(openoa_service, "_result_cache", ResultCache(cache_dir=tmp_path))
+
+        low = openoa_service.run_electrical_losses_analysis(loss_threshold_pct=1.0)
+        high = openoa_service.run_electrical_losses_analysis(loss_threshold_pct=5.0)
+
+        assert len(calls) == 1
+        assert low["exceeds_threshold"] is True
+        assert high["exceeds_threshold"] is False
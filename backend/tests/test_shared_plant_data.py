@@ -0,0 +1,160 @@
+"""Tests for the cross-process PlantData store.
+
+Uses a small stand-in for PlantData with the same frame attributes.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.plant_data_cache import PlantDataCache, make_cache_key
+from app.services.shared_plant_data import SharedPlantDataStore
+
+
+class FakePlant:
+    """Picklable stand-in for PlantData."""
+
+    def __init__(self):
+        times = pd.date_range("2020-01-01", periods=48, freq="10min")
+        index = pd.MultiIndex.from_product([times, ["T1", "T2"]], names=["time", "asset_id"])
+        self.scada = pd.DataFrame({
+            "WTUR_W": np.arange(len(index), dtype="float64"),
+            "WMET_HorWdSpd": np.where(np.arange(len(index)) % 7 == 0, np.nan, 8.0),
+        }, index=index)
+        self.meter = pd.DataFrame({"MMTR_SupWh": np.ones(48)}, index=pd.Index(times, name="time"))
+        self.tower = None
+        self.status = None
+        self.curtail = None
+        self.asset = pd.DataFrame({"type": ["turbine", "turbine"]}, index=pd.Index(["T1", "T2"], name="asset_id"))
+        self.reanalysis = {"era5": pd.DataFrame({"WMETR_HorWdSpd": np.full(48, 7.5)}, index=pd.Index(times, name="time"))}
+        self.metadata = {"capacity": 4.1}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SharedPlantDataStore(tmp_path / "plant_data")
+
+
+class TestSharedPlantDataStore:
+    """Test suite for SharedPlantDataStore."""
+
+    def test_round_trip(self, store):
+        """Attached frames should equal the published ones."""
+        original = FakePlant()
+        key = make_cache_key("default", {}, "abc")
+
+        plant = store.get_or_publish(key, lambda: original)
+
+        pd.testing.assert_frame_equal(plant.scada, original.scada)
+        pd.testing.assert_frame_equal(plant.meter, original.meter)
+        pd.testing.assert_frame_equal(plant.asset, original.asset)
+        pd.testing.assert_frame_equal(plant.reanalysis["era5"], original.reanalysis["era5"])
+        assert plant.tower is None
+        assert plant.metadata == {"capacity": 4.1}
+
+    def test_numeric_frames_are_read_only_memory_maps(self, store):
+        """Shared frames should be backed by the mapped file, not private copies."""
+        key = make_cache_key("default", {}, "abc")
+        plant = store.get_or_publish(key, FakePlant)
+
+        for column in plant.scada.columns:
+            assert not plant.scada[column].to_numpy().flags.writeable
+        assert not plant.reanalysis["era5"]["WMETR_HorWdSpd"].to_numpy().flags.writeable
+
+    def test_other_process_attaches_without_loading(self, tmp_path):
+        """A second store on the same directory should reuse the published snapshot."""
+        key = make_cache_key("default", {}, "abc")
+        SharedPlantDataStore(tmp_path).get_or_publish(key, FakePlant)
+
+        def loader():
+            raise AssertionError("loader should not run")
+
+        plant = SharedPlantDataStore(tmp_path).get_or_publish(key, loader)
+        assert len(plant.scada) == 96
+
+    def test_new_fingerprint_replaces_old_snapshot(self, store):
+        """Publishing a changed dataset should remove its stale snapshot."""
+        store.get_or_publish(make_cache_key("default", {}, "old"), FakePlant)
+        store.get_or_publish(make_cache_key("default", {}, "new"), FakePlant)
+        store.get_or_publish(make_cache_key("other", {}, "old"), FakePlant)
+
+        assert store.get(make_cache_key("default", {}, "old")) is None
+        assert store.get(make_cache_key("default", {}, "new")) is not None
+        assert store.get(make_cache_key("other", {}, "old")) is not None
+
+    def test_other_load_options_are_kept(self, store):
+        """Publishing one set of load options should not remove the dataset's others."""
+        store.get_or_publish(make_cache_key("default", {"use_cleansed": True}, "old"), FakePlant)
+        store.get_or_publish(make_cache_key("default", {"use_cleansed": False}, "old"), FakePlant)
+        store.get_or_publish(make_cache_key("default", {"use_cleansed": True}, "new"), FakePlant)
+
+        assert store.get(make_cache_key("default", {"use_cleansed": True}, "old")) is None
+        assert store.get(make_cache_key("default", {"use_cleansed": False}, "old")) is not None
+        assert store.get(make_cache_key("default", {"use_cleansed": True}, "new")) is not None
+
+    def test_timezone_aware_index_is_shared(self, store):
+        """UTC time levels, as built from uploads, should be memory-mapped rather than pickled."""
+        original = FakePlant()
+        original.scada.index = original.scada.index.set_levels(
+            original.scada.index.levels[0].tz_localize("UTC"), level="time"
+        )
+        original.meter.index = original.meter.index.tz_localize("UTC")
+        key = make_cache_key("upload", {}, "abc")
+
+        plant = store.get_or_publish(key, lambda: original)
+
+        pd.testing.assert_frame_equal(plant.scada, original.scada)
+        pd.testing.assert_frame_equal(plant.meter, original.meter)
+        assert not plant.scada["WTUR_W"].to_numpy().flags.writeable
+        assert (store._entry_dir(key) / "scada.arrow").exists()
+
+    def test_remove_dataset(self, store):
+        """Every snapshot of a dataset should be removed, and only of that dataset."""
+        store.get_or_publish(make_cache_key("upload", {"use_cleansed": True}, "abc"), FakePlant)
+        store.get_or_publish(make_cache_key("upload", {"use_cleansed": False}, "abc"), FakePlant)
+        store.get_or_publish(make_cache_key("upload-2", {}, "abc"), FakePlant)
+
+        store.remove_dataset("upload")
+
+        assert store.get(make_cache_key("upload", {"use_cleansed": True}, "abc")) is None
+        assert store.get(make_cache_key("upload", {"use_cleansed": False}, "abc")) is None
+        assert store.get(make_cache_key("upload-2", {}, "abc")) is not None
+
+    def test_missing_frame_is_a_miss(self, store):
+        """A snapshot whose frames are being removed should be rebuilt, not fail to attach."""
+        key = make_cache_key("default", {}, "abc")
+        store.get_or_publish(key, FakePlant)
+        (store._entry_dir(key) / "meter.arrow").unlink()
+
+        assert store.get(key) is None
+        plant = store.get_or_publish(key, FakePlant)
+        assert not plant.meter["MMTR_SupWh"].to_numpy().flags.writeable
+
+    def test_unpublishable_plant_is_returned_as_built(self, store, monkeypatch):
+        """A failed publish should fall back to the private object."""
+        original = FakePlant()
+
+        def fail(key, plant):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(store, "publish", fail)
+        assert store.get_or_publish(make_cache_key("default", {}, "abc"), lambda: original) is original
+
+
+class TestPlantDataCacheSharedStore:
+    """Test suite for PlantDataCache backed by a shared store."""
+
+    def test_miss_loads_through_shared_store(self, store):
+        """Cache copies should share the mapped data but not the frames that hold it."""
+        cache = PlantDataCache(max_bytes=10 * 1024 * 1024, shared_store=store)
+        key = make_cache_key("default", {}, "abc")
+
+        plant = cache.get_or_load(key, FakePlant)
+        plant.scada.reset_index(inplace=True)
+        with pytest.raises(ValueError):
+            plant.scada.loc[0, "WTUR_W"] = -1.0
+
+        assert store.get(key) is not None
+        again = cache.get_or_load(key, FakePlant)
+        assert again.scada.index.names == ["time", "asset_id"]
+        assert again.scada.iloc[0, 0] == 0.0
@@ -0,0 +1,53 @@
+"""Tests for per-stage analysis timings."""
+
+import time
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.services.stage_timer import StageTimer, collect_timings, server_timing_header, stage
+
+
+class TestStageTimer:
+    """Test suite for the stage timer."""
+
+    def test_stage_is_noop_without_timer(self):
+        """Instrumented code should run normally outside a timed request."""
+        with stage("run"):
+            value = 1
+        assert value == 1
+
+    def test_nested_stages_record_self_time(self):
+        """A parent stage should exclude time spent in nested stages."""
+        with collect_timings() as timer:
+            with stage("load"):
+                with stage("clean"):
+                    time.sleep(0.05)
+
+        assert timer.stages["clean"] >= 0.05
+        assert timer.stages["load"] < 0.05
+
+    def test_repeated_stages_accumulate(self):
+        """Entering a stage twice should add up the durations."""
+        timer = StageTimer()
+        timer.add("run", 0.25)
+        timer.add("run", 0.5)
+
+        assert timer.to_milliseconds() == {"run": 750.0}
+
+    def test_server_timing_header(self):
+        """Timings should be formatted as Server-Timing metrics."""
+        assert server_timing_header({"load": 12.5, "run": 100.0}) == "load;dur=12.5, run;dur=100.0"
+
+
+class TestAnalysisTimings:
+    """Test suite for timings returned by analysis endpoints."""
+
+    def test_response_includes_timings_and_header(self, client: TestClient):
+        """Analyses should return stage timings in the body and Server-Timing header."""
+        response = client.post("/api/v1/analysis/electrical-losses", json={})
+
+        assert response.status_code == status.HTTP_200_OK
+        timings = response.json()["timings"]
+        assert {"queue", "total"} <= set(timings)
+        assert "total;dur=" in response.headers["Server-Timing"]
@@ -0,0 +1,93 @@
+"""Tests for the synthetic plant data generator."""
+
+import pandas as pd
+import pytest
+
+from app.core.lazy_imports import get_dataset_loader
+from benchmarks.synthetic import (
+    SyntheticPlant,
+    iter_reanalysis,
+    reanalysis_frame,
+    scada_frame,
+    write_dataset,
+    write_scada,
+    write_upload,
+)
+
+
+class TestSyntheticPlant:
+    """Test suite for synthetic SCADA, meter and reanalysis data."""
+
+    def test_output_is_deterministic_under_a_seed(self):
+        """The same settings should give identical data; another seed should not."""
+        plant = SyntheticPlant(num_turbines=3, days=2)
+        other_seed = SyntheticPlant(num_turbines=3, days=2, seed=1)
+
+        pd.testing.assert_frame_equal(scada_frame(plant), scada_frame(plant))
+        assert not scada_frame(plant)["P_avg"].equals(scada_frame(other_seed)["P_avg"])
+
+    def test_longer_period_extends_shorter(self):
+        """Data is drawn per calendar week, so a shorter period is a prefix of a longer one."""
+        short = scada_frame(SyntheticPlant(days=3, start="2014-01-06"))
+        long = scada_frame(SyntheticPlant(days=10, start="2014-01-06"))
+
+        pd.testing.assert_frame_equal(short, long.iloc[:len(short)])
+
+    def test_streamed_file_matches_frame(self, tmp_path):
+        """Streaming to a file should write the same rows as the in-memory frame."""
+        plant = SyntheticPlant.from_profile("poor", num_turbines=2, days=9)
+        path = tmp_path / "scada.csv"
+
+        rows = write_scada(plant, path)
+
+        expected = scada_frame(plant)
+        actual = pd.read_csv(path)
+        actual["Date_time"] = pd.to_datetime(actual["Date_time"], utc=True)
+        assert rows == len(expected)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+    def test_profiles_control_gaps(self):
+        """Clean plants have a row per turbine and step; poor ones lose about their gap fraction."""
+        clean = SyntheticPlant.from_profile("clean", num_turbines=4, days=7)
+        poor = SyntheticPlant.from_profile("poor", num_turbines=4, days=28)
+
+        assert len(scada_frame(clean)) == clean.steps * 4
+        missing = 1 - len(scada_frame(poor)) / (poor.steps * 4)
+        assert 0.05 < missing < 0.3
+        with pytest.raises(ValueError):
+            SyntheticPlant.from_profile("perfect")
+
+    def test_reanalysis_batching_does_not_change_data(self):
+        """Batch size only affects how hourly weeks are grouped into frames."""
+        plant = SyntheticPlant(days=1, reanalysis_years=1)
+
+        batched = pd.concat(iter_reanalysis(plant, "merra2", batch_weeks=3), ignore_index=True)
+
+        pd.testing.assert_frame_equal(batched, reanalysis_frame(plant, "merra2"))
+        assert batched["datetime"].iloc[0].minute == 30
+
+    def test_upload_stops_at_max_rows(self, tmp_path):
+        """Uploads should be in the upload format and honour max_rows."""
+        path = tmp_path / "upload.csv"
+
+        rows = write_upload(SyntheticPlant(num_turbines=5, days=2), path, max_rows=1001)
+
+        df = pd.read_csv(path)
+        assert rows == len(df) == 1001
+        assert list(df.columns) == ["time", "asset_id", "WTUR_W", "WMET_HorWdSpd"]
+
+    def test_dataset_loads_with_la_haute_borne_loader(self, tmp_path):
+        """A written dataset should load with the La Haute Borne loader."""
+        plant = SyntheticPlant(num_turbines=3, days=2, reanalysis_years=1)
+
+        data_dir = write_dataset(plant, tmp_path)
+        # Dataframes rather than PlantData, which is slow to build and validated elsewhere
+        scada, meter, curtail, asset, reanalysis = get_dataset_loader("la_haute_borne")(
+            data_dir, return_value="dataframes"
+        )
+
+        assert set(scada["Wind_turbine_name"]) == set(asset["Wind_turbine_name"]) == set(plant.turbine_ids)
+        assert len(meter) == len(curtail) == plant.steps
+        assert set(reanalysis) == {"era5", "merra2"}
+        assert reanalysis["era5"]["winddirection_deg"].notna().all()
+        assert f"capacity: {plant.capacity_mw:g}" in (tmp_path / "plant_meta.yml").read_text()
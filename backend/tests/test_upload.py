@@ -0,0 +1,261 @@
+"""Tests for plant data uploads.
+
+Covers streaming ingestion, incremental CSV row counting,
+upload size limits, columnar conversion and content deduplication.
+"""
+
+import io
+from types import SimpleNamespace
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.api.routes import upload as upload_routes
+from app.services import file_storage
+from app.services.file_storage import FileStorage
+from app.services.plant_data_cache import make_cache_key
+from app.services.shared_plant_data import SharedPlantDataStore
+from app.services.upload_conversion import columnar_path, load_columnar
+from app.services.upload_ingest import CsvStats, UploadTooLargeError, ingest_upload
+
+SCADA_CSV = (
+    b"Date_time,Wind_turbine_name,P_avg,Ws_avg\n"
+    b"2014-01-01T01:00:00+01:00,R80736,642.8,7.1\n"
+    b"2014-01-01T01:00:00+01:00,R80721,441.1,6.4\n"
+)
+
+
+def _count(data: bytes, chunk_size: int):
+    stats = CsvStats()
+    for i in range(0, len(data), chunk_size):
+        stats.feed(data[i:i + chunk_size])
+    row_count = stats.finish()
+    return stats.columns, row_count
+
+
+class TestCsvStats:
+    """Test suite for incremental CSV statistics."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 7, 1024])
+    def test_counts_rows_across_chunk_boundaries(self, chunk_size):
+        """Row counts and header should not depend on where chunks are split."""
+        data = b'time,"power, kW",note\r\n1,2,"multi\nline"\r\n\r\n3,4,"say ""hi"""\r\n5,6,x'
+
+        assert _count(data, chunk_size) == (["time", "power, kW", "note"], 3)
+
+    def test_header_only_and_empty_files(self):
+        """Files without data rows should count zero rows."""
+        assert _count(b"a,b\n", 1024) == (["a", "b"], 0)
+        assert _count(b"", 1024) == ([], 0)
+
+
+class TestIngestUpload:
+    """Test suite for ingest_upload."""
+
+    def test_rejects_oversized_file_and_removes_partial(self, tmp_path):
+        """Files over the limit should fail without leaving data behind."""
+        dest = tmp_path / "big.csv.part"
+
+        with pytest.raises(UploadTooLargeError):
+            ingest_upload(io.BytesIO(b"a,b\n" * 100), dest, "csv", max_bytes=50, max_json_bytes=50, chunk_size=16)
+
+        assert not dest.exists()
+
+    def test_rejects_invalid_utf8(self, tmp_path):
+        """Non UTF-8 content should be rejected."""
+        with pytest.raises(ValueError):
+            ingest_upload(io.BytesIO(b"a,b\n\xff,1\n"), tmp_path / "bad.csv.part", "csv", 1024, 1024)
+
+
+class TestUploadEndpoint:
+    """Test suite for the upload endpoint."""
+
+    def test_upload_csv_streams_to_disk(self, client: TestClient, upload_dir):
+        """CSV uploads should be stored with row count and columns."""
+        content = b"time,WTUR_W,WMET_HorWdSpd\n" + b"2020-01-01T00:00:00,100,5.0\n" * 1000
+
+        response = client.post(
+            "/api/v1/upload-plant-data",
+            files={"file": ("scada.csv", content, "text/csv")},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["row_count"] == 1000
+        assert data["columns"] == ["time", "WTUR_W", "WMET_HorWdSpd"]
+        assert data["file_size_bytes"] == len(content)
+        stored = FileStorage.get_file_path(data["file_id"])
+        assert open(stored, "rb").read() == content
+        assert not list(upload_dir.glob("*.part"))
+
+    def test_upload_json(self, client: TestClient, upload_dir):
+        """JSON uploads should report rows and columns of the first record."""
+        response = client.post(
+            "/api/v1/upload-plant-data",
+            files={"file": ("scada.json", b'[{"time": 1, "power": 2}, {"time": 2, "power": 3}]', "application/json")},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["row_count"] == 2
+        assert response.json()["columns"] == ["time", "power"]
+
+    def test_invalid_json_returns_400(self, client: TestClient, upload_dir):
+        """Malformed JSON should be rejected and not stored."""
+        response = client.post(
+            "/api/v1/upload-plant-data",
+            files={"file": ("scada.json", b"[{", "application/json")},
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert FileStorage.count_files() == 0
+        assert not list(upload_dir.glob("*.json*"))
+
+    def test_oversized_upload_returns_413(self, client: TestClient, upload_dir, monkeypatch):
+        """Uploads over MAX_UPLOAD_SIZE_MB should be rejected."""
+        monkeypatch.setattr(upload_routes.settings, "max_upload_size_mb", 1)
+
+        response = client.post(
+            "/api/v1/upload-plant-data",
+            files={"file": ("scada.csv", b"a\n" * (1024 * 1024), "text/csv")},
+        )
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert not list(upload_dir.glob("*.csv*"))
+
+
+class TestColumnarConversion:
+    """Test suite for the columnar artifact written after upload."""
+
+    def _upload(self, client: TestClient, content: bytes) -> str:
+        response = client.post(
+            "/api/v1/upload-plant-data",
+            files={"file": ("scada.csv", content, "text/csv")},
+        )
+        assert response.json()["columnar_status"] == "pending"
+        return response.json()["file_id"]
+
+    def test_upload_is_converted_in_background(self, client: TestClient, upload_dir):
+        """The artifact should have parsed times and categorical asset ids."""
+        file_id = self._upload(client, SCADA_CSV)
+
+        info = client.get(f"/api/v1/upload-plant-data/{file_id}").json()
+        df = load_columnar(FileStorage.get_file_path(file_id))
+
+        assert info["columnar_status"] == "ready"
+        assert info["row_count"] == 2
+        assert str(df["time"].dt.tz) == "UTC"
+        assert df["asset_id"].dtype == "category"
+        assert list(df["asset_id"]) == ["R80736", "R80721"]
+
+    def test_conversion_failure_is_reported(self, client: TestClient, upload_dir):
+        """Uploads missing required columns should be marked failed."""
+        file_id = self._upload(client, b"a,b\n1,2\n")
+
+        info = client.get(f"/api/v1/upload-plant-data/{file_id}").json()
+
+        assert info["columnar_status"] == "failed"
+        assert "Missing required columns" in info["columnar_error"]
+
+    def test_delete_removes_artifact(self, client: TestClient, upload_dir):
+        """Deleting an upload should delete its columnar artifact too."""
+        file_id = self._upload(client, SCADA_CSV)
+        artifact = columnar_path(FileStorage.get_file_path(file_id))
+        assert artifact.exists()
+
+        FileStorage.delete_file(file_id)
+
+        assert not artifact.exists()
+
+    def test_unknown_file_returns_404(self, client: TestClient, upload_dir):
+        """Unknown file IDs should return 404."""
+        assert client.get("/api/v1/upload-plant-data/missing").status_code == status.HTTP_404_NOT_FOUND
+
+    def test_analysis_loads_artifact_instead_of_text(self, client: TestClient, upload_dir, monkeypatch):
+        """Loading plant data should not re-parse the uploaded text once converted."""
+        pytest.importorskip("openoa")
+        from app.services import openoa_service as service_module
+
+        def no_text(*args, **kwargs):
+            raise AssertionError("Upload text should not be re-parsed")
+
+        rows = b"".join(
+            b"2014-01-01T01:%02d:00+01:00,%s,500.0,7.0\n" % (minute, turbine)
+            for minute in range(0, 60, 10)
+            for turbine in (b"R80736", b"R80721")
+        )
+        file_id = self._upload(client, SCADA_CSV.splitlines(keepends=True)[0] + rows)
+        monkeypatch.setattr(service_module, "read_upload_frame", no_text)
+
+        plant_data = service_module.openoa_service._load_plant_data_from_file(FileStorage.get_file_path(file_id))
+
+        assert len(plant_data.scada) == 12
+
+
+class TestDeduplication:
+    """Test suite for content-addressed storage of uploads."""
+
+    def _upload(self, client: TestClient, content: bytes, filename: str = "scada.csv") -> dict:
+        response = client.post(
+            "/api/v1/upload-plant-data",
+            files={"file": (filename, content, "text/csv")},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    def test_identical_uploads_share_one_file(self, client: TestClient, upload_dir):
+        """Re-uploading the same content should create an alias, not a copy."""
+        first = self._upload(client, SCADA_CSV)
+        second = self._upload(client, SCADA_CSV, filename="again.csv")
+
+        assert first["file_id"] != second["file_id"]
+        assert first["content_hash"] == second["content_hash"]
+        assert second["columnar_status"] == "ready"
+        assert FileStorage.get_file_path(first["file_id"]) == FileStorage.get_file_path(second["file_id"])
+        assert len(list(upload_dir.glob("*.csv"))) == 1
+        assert len(list(upload_dir.glob("*.arrow"))) == 1
+        assert FileStorage.get_file_info(second["file_id"])["original_filename"] == "again.csv"
+
+    def test_shared_file_survives_until_last_alias_is_deleted(self, client: TestClient, upload_dir):
+        """Deleting one alias should keep the file for the others."""
+        first = self._upload(client, SCADA_CSV)
+        second = self._upload(client, SCADA_CSV)
+        stored = FileStorage.get_file_path(first["file_id"])
+
+        FileStorage.delete_file(first["file_id"])
+        assert FileStorage.get_file_path(second["file_id"]) == stored
+        assert columnar_path(stored).exists()
+
+        FileStorage.delete_file(second["file_id"])
+        assert not list(upload_dir.glob("*.csv"))
+        assert not list(upload_dir.glob("*.arrow"))
+
+    def test_deleting_last_alias_removes_shared_plant_data(self, client: TestClient, upload_dir, monkeypatch):
+        """Snapshots built from an upload should not outlive its stored file."""
+        monkeypatch.setattr(file_storage.get_settings(), "plant_data_shared_dir", str(upload_dir / "plant_data"))
+        store = SharedPlantDataStore(upload_dir / "plant_data")
+        first = self._upload(client, SCADA_CSV)
+        second = self._upload(client, SCADA_CSV)
+        key = make_cache_key(first["content_hash"], {}, "abc")
+        store.publish(key, SimpleNamespace(scada=None, reanalysis={}))
+
+        FileStorage.delete_file(first["file_id"])
+        assert store.get(key) is not None
+
+        FileStorage.delete_file(second["file_id"])
+        assert store.get(key) is None
+
+    def test_aliases_share_dataset_identity(self, client: TestClient, upload_dir):
+        """Aliases should resolve to the same PlantData and result cache keys."""
+        from app.services.openoa_service import openoa_service
+
+        first = self._upload(client, SCADA_CSV)
+        second = self._upload(client, SCADA_CSV)
+
+        identities = {
+            openoa_service.get_dataset_identity(FileStorage.get_file_path(upload["file_id"]))
+            for upload in (first, second)
+        }
+
+        assert len(identities) == 1
+        assert identities.pop()[0] == first["content_hash"]
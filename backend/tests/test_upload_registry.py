@@ -0,0 +1,281 @@
+"""Tests for the persistent upload registry.
+
+Covers persistence across instances (other workers, restarts),
+indexed lookups and expiry, LRU quota eviction, the upload janitor,
+and orphan cleanup after a restart.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from app.services import file_storage, upload_janitor
+from app.services.file_storage import REGISTRY_FILENAME, FileStorage
+from app.services.upload_janitor import run_upload_janitor
+from app.services.upload_registry import UploadRegistry, _SQLiteStore
+
+
+def _entry(file_id: str, uploaded_at: datetime, tmp_path, size_bytes: int = 0) -> dict:
+    return {
+        "file_id": file_id,
+        "original_filename": f"{file_id}.csv",
+        "stored_path": str(tmp_path / f"{file_id}.csv"),
+        "file_type": "csv",
+        "uploaded_at": uploaded_at,
+        "metadata": {"row_count": 3, "columns": ["time"]},
+        "columnar_status": "pending",
+        "columnar_path": str(tmp_path / f"{file_id}.arrow"),
+        "columnar_error": None,
+        "size_bytes": size_bytes,
+    }
+
+
+class TestUploadRegistry:
+    """Test suite for UploadRegistry."""
+
+    def test_entries_are_shared_between_instances(self, tmp_path):
+        """An entry added by one worker should be visible to another."""
+        db_path = tmp_path / "registry.sqlite3"
+        UploadRegistry(db_path).add(_entry("a", datetime.now(), tmp_path))
+
+        other = UploadRegistry(db_path)
+        other.update("a", columnar_status="ready")
+
+        entry = UploadRegistry(db_path).get("a")
+        assert entry["metadata"] == {"row_count": 3, "columns": ["time"]}
+        assert entry["columnar_status"] == "ready"
+        assert isinstance(entry["uploaded_at"], datetime)
+
+    def test_remove_older_than(self, tmp_path):
+        """Expiry should remove and return only entries older than the cutoff."""
+        registry = UploadRegistry(tmp_path / "registry.sqlite3")
+        now = datetime.now()
+        registry.add(_entry("old", now - timedelta(hours=30), tmp_path))
+        registry.add(_entry("new", now, tmp_path))
+
+        removed = registry.remove_older_than(now - timedelta(hours=24))
+
+        assert [entry["file_id"] for entry in removed] == ["old"]
+        assert list(registry.all()) == ["new"]
+
+    @pytest.mark.parametrize(
+        "query, params, index",
+        [
+            ("SELECT * FROM uploads WHERE file_id = ?", ("a",), "sqlite_autoindex_uploads_1"),
+            ("DELETE FROM uploads WHERE uploaded_at < ?", (0,), "idx_uploads_uploaded_at"),
+            ("SELECT file_id, size_bytes FROM uploads ORDER BY last_accessed", (), "idx_uploads_last_accessed"),
+            ("SELECT 1 FROM uploads WHERE columnar_path = ? LIMIT 1", ("a",), "idx_uploads_columnar_path"),
+        ],
+    )
+    def test_queries_use_indexes(self, tmp_path, query, params, index):
+        """Lookups and expiry should not scan the whole table."""
+        registry = UploadRegistry(tmp_path / "registry.sqlite3")
+
+        plan = registry._connect().execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+
+        assert any(index in row["detail"] for row in plan)
+
+    def test_remove_least_recently_used(self, tmp_path):
+        """Eviction should follow last access, not upload time, and stop once enough is freed."""
+        registry = UploadRegistry(tmp_path / "registry.sqlite3")
+        now = datetime.now()
+        for i, file_id in enumerate(["a", "b", "c"]):
+            registry.add(_entry(file_id, now - timedelta(hours=3 - i), tmp_path, size_bytes=100))
+        registry.touch("a")
+
+        removed = registry.remove_least_recently_used(150)
+
+        assert [entry["file_id"] for entry in removed] == ["b", "c"]
+        assert list(registry.all()) == ["a"]
+        assert registry.total_bytes() == 100
+
+    def test_shared_files_count_once(self, tmp_path):
+        """Aliases of one stored file should count once and free space only when all are gone."""
+        registry = UploadRegistry(tmp_path / "registry.sqlite3")
+        now = datetime.now()
+        for file_id in ("a", "b"):
+            entry = _entry(file_id, now, tmp_path, size_bytes=100)
+            entry["stored_path"] = str(tmp_path / "shared.csv")
+            registry.add(entry)
+        registry.add(_entry("c", now, tmp_path, size_bytes=100))
+        registry.touch("c")
+
+        assert registry.total_bytes() == 200
+        removed = registry.remove_least_recently_used(50)
+
+        assert [entry["file_id"] for entry in removed] == ["a", "b"]
+        assert not registry.is_referenced(str(tmp_path / "shared.csv"))
+
+    def test_update_rejects_unknown_fields(self, tmp_path):
+        """Only mutable fields can be updated."""
+        with pytest.raises(ValueError):
+            UploadRegistry(tmp_path / "registry.sqlite3").update("a", stored_path="/etc/passwd")
+
+    def test_store_requires_a_schema(self, tmp_path):
+        """Stores must define their schema; the base class cannot be used directly."""
+        with pytest.raises(TypeError):
+            _SQLiteStore(tmp_path / "registry.sqlite3")
+
+
+class TestFileStorageRestart:
+    """Test FileStorage behaviour across restarts."""
+
+    def test_orphan_cleanup_keeps_registered_files_after_restart(self, monkeypatch, upload_dir):
+        """A fresh registry instance should still protect earlier uploads."""
+        tmp_path = upload_dir
+        file_id = FileStorage.save_file(b"a,b\n1,2\n", "data.csv", {"row_count": 1})
+        orphan = tmp_path / "orphan.csv"
+        orphan.write_bytes(b"x")
+
+        # Simulate a restart: a new process opens the same database
+        monkeypatch.setattr(file_storage, "_registry", UploadRegistry(tmp_path / REGISTRY_FILENAME))
+        FileStorage._cleanup_old_files()
+
+        assert FileStorage.get_file_path(file_id) is not None
+        assert not orphan.exists()
+        assert (tmp_path / REGISTRY_FILENAME).exists()
+
+
+@pytest.mark.usefixtures("upload_dir")
+class TestUploadJanitor:
+    """Test the upload janitor and the quota it enforces."""
+
+    def test_upload_does_not_run_cleanup(self, monkeypatch):
+        """Storing a file should not scan or expire other uploads."""
+        def fail(*args, **kwargs):
+            raise AssertionError("cleanup ran on the upload path")
+
+        monkeypatch.setattr(FileStorage, "_cleanup_old_files", fail)
+        monkeypatch.setattr(FileStorage, "_cleanup_orphaned_files", fail)
+
+        file_id = FileStorage.save_file(b"a,b\n1,2\n", "data.csv", {"row_count": 1})
+
+        assert FileStorage.get_file_path(file_id) is not None
+
+    def test_quota_evicts_least_recently_used(self, monkeypatch):
+        """Files beyond the quota should be evicted, keeping recently used ones."""
+        monkeypatch.setattr(file_storage, "TOUCH_INTERVAL", timedelta(0))
+        first = FileStorage.save_file(b"a,b\n" + b"1,2\n" * 25, "first.csv", {})  # 104 bytes
+        time.sleep(0.01)
+        second = FileStorage.save_file(b"a,b\n" + b"3,4\n" * 25, "second.csv", {})
+        time.sleep(0.01)
+        first_path = FileStorage.get_file_path(first)  # Touching makes `second` the LRU
+
+        stats = FileStorage.run_janitor(max_age_hours=24, quota_bytes=150)
+
+        assert stats == {"expired": 0, "evicted": 1, "files_remaining": 1}
+        assert FileStorage.get_file_path(second) is None
+        assert FileStorage.get_file_path(first) == first_path
+
+    def test_use_is_recorded_at_most_once_per_interval(self, monkeypatch):
+        """Repeated lookups of a recently used file should not write to the registry."""
+        file_id = FileStorage.save_file(b"a,b\n1,2\n", "data.csv", {})
+        touched = []
+        monkeypatch.setattr(file_storage._registry, "touch", lambda *args, **kwargs: touched.append(args))
+
+        FileStorage.get_file_path(file_id)
+        assert touched == []
+
+        monkeypatch.setattr(file_storage, "TOUCH_INTERVAL", timedelta(0))
+        FileStorage.get_file_path(file_id)
+        assert touched == [(file_id,)]
+
+    def test_lookup_does_not_wait_for_the_write_lock(self, monkeypatch, tmp_path):
+        """Recording a use should be skipped, not wait, while another worker holds the write lock."""
+        monkeypatch.setattr(file_storage, "TOUCH_INTERVAL", timedelta(0))
+        file_id = FileStorage.save_file(b"a,b\n1,2\n", "data.csv", {})
+        other_worker = sqlite3.connect(tmp_path / REGISTRY_FILENAME, isolation_level=None)
+        other_worker.execute("BEGIN IMMEDIATE")
+        try:
+            start = time.perf_counter()
+            assert FileStorage.get_file_path(file_id) is not None
+            assert time.perf_counter() - start < 1
+        finally:
+            other_worker.execute("ROLLBACK")
+            other_worker.close()
+
+    def test_commit_does_not_alias_a_file_being_deleted(self, monkeypatch):
+        """A commit racing the deletion of a file's last alias should store its own copy."""
+        content = b"a,b\n1,2\n"
+        first = FileStorage.save_file(content, "first.csv", {})
+        stored = Path(FileStorage.get_file_path(first))
+        checked, proceed = threading.Event(), threading.Event()
+        is_referenced = file_storage._registry.is_referenced
+
+        def pause_after_check(stored_path):
+            referenced = is_referenced(stored_path)
+            if threading.current_thread().name == "janitor":
+                checked.set()
+                proceed.wait(5)
+            return referenced
+
+        monkeypatch.setattr(file_storage._registry, "is_referenced", pause_after_check)
+        janitor = threading.Thread(target=FileStorage.delete_file, args=(first,), name="janitor")
+        janitor.start()
+        assert checked.wait(5)
+        second = []
+        upload = threading.Thread(target=lambda: second.append(FileStorage.save_file(content, "second.csv", {})))
+        upload.start()
+        time.sleep(0.2)  # Let the upload reach its commit while the janitor is between check and delete
+        proceed.set()
+        janitor.join()
+        upload.join()
+
+        assert FileStorage.get_file_path(second[0]) == str(stored)
+        assert stored.read_bytes() == content
+
+    def test_expiry_and_orphans(self, tmp_path):
+        """Expired entries and unregistered files should be removed in one pass."""
+        file_id = FileStorage.save_file(b"a,b\n1,2\n", "data.csv", {})
+        orphan = tmp_path / "orphan.csv"
+        orphan.write_bytes(b"x")
+
+        stats = FileStorage.run_janitor(max_age_hours=0, quota_bytes=None)
+
+        assert stats == {"expired": 1, "evicted": 0, "files_remaining": 0}
+        assert FileStorage.get_file_path(file_id) is None
+        assert not orphan.exists()
+
+    def test_orphan_cleanup_keeps_upload_committed_after_snapshot(self, monkeypatch):
+        """A file committed between the registry snapshot and the directory walk should be kept."""
+        paths = file_storage._registry.paths
+        committed = []
+
+        def commit_after_snapshot():
+            snapshot = paths()
+            committed.append(FileStorage.save_file(b"a,b\n1,2\n", "data.csv", {}))
+            return snapshot
+
+        monkeypatch.setattr(file_storage._registry, "paths", commit_after_snapshot)
+        FileStorage._cleanup_orphaned_files()
+
+        stored = FileStorage.get_file_path(committed[0])
+        assert stored is not None
+        assert Path(stored).exists()
+
+    def test_janitor_loop_survives_failed_pass(self, monkeypatch):
+        """A failing pass should be logged and the loop should keep running."""
+        calls = []
+
+        def janitor_pass():
+            calls.append(None)
+            if len(calls) == 1:
+                raise OSError("disk unavailable")
+            return {"expired": 0, "evicted": 0, "files_remaining": 0, "expired_sessions": 0}
+
+        monkeypatch.setattr(upload_janitor, "janitor_pass", janitor_pass)
+
+        async def run_briefly():
+            task = asyncio.create_task(run_upload_janitor(0.01))
+            while len(calls) < 2:
+                await asyncio.sleep(0.01)
+            task.cancel()
+
+        asyncio.run(asyncio.wait_for(run_briefly(), timeout=5))
+
+        assert len(calls) >= 2
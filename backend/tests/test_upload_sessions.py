@@ -0,0 +1,209 @@
+"""Tests for resumable chunked uploads.
+
+Covers session creation, out-of-order and repeated chunks, received
+byte ranges, finalization into FileStorage, and session expiry.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.services import upload_sessions
+from app.services.file_storage import FileStorage
+from app.services.upload_sessions import ChunkedUploads, UploadSessionStateError
+
+CHUNK = 64 * 1024
+CONTENT = b"time,WTUR_W,WMET_HorWdSpd\n" + b"2020-01-01T00:00:00,100,5.0\n" * 6000  # ~168 KB, 3 chunks
+
+
+def _start(client: TestClient, content: bytes = CONTENT, filename: str = "scada.csv") -> dict:
+    response = client.post(
+        "/api/v1/upload-sessions",
+        json={"filename": filename, "total_size": len(content), "chunk_size": CHUNK},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+
+def _put(client: TestClient, session_id: str, index: int, content: bytes = CONTENT):
+    return client.put(
+        f"/api/v1/upload-sessions/{session_id}/chunks/{index}",
+        content=content[index * CHUNK:(index + 1) * CHUNK],
+    )
+
+
+class TestUploadSessions:
+    """Test suite for the upload session API."""
+
+    def test_chunks_in_any_order_then_complete(self, client: TestClient, upload_session_dir):
+        """Chunks sent out of order (and twice) should assemble the original file."""
+        session = _start(client)
+        assert session["total_chunks"] == 3
+
+        for index in (2, 0, 2):
+            assert _put(client, session["session_id"], index).status_code == status.HTTP_200_OK
+
+        progress = client.get(f"/api/v1/upload-sessions/{session['session_id']}").json()
+        assert progress["received_chunks"] == [0, 2]
+        assert progress["missing_chunks"] == [1]
+        assert progress["received_ranges"] == [[0, CHUNK], [2 * CHUNK, len(CONTENT)]]
+
+        _put(client, session["session_id"], 1)
+        response = client.post(f"/api/v1/upload-sessions/{session['session_id']}/complete")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["file_id"] == session["session_id"]
+        assert data["row_count"] == 6000
+        assert data["filename"] == "scada.csv"
+        assert open(FileStorage.get_file_path(data["file_id"]), "rb").read() == CONTENT
+        assert not list(upload_session_dir.glob("*.part"))
+        assert client.get(f"/api/v1/upload-sessions/{session['session_id']}").status_code == 404
+
+    def test_parallel_chunks(self, client: TestClient, upload_session_dir):
+        """Chunks written concurrently should not interfere."""
+        session = _start(client)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            responses = list(pool.map(lambda i: _put(client, session["session_id"], i), range(3)))
+
+        assert all(r.status_code == status.HTTP_200_OK for r in responses)
+        client.post(f"/api/v1/upload-sessions/{session['session_id']}/complete")
+        assert open(FileStorage.get_file_path(session["session_id"]), "rb").read() == CONTENT
+
+    def test_incomplete_session_cannot_complete(self, client: TestClient, upload_session_dir):
+        """Finalizing with missing chunks should return 409 and keep the session."""
+        session = _start(client)
+        _put(client, session["session_id"], 0)
+
+        response = client.post(f"/api/v1/upload-sessions/{session['session_id']}/complete")
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert client.get(f"/api/v1/upload-sessions/{session['session_id']}").json()["status"] == "open"
+
+    def test_finalize_waits_for_chunks_in_flight(self, client: TestClient, upload_session_dir):
+        """A chunk still being written should keep the session from finalizing until it ends."""
+        session = _start(client)
+        session_id = session["session_id"]
+        for index in range(3):
+            _put(client, session_id, index)
+
+        async def resend_first_chunk_during_finalize():
+            paused = asyncio.Event()
+            resume = asyncio.Event()
+
+            async def body():
+                yield CONTENT[:CHUNK // 2]
+                paused.set()
+                await resume.wait()
+                yield CONTENT[CHUNK // 2:CHUNK]
+
+            write = asyncio.create_task(ChunkedUploads.write_chunk(session_id, 0, body(), write_size=1024))
+            await paused.wait()
+            with pytest.raises(UploadSessionStateError, match="still being written"):
+                ChunkedUploads.finalize(session_id)
+            resume.set()
+            await write
+
+        asyncio.run(resend_first_chunk_during_finalize())
+
+        assert ChunkedUploads.finalize(session_id)[0] == session_id
+        assert open(FileStorage.get_file_path(session_id), "rb").read() == CONTENT
+
+    def test_dead_writer_stops_blocking_finalize_when_its_lease_expires(self, client: TestClient, upload_session_dir):
+        """A write that never ended (e.g. its worker was killed) should only block finalize until its lease expires."""
+        session_id = _start(client)["session_id"]
+        for index in range(3):
+            _put(client, session_id, index)
+
+        upload_sessions._store.begin_write(session_id, lease_seconds=60)
+        with pytest.raises(UploadSessionStateError, match="still being written"):
+            ChunkedUploads.finalize(session_id)
+
+        # The writer never ends its write; let its lease run out
+        upload_sessions._store._connect().execute("UPDATE upload_writers SET expires_at = 0")
+        assert ChunkedUploads.finalize(session_id)[0] == session_id
+
+    def test_stalled_write_loses_its_lease(self, client: TestClient, upload_session_dir, monkeypatch):
+        """A write whose lease expired should stop instead of writing into a finalizing file."""
+        monkeypatch.setattr(upload_sessions, "WRITE_LEASE_SECONDS", 0.3)
+        session_id = _start(client)["session_id"]
+
+        async def stalled_body():
+            yield CONTENT[:CHUNK // 2]
+            await asyncio.sleep(0.5)
+            yield CONTENT[CHUNK // 2:CHUNK]
+
+        with pytest.raises(UploadSessionStateError, match="stalled"):
+            asyncio.run(ChunkedUploads.write_chunk(session_id, 0, stalled_body(), write_size=1024))
+        assert ChunkedUploads.get_status(session_id)["received_chunks"] == []
+
+    def test_session_store_is_not_used_on_the_event_loop(self, client: TestClient, upload_session_dir, monkeypatch):
+        """Writing a chunk should run every blocking SQLite call in a worker thread."""
+        session_id = _start(client)["session_id"]
+        store = upload_sessions._store
+        threads = set()
+        for name in ("get", "begin_write", "renew_write", "mark_received", "end_write"):
+            def record(*args, _method=getattr(store, name), **kwargs):
+                threads.add(threading.get_ident())
+                return _method(*args, **kwargs)
+
+            monkeypatch.setattr(store, name, record)
+
+        async def body():
+            yield CONTENT[:CHUNK]
+
+        async def write():
+            status = await ChunkedUploads.write_chunk(session_id, 0, body())
+            return status, threading.get_ident()
+
+        status, loop_thread = asyncio.run(write())
+
+        assert status["received_chunks"] == [0]
+        assert threads and loop_thread not in threads
+
+    @pytest.mark.parametrize("index, body", [(0, b"short"), (5, b"x"), (2, b"x" * CHUNK)])
+    def test_wrong_chunk_is_rejected(self, client: TestClient, upload_session_dir, index, body):
+        """Chunks with a bad index or length should return 400 and not be recorded."""
+        session = _start(client)
+
+        response = client.put(f"/api/v1/upload-sessions/{session['session_id']}/chunks/{index}", content=body)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get(f"/api/v1/upload-sessions/{session['session_id']}").json()["received_chunks"] == []
+
+    def test_invalid_content_reopens_session(self, client: TestClient, upload_session_dir):
+        """A file that fails validation should leave the session open for corrections."""
+        content = b"a,b\n\xff\xfe\n"
+        session = _start(client, content)
+        _put(client, session["session_id"], 0, content)
+
+        response = client.post(f"/api/v1/upload-sessions/{session['session_id']}/complete")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get(f"/api/v1/upload-sessions/{session['session_id']}").json()["status"] == "open"
+
+    def test_oversized_session_returns_413(self, client: TestClient, upload_session_dir):
+        """Sessions over the JSON size limit should be refused up front."""
+        response = client.post(
+            "/api/v1/upload-sessions",
+            json={"filename": "scada.json", "total_size": 10 * 1024 ** 3},
+        )
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert not list(upload_session_dir.glob("*.part"))
+
+    def test_abort_and_expiry_remove_partial_files(self, client: TestClient, upload_session_dir):
+        """Aborted and expired sessions should delete their partial files."""
+        aborted = _start(client)
+        expired = _start(client)
+
+        assert client.delete(f"/api/v1/upload-sessions/{aborted['session_id']}").status_code == 200
+        assert ChunkedUploads.expire_sessions(max_age_hours=0) == 1
+
+        assert not list(upload_session_dir.glob("*.part"))
+        assert ChunkedUploads.get_status(expired["session_id"]) is None